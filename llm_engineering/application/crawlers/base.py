@@ -6,16 +6,26 @@ This module provides base classes for all web crawlers:
 - BaseSeleniumCrawler: Base for crawlers that need browser automation
 """
 
-import time
+import atexit
+import threading
 from abc import ABC, abstractmethod
-from tempfile import mkdtemp
+from contextlib import contextmanager
+from typing import Iterator
 
 import chromedriver_autoinstaller
-from selenium import webdriver
+from bs4 import BeautifulSoup
+from loguru import logger
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.remote.webdriver import WebDriver
 
 from llm_engineering.domain.documents import NoSQLBaseDocument
 
+from .html_parsing import parse_html
+from .instrumentation import record_bytes, stage
+from .page_waits import wait_for_height_to_settle, wait_until_ready
+from .rate_limit import rate_limiter
+from .webdriver_pool import WebDriverPool, close_driver_pool, get_driver_pool
+
 
 # Automatically install the correct ChromeDriver version
 chromedriver_autoinstaller.install()
@@ -31,17 +41,62 @@ class BaseCrawler(ABC):
     """
     model: type[NoSQLBaseDocument]
 
+    # Whether links already in the data warehouse are still handed to `extract`,
+    # for crawlers that can cheaply detect and apply updates themselves
+    recrawl_stored_links: bool = False
+
+    # Whether `extract_many` handles a batch better than one `extract` call per link
+    supports_batch: bool = False
+
     @abstractmethod
-    def extract(self, link: str, **kwargs) -> None:
+    def extract(self, link: str, **kwargs) -> dict | None:
         """
         Extract data from a given link.
         
         Args:
             link: URL to extract data from
             **kwargs: Additional parameters (e.g., user object)
+
+        Returns:
+            Optional details about the crawl (e.g., which fetch tier served it),
+            recorded in the step metadata
         """
         ...
 
+    def extract_many(self, links: list[str], **kwargs) -> dict[str, str | None]:
+        """
+        Extract data from several links.
+        
+        Calls `extract` once per link. Crawlers that can fetch links together
+        override this and set `supports_batch`.
+        
+        Args:
+            links: URLs to extract data from
+            **kwargs: Additional parameters (e.g., user object)
+
+        Returns:
+            Dict mapping each link to an error message, or None if it was crawled
+        """
+        errors = {}
+        for link in links:
+            try:
+                self.extract(link, **kwargs)
+                errors[link] = None
+            except Exception as e:
+                logger.error(f"An error occurred while crawling {link}: {e!s}")
+                errors[link] = str(e)
+
+        return errors
+
+    def close(self) -> None:
+        """
+        Release resources held by the crawler.
+        
+        Called when the crawl session that created the crawler ends. Override
+        this in crawlers that keep browsers, sessions or files open.
+        """
+        pass
+
 
 class BaseSeleniumCrawler(BaseCrawler, ABC):
     """
@@ -51,48 +106,77 @@ class BaseSeleniumCrawler(BaseCrawler, ABC):
     - Require JavaScript rendering
     - Need login/authentication
     - Have infinite scroll or dynamic content
+
+    Browsers come from the WebDriverPool of the process, which hands a browser
+    launched for one crawler class only to instances of that class. `extract`
+    runs inside `with self.browser():`, which checks a driver out for the
+    current thread and exposes it as `self.driver`. Idle browsers of a crawler
+    class are kept until every instance that used them is closed.
     """
     
-    def __init__(self, scroll_limit: int = 5) -> None:
+    def __init__(self, scroll_limit: int = 5, quiet_period: float | None = None) -> None:
         """
-        Initialize Selenium crawler with Chrome browser.
+        Initialize Selenium crawler.
         
         Args:
             scroll_limit: Maximum number of page scrolls (for infinite scroll sites)
+            quiet_period: Seconds a page must stay idle to count as loaded, for sites slower
+                than `SELENIUM_QUIET_PERIOD`
         """
-        # Configure Chrome options for headless browsing
-        options = webdriver.ChromeOptions()
+        self.scroll_limit = scroll_limit
+        self.quiet_period = quiet_period
+        self._local = threading.local()
+        self._pool: WebDriverPool | None = None  # Pool this crawler is registered with as a user
+        self._pool_lock = threading.Lock()
 
-        # Core options for stability
-        options.add_argument("--no-sandbox")                # Bypass OS security model
-        options.add_argument("--headless=new")              # Run without GUI
-        options.add_argument("--disable-dev-shm-usage")     # Overcome limited resource problems
-        options.add_argument("--log-level=3")               # Suppress logs
-        
-        # Disable popups and notifications
-        options.add_argument("--disable-popup-blocking")
-        options.add_argument("--disable-notifications")
-        options.add_argument("--disable-extensions")
-        
-        # Performance and security options
-        options.add_argument("--disable-background-networking")
-        options.add_argument("--ignore-certificate-errors")  
-        
-        # Use temporary directories for user data
-        options.add_argument(f"--user-data-dir={mkdtemp()}") 
-        options.add_argument(f"--data-path={mkdtemp()}")      
-        options.add_argument(f"--disk-cache-dir={mkdtemp()}")  
-        options.add_argument("--remote-debugging-port=9226")   
+    @property
+    def driver(self) -> WebDriver:
+        """The browser checked out by the current thread."""
+        driver = getattr(self._local, "driver", None)
+        if driver is None:
+            raise RuntimeError("No browser is checked out. Use the driver inside `with self.browser():`.")
 
-        # Allow subclasses to add their own options
-        self.set_extra_driver_options(options)
+        return driver
 
-        self.scroll_limit = scroll_limit  
+    @contextmanager
+    def browser(self) -> Iterator[WebDriver]:
+        """
+        Check a browser out of the pool for the current thread.
         
-        # Initialize Chrome driver with options
-        self.driver = webdriver.Chrome(  
-            options=options,
-        )
+        The browser goes back to the pool when the block exits, so it can be
+        reused by the next crawl instead of launching Chrome again.
+        """
+        with self._get_registered_pool().checkout(self.driver_profile, self.set_extra_driver_options) as driver:
+            self._local.driver = driver
+            try:
+                yield driver
+            finally:
+                self._local.driver = None
+
+    @property
+    def driver_profile(self) -> str:
+        """Pool profile of the browsers of this crawler, which share its Chrome options."""
+        return type(self).__qualname__
+
+    def get_driver_pool(self) -> WebDriverPool:
+        """Return the browser pool shared by every Selenium crawler of the process."""
+        return get_driver_pool()
+
+    def close(self) -> None:
+        """Stop using the pooled browsers; they are quit once no other instance of this crawler class uses them."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+
+        if pool is not None:
+            pool.remove_user(self.driver_profile)
+
+    def _get_registered_pool(self) -> WebDriverPool:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = self.get_driver_pool()
+                self._pool.add_user(self.driver_profile)
+
+            return self._pool
 
     def set_extra_driver_options(self, options: Options) -> None:
         """
@@ -111,6 +195,25 @@ class BaseSeleniumCrawler(BaseCrawler, ABC):
         """
         pass
 
+    def navigate(self, url: str) -> None:
+        """
+        Load a page in the checked-out browser, within the rate limit of its domain.
+        
+        Args:
+            url: Page to load
+        """
+        rate_limiter.acquire(url)
+        with stage("render", browser=True):
+            self.driver.get(url)
+
+    def parse_page(self) -> BeautifulSoup:
+        """Parse the page currently loaded in the checked-out browser."""
+        with stage("render", browser=True):
+            page_source = self.driver.page_source
+        record_bytes(len(page_source.encode("utf-8")))
+
+        return parse_html(page_source)
+
     def scroll_page(self) -> None:
         """
         Scroll the page to load dynamic content.
@@ -118,16 +221,19 @@ class BaseSeleniumCrawler(BaseCrawler, ABC):
         Used for sites with infinite scroll or lazy loading.
         Scrolls until no new content loads or scroll_limit is reached.
         """
+        with stage("render", browser=True):
+            self._scroll_page()
+
+    def _scroll_page(self) -> None:
         current_scroll = 0
         last_height = self.driver.execute_script("return document.body.scrollHeight")  # Fixed: scrollingHeight -> scrollHeight
         
         while True:
             # Scroll to bottom of page
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(5)  # Wait for content to load
-            
-            # Check if new content loaded
-            new_height = self.driver.execute_script("return document.body.scrollHeight")
+
+            # Wait until new content stops loading, instead of a fixed delay
+            new_height = wait_for_height_to_settle(self.driver, quiet_period=self.quiet_period)
             
             # Stop if no new content or reached scroll limit
             if new_height == last_height or (self.scroll_limit and current_scroll >= self.scroll_limit):
@@ -135,13 +241,18 @@ class BaseSeleniumCrawler(BaseCrawler, ABC):
                 
             last_height = new_height  # Fixed: last_night -> last_height
             current_scroll += 1
-    
-    def __del__(self):
+
+    def wait_until_ready(self, selector: str | None = None) -> bool:
         """
-        Cleanup: Close the browser when crawler is destroyed.
+        Wait until the current page is loaded and its DOM has settled.
+        
+        Args:
+            selector: Optional CSS selector that must be present on the page
+
+        Returns:
+            True if the page became ready before the timeout
         """
-        if hasattr(self, 'driver'):
-            try:
-                self.driver.quit()
-            except:
-                pass  # Ignore errors during cleanup
+        with stage("render", browser=True):
+            return wait_until_ready(self.driver, selector=selector, quiet_period=self.quiet_period)
+
+atexit.register(close_driver_pool)
@@ -1,55 +1,277 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
 from urllib.parse import urlparse
 
-from langchain_community.document_loaders import AsyncHtmlLoader
+import aiohttp
+from langchain_community.document_loaders.async_html import default_header_template
 from langchain_community.document_transformers.html2text import Html2TextTransformer
+from langchain_core.documents import Document
 from loguru import logger
 
+from llm_engineering.domain.base.nosql import WriteOutcome
 from llm_engineering.domain.documents import ArticleDocument
+from llm_engineering.domain.exceptions import DatabaseError
+from llm_engineering.settings import settings
 
 from .base import BaseCrawler
+from .html_parsing import parse_html
+from .http_cache import HttpCache, fetch
+from .rate_limit import get_domain
+from .instrumentation import CrawlTrace, get_tracer, record_document, stage, use_trace
 
 class CustomArticleCrawler(BaseCrawler):
     model = ArticleDocument
+    supports_batch = True
 
-    def __init__(self) -> None:
+    # Stored articles are revalidated through the HTTP cache and only rewritten when they changed
+    recrawl_stored_links = True
+
+    def __init__(self, cache: HttpCache | None = None) -> None:
         super().__init__()
 
+        self._cache = cache or HttpCache()
+
     def extract(self,link: str, **kwargs) -> None:
-        old_model - self.model.find(link=link)
-        if old_model is not None:
-            logger.info(f"Article already exists in the database: {link}")
+        stored = self._find_stored([link])
 
-            return
-        
         logger.info(f"Started scrapping article: {link}, 'bub'.")
 
-        loader = AsyncHtmlLoader([link])
-        docs = loader.load()
+        result = asyncio.run(self._fetch_articles([link]))[link]
+        if isinstance(result, BaseException):
+            raise result
 
-        html2text = Html2TextTransformer()
-        docs_transformed = html2text.transform_documents(docs)
-        doc_transformed = docs_transformed[0]
+        content, unchanged = result
+        if unchanged and link in stored:
+            logger.info(f"Article unchanged since the last crawl: {link}")
 
-        content = {
-            "Title": doc_transformed.metadata.get("title"),
-            "Subtitle": doc_transformed.metadata.get("description"),
-            "Content": doc_transformed.page_content,
-            "language": doc_transformed.metadata.get("language"),
-        }
+            return
+
+        instance = self._build_article(link, content, stored.get(link), kwargs["user"])
+        with stage("save"):
+            (outcome,) = self.model.bulk_write([instance], upsert=link in stored)
+        if outcome == WriteOutcome.FAILED:
+            raise DatabaseError(f"Failed to save article {link}")
+        record_document(instance)
+
+        logger.info(f"Finished scrapping custom article: {link} 'bub'.")
+
+    def extract_many(self, links: list[str], **kwargs) -> dict[str, str | None]:
+        """
+        Extract a batch of articles in one go.
+
+        The links are fetched in one bounded-concurrency HTTP session through the
+        HTTP cache, transformed to text in a process pool while other pages are
+        still downloading, and saved with one bulk write. Stored articles the
+        server reports unchanged are neither transformed nor written again, and
+        the process pool is only started once a page needs transforming.
+
+        Args:
+            links: URLs of the articles
+            **kwargs: Additional parameters (e.g., user object)
+
+        Returns:
+            Dict mapping each link to an error message, or None if it was crawled
+        """
+        links = list(dict.fromkeys(links))
+        errors = {link: None for link in links}
+        if not links:
+            return errors
+
+        stored = self._find_stored(links)
+
+        logger.info(f"Started scrapping {len(links)} articles, {len(stored)} already stored, 'bub'.")
+
+        tracer = get_tracer()
+        traces = {link: tracer.start(link, crawler=type(self).__name__) for link in links}
 
-        parsed_url = urlparse(link)
-        platform = parsed_url.netloc
+        with _LazyProcessPoolExecutor(max_workers=settings.ARTICLE_TRANSFORM_WORKERS) as executor:
+            results = asyncio.run(self._fetch_articles(links, executor, traces))
 
         user = kwargs["user"]
-        instance = self.model(
+        new_articles, changed_articles = [], []
+        for link, result in results.items():
+            if isinstance(result, BaseException):
+                logger.error(f"An error occurred while scrapping article {link}: {result!s}")
+                errors[link] = str(result) or type(result).__name__
+
+                continue
+
+            content, unchanged = result
+            if unchanged and link in stored:
+                continue
+
+            article = self._build_article(link, content, stored.get(link), user)
+            (changed_articles if link in stored else new_articles).append(article)
+
+        for articles, upsert in ((new_articles, False), (changed_articles, True)):
+            if not articles:
+                continue
+
+            start = time.perf_counter()
+            outcomes = self.model.bulk_write(articles, upsert=upsert)
+            # The bulk write is shared, so each article is charged an equal part of it
+            save_time = (time.perf_counter() - start) / len(articles)
+            for instance, outcome in zip(articles, outcomes):
+                if outcome == WriteOutcome.FAILED:
+                    errors[instance.link] = "Failed to save article"
+
+                traces[instance.link].add_stage("save", save_time)
+                record_document(instance, traces[instance.link])
+
+        for link, trace in traces.items():
+            tracer.finish(trace, errors[link])
+
+        logger.info(
+            f"Finished scrapping custom articles: {len(new_articles)} new, {len(changed_articles)} updated, "
+            f"{len(links) - len(new_articles) - len(changed_articles)} unchanged or failed 'bub'."
+        )
+
+        return errors
+
+    def close(self) -> None:
+        """Trim the HTTP cache when the crawl session ends."""
+        self._cache.cleanup()
+
+    def _find_stored(self, links: list[str]) -> dict[str, ArticleDocument]:
+        """Return the id and ingestion time of the stored articles among `links`, keyed by link."""
+        stored = self.model.iter_find(include=["link", "ingested_at"], link={"$in": links})
+
+        return {article.link: article for article in stored}
+
+    def _build_article(self, link: str, content: dict, stored: ArticleDocument | None, user) -> ArticleDocument:
+        # An update replaces the stored article, so it keeps its id and ingestion time
+        identity = {"id": stored.id, "ingested_at": stored.ingested_at} if stored is not None else {}
+
+        return self.model(
             content=content,
             link=link,
-            platform=platform,
+            platform=urlparse(link).netloc,
             author_id=user.id,
             author_full_name=user.full_name,
+            **identity,
         )
-        instance.save()
 
-        logger.info(f"Finished scrapping custom article: {link} 'bub'.")
+    async def _fetch_articles(
+        self, links: list[str], executor: Executor | None = None, traces: dict[str, CrawlTrace] | None = None
+    ) -> dict[str, tuple[dict, bool] | BaseException]:
+        """
+        Fetch articles concurrently in one HTTP session.
+
+        Besides the connection limits, downloads from one domain are capped by its
+        `CRAWL_DOMAIN_CONCURRENCY` override, if any, and every request takes a token
+        from the domain's rate limiter shared with the other crawlers.
+
+        Args:
+            links: URLs of the articles
+            executor: Pool running the HTML→text transforms, defaults to the event loop's thread pool
+            traces: Trace of each link, defaults to the trace of the current crawl
+
+        Returns:
+            Dict mapping each link to its extracted content and whether the page is unchanged
+            since it was cached, or to the exception that prevented it
+        """
+        connector = aiohttp.TCPConnector(
+            limit=settings.ARTICLE_FETCH_CONCURRENCY, limit_per_host=settings.ARTICLE_FETCH_PER_HOST
+        )
+        timeout = aiohttp.ClientTimeout(total=settings.ARTICLE_FETCH_TIMEOUT)
+        domain_slots = {
+            domain: asyncio.Semaphore(min(limit, settings.ARTICLE_FETCH_PER_HOST))
+            for domain, limit in settings.CRAWL_DOMAIN_CONCURRENCY.items()
+        }
+
+        async def fetch_article(link: str) -> tuple[dict, bool]:
+            slots = domain_slots.get(get_domain(link))
+            if slots is None:
+                return await self._fetch_article(session, link, executor, (traces or {}).get(link))
+
+            async with slots:
+                return await self._fetch_article(session, link, executor, (traces or {}).get(link))
+
+        async with aiohttp.ClientSession(headers=default_header_template, connector=connector, timeout=timeout) as session:
+            results = await asyncio.gather(*(fetch_article(link) for link in links), return_exceptions=True)
+
+        return dict(zip(links, results))
+
+    async def _fetch_article(
+        self,
+        session: aiohttp.ClientSession,
+        link: str,
+        executor: Executor | None = None,
+        trace: CrawlTrace | None = None,
+    ) -> tuple[dict, bool]:
+        """
+        Fetch an article through the HTTP cache and return its extracted content and whether it is unchanged.
+
+        The HTML→text transform only runs when the page changed since it was cached.
+        """
+        # Each article runs in its own task, so the trace set here only applies to this article
+        with use_trace(trace):
+            with stage("fetch"):
+                entry, unchanged = await fetch(session, link, self._cache)
+            if unchanged and entry.content is not None:
+                return entry.content, True
+
+            # Includes waiting for a free worker process
+            with stage("transform"):
+                loop = asyncio.get_running_loop()
+                entry.content = await loop.run_in_executor(executor, _html_to_content, link, entry.body)
+            self._cache.put(entry)
+
+            return entry.content, False
+
+
+class _LazyProcessPoolExecutor(Executor):
+    """
+    Process pool started on the first submitted task, so batches served from the cache never spawn workers.
+
+    Workers are not forked: the crawl process runs scheduler, aiohttp and pymongo threads, and a
+    forked child could inherit one of their locks mid-acquire and deadlock.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        self._max_workers = max_workers
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self._max_workers, mp_context=_mp_context())
+
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+def _mp_context() -> multiprocessing.context.BaseContext:
+    # forkserver is not available on Windows
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+
+    return multiprocessing.get_context("spawn")
+
+
+def _html_to_content(link: str, html: str) -> dict:
+    # Module level, so it can run in a process pool
+    soup = parse_html(html)
+    title = soup.find("title")
+    description = soup.find("meta", attrs={"name": "description"})
+    html_tag = soup.find("html")
+
+    html2text = Html2TextTransformer()
+    doc_transformed = html2text.transform_documents([Document(page_content=html, metadata={"source": link})])[0]
 
-        
\ No newline at end of file
+    return {
+        "Title": title.get_text() if title else None,
+        "Subtitle": description.get("content", "No description found.") if description else None,
+        "Content": doc_transformed.page_content,
+        "language": html_tag.get("lang", "No language found.") if html_tag else None,
+    }
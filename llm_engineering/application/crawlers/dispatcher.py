@@ -1,4 +1,8 @@
 import re
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Iterator
 from urllib.parse import urlparse
 
 from loguru import logger
@@ -9,10 +13,19 @@ from .github import GithubCrawler
 from .linkedin import LinkedInCrawler
 from .medium import MediumCrawler
 
+# Host of a URL, without scheme, credentials or port; much cheaper than urlparse on the routing hot path
+HOST_PATTERN = re.compile(r"^(?:[a-zA-Z][\w+.-]*:)?//(?:[^@/?#]*@)?(\[[^\]]*\]|[^:/?#]*)")
+
 
 class CrawlerDispatcher:
     def __init__(self) -> None:
-        self._crawlers = {}
+        self._hosts: dict[str, type[BaseCrawler]] = {}
+        self._patterns: list[tuple[re.Pattern, type[BaseCrawler]]] = []
+        self._resolved: dict[str, type[BaseCrawler]] = {}  # Hosts routed by a pattern or to the default crawler
+
+        self._instances: dict[type[BaseCrawler], BaseCrawler] = {}
+        self._sessions = 0
+        self._lock = threading.Lock()
 
     @classmethod
     def build(cls) -> "CrawlerDispatcher":
@@ -36,16 +49,85 @@ class CrawlerDispatcher:
         return self
 
     def register(self, domain: str, crawler: type[BaseCrawler]) -> None:
-        parsed_domain = urlparse(domain)
-        domain = parsed_domain.netloc
-
-        self._crawlers[r"https://(www\.)?{}/*".format(re.escape(domain))] = crawler
+        host = urlparse(domain).netloc.lower()
+
+        self._hosts[host] = crawler
+        self._hosts[f"www.{host}"] = crawler
+        self._resolved.clear()
+
+    def register_pattern(self, host_pattern: str, crawler: type[BaseCrawler]) -> None:
+        """Route hosts fully matching `host_pattern` (e.g. r"[\\w-]+\\.substack\\.com") that have no exact registration."""
+        self._patterns.append((re.compile(host_pattern, re.IGNORECASE), crawler))
+        self._resolved.clear()
+
+    @contextmanager
+    def session(self) -> Iterator["CrawlerDispatcher"]:
+        """
+        Reuse one crawler instance per crawler class inside the block.
+
+        Reused crawlers keep their state between links (e.g. the HTTP cache of
+        article crawlers). When the outermost session exits, every crawler it
+        created is closed; Selenium crawlers then release the pooled browsers,
+        which are quit once no other crawler of the same class uses them.
+        """
+        with self._lock:
+            self._sessions += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._sessions -= 1
+                crawlers = list(self._instances.values()) if self._sessions == 0 else []
+                if self._sessions == 0:
+                    self._instances.clear()
+
+            for crawler in crawlers:
+                try:
+                    crawler.close()
+                except Exception as e:
+                    logger.warning(f"Could not close {type(crawler).__name__}: {e!s}")
 
     def get_crawler(self, url: str) -> BaseCrawler:
-        for pattern, crawler in self._crawlers.items():
-            if re.match(pattern, url):
-                return crawler()
+        return self.get_crawler_instance(self.get_crawler_class(url))
+
+    def get_crawler_instance(self, crawler_class: type[BaseCrawler]) -> BaseCrawler:
+        """Return the session's instance of `crawler_class`, or a new one outside of a session."""
+        with self._lock:
+            if self._sessions == 0:
+                return crawler_class()
+
+            if crawler_class not in self._instances:
+                self._instances[crawler_class] = crawler_class()
+
+            return self._instances[crawler_class]
+
+    def group_links(self, links: list[str]) -> dict[type[BaseCrawler], list[str]]:
+        """Group links by the crawler class they are routed to, keeping their order."""
+        groups = defaultdict(list)
+        for link in links:
+            groups[self.get_crawler_class(link)].append(link)
+
+        return dict(groups)
+
+    def get_crawler_class(self, url: str) -> type[BaseCrawler]:
+        match = HOST_PATTERN.match(url)
+        host = match[1].lower() if match else ""
+
+        crawler = self._hosts.get(host) or self._resolved.get(host)
+        if crawler is None:
+            crawler = self._resolve(host)
+
+        return crawler
+
+    def _resolve(self, host: str) -> type[BaseCrawler]:
+        for pattern, crawler in self._patterns:
+            if pattern.fullmatch(host):
+                break
         else:
-            logger.warning(f"No crawler found for {url}. Defaulting to CustomArticleCrawler.")
+            logger.warning(f"No crawler found for {host}. Defaulting to CustomArticleCrawler.")
+
+            crawler = CustomArticleCrawler
+
+        self._resolved[host] = crawler
 
-            return CustomArticleCrawler()
+        return crawler
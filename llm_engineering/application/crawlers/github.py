@@ -1,126 +1,137 @@
 ﻿import os
+import re
 import shutil
 import subprocess
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
 
 from loguru import logger
 
+from llm_engineering.domain.base.nosql import WriteOutcome
 from llm_engineering.domain.documents import RepositoryDocument
+from llm_engineering.domain.exceptions import DatabaseError
+from llm_engineering.settings import settings
 
 from .base import BaseCrawler
+from .instrumentation import record_bytes, record_document, stage
+from .rate_limit import RetryableError, rate_limiter
+
+# Priority file extensions (code files we definitely want)
+PRIORITY_EXTENSIONS = ['.py', '.js', '.ts', '.java', '.cpp', '.c', '.h', '.cs', '.php', '.rb', '.go', '.rs', '.swift', '.kt', '.scala', '.r', '.sql', '.html', '.css', '.scss', '.less', '.vue', '.jsx', '.tsx', '.md', '.txt', '.yml', '.yaml', '.json', '.xml', '.sh', '.bat', '.ps1', '.dockerfile', '.nf']
+
+# Common large directories that are never worth reading
+SKIP_DIRS = ['node_modules', 'venv', '__pycache__', '.venv', 'build', 'dist', 'target']
+
+# Content sniffing: a NUL byte in the first block, or non-UTF-8 content full of control characters, marks a file as binary
+BINARY_SNIFF_BYTES = 8192
+MAX_CONTROL_CHAR_RATIO = 0.05
+
+# git only reports throttling, server errors and dropped connections in its error output
+TRANSIENT_GIT_ERROR = re.compile(
+    r"(?:returned error: |HTTP )(?P<status>429|5\d\d)|Connection (?:reset|timed out)|early EOF|unexpected disconnect",
+    re.IGNORECASE,
+)
+
+
+def _git(*args: str, input: str | None = None) -> str:
+    result = subprocess.run(["git", *args], input=input, capture_output=True, text=True, check=True)
+
+    return result.stdout
+
+
+def _git_remote(url: str, *args: str) -> str:
+    """Run a git command that talks to `url` within its domain's rate limit, retrying transient failures."""
+
+    def run() -> str:
+        try:
+            return _git(*args)
+        except subprocess.CalledProcessError as e:
+            match = TRANSIENT_GIT_ERROR.search(e.stderr or "")
+            if match is None:
+                raise
+
+            status = int(match["status"]) if match["status"] else None
+            raise RetryableError(f"git failed on {url}: {e.stderr.strip()}", status=status) from e
+
+    return rate_limiter.call(url, run)
+
 
 class GithubCrawler(BaseCrawler):
     model = RepositoryDocument
+    recrawl_stored_links = True
 
-    def __init__(self, ignore=(".git", ".toml", ".lock", ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".svg", ".dll", ".exe", ".zip", ".tar", ".gz", ".pdf", ".docx", ".xlsx"), max_file_size_mb=0.5) -> None:
+    def __init__(self, ignore=(".git", ".toml", ".lock", ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".svg", ".dll", ".exe", ".zip", ".tar", ".gz", ".pdf", ".docx", ".xlsx"), max_file_size_mb=0.5, max_total_size_mb=5) -> None:
         super().__init__()
         self._ignore = ignore
         self._max_file_size = max_file_size_mb * 1024 * 1024  # Convert to bytes (500KB per file)
+        self._max_total_size = max_total_size_mb * 1024 * 1024  # Keep documents well under MongoDB's 16MB limit
 
     def extract(self, link: str, **kwargs) -> None:
+        clone_url, ref, subpath = self._resolve_link(link)
+
+        # Stored repositories are only re-read when the remote branch moved since the last crawl
         old_model = self.model.find(link=link)
-        if old_model is not None:
-            logger.info(f"Repository already exists in the database: {link}")
-            return
+        if old_model is not None and old_model.commit_sha is not None:
+            with stage("fetch"):
+                remote_sha = self._remote_sha(clone_url, ref)
+            if old_model.commit_sha == remote_sha:
+                logger.info(f"Repository already up to date in the database: {link}")
+                return
 
         logger.info(f"Starting scrapping Github repository: {link}")
 
-        repo_name = link.strip("/").split("/")[-1]
+        repo_name = clone_url.rstrip("/").split("/")[-1].removesuffix(".git")
         local_temp = tempfile.mkdtemp()
 
         try:
-            os.chdir(local_temp)
-            subprocess.run(["git", "clone", link])
-            
             repo_path = os.path.join(local_temp, repo_name)
 
-            tree = {}
-            total_size = 0
-            files_processed = 0
-            files_skipped = 0
-            
-            # Priority file extensions (code files we definitely want)
-            priority_extensions = ['.py', '.js', '.ts', '.java', '.cpp', '.c', '.h', '.cs', '.php', '.rb', '.go', '.rs', '.swift', '.kt', '.scala', '.r', '.sql', '.html', '.css', '.scss', '.less', '.vue', '.jsx', '.tsx', '.md', '.txt', '.yml', '.yaml', '.json', '.xml', '.sh', '.bat', '.ps1', '.dockerfile', '.nf']
-            
-            for root, _, files in os.walk(repo_path):
-                dir_path = root.replace(repo_path, "").lstrip("/")
-                
-                # Skip ignored directories
-                if any(dir_path.startswith(ignore) for ignore in self._ignore):
-                    continue
-                
-                # Skip common large directories
-                if any(skip_dir in dir_path.lower() for skip_dir in ['node_modules', 'venv', '__pycache__', '.venv', 'build', 'dist', 'target']):
-                    continue
+            # For tree/<branch>/<path> links only that subtree is read
+            root_path = os.path.join(repo_path, subpath) if subpath else repo_path
 
-                # Sort files by priority (code files first)
-                sorted_files = sorted(files, key=lambda f: (
-                    0 if any(f.lower().endswith(ext) for ext in priority_extensions) else 1,
-                    f.lower()
-                ))
-
-                for file in sorted_files:
-                    # Skip ignored file types
-                    if any(file.endswith(ignore) for ignore in self._ignore):
-                        files_skipped += 1
-                        continue
-                        
-                    file_full_path = os.path.join(root, file)
-                    
-                    # Check file size before reading
-                    try:
-                        file_size = os.path.getsize(file_full_path)
-                        if file_size > self._max_file_size:
-                            logger.debug(f"Skipping large file {file} ({file_size / 1024:.1f}KB)")
-                            files_skipped += 1
-                            continue
-                    except OSError:
-                        files_skipped += 1
-                        continue
-                    
-                    # Stop if approaching MongoDB document limit (keep under 5MB total)
-                    if total_size > 5 * 1024 * 1024:
-                        logger.info(f"Stopping extraction - document size limit reached ({total_size / 1024 / 1024:.1f}MB)")
-                        break
-                    
-                    file_path = os.path.join(dir_path, file) if dir_path else file
-                    try:
-                        with open(file_full_path, "r", errors="ignore") as f:
-                            content = f.read()
-                            
-                            # Skip if content is too large
-                            if len(content) > self._max_file_size:
-                                logger.debug(f"Skipping large content {file} ({len(content) / 1024:.1f}KB)")
-                                files_skipped += 1
-                                continue
-                            
-                            # Clean content (remove excessive whitespace, keep structure)
-                            content = content.replace(",", "").strip()
-                            if content:  # Only add non-empty files
-                                tree[file_path] = content
-                                total_size += len(content)
-                                files_processed += 1
-                                
-                    except Exception as e:
-                        logger.debug(f"Could not read file {file_path}: {e}")
-                        files_skipped += 1
-                
-                # Break outer loop if size limit reached
-                if total_size > 5 * 1024 * 1024:
-                    break
+            update = None
+            if old_model is not None and old_model.commit_sha:
+                with stage("fetch"):
+                    update = self._fetch_changes(old_model.commit_sha, clone_url, repo_path, ref=ref, subpath=subpath)
 
-            logger.info(f"Repository {repo_name}: processed {files_processed} files, skipped {files_skipped} files, total size: {total_size / 1024 / 1024:.2f}MB")
+            if update is not None:
+                commit_sha, changed_paths = update
+                with stage("parse"):
+                    tree = self._apply_changes(old_model.content, changed_paths, self._read_tree(root_path, repo_name))
+            else:
+                shutil.rmtree(repo_path, ignore_errors=True)
+                with stage("fetch"):
+                    commit_sha = self._clone(clone_url, repo_path, ref=ref, subpath=subpath)
+                with stage("parse"):
+                    tree = self._read_tree(root_path, repo_name)
+            tree = self._fit_to_budget(tree, repo_name)
+            record_bytes(self._downloaded_size(repo_path))
 
-            user = kwargs["user"]
-            instance = self.model(
-                content=tree,
-                name=repo_name,
-                link=link,
-                platform="github",
-                author_id=user.id,
-                author_full_name=user.full_name,
-            )
-            instance.save()
+            if old_model is None:
+                user = kwargs["user"]
+                instance = self.model(
+                    content=tree,
+                    name=repo_name,
+                    link=link,
+                    platform="github",
+                    author_id=user.id,
+                    author_full_name=user.full_name,
+                    commit_sha=commit_sha,
+                )
+                with stage("save"):
+                    saved = instance.save()
+                if saved is None:
+                    raise DatabaseError(f"Failed to save repository {link}")
+                record_document(instance)
+            else:
+                old_model.content = tree
+                old_model.commit_sha = commit_sha
+                with stage("save"):
+                    (outcome,) = self.model.bulk_write([old_model], upsert=True)
+                if outcome == WriteOutcome.FAILED:
+                    raise DatabaseError(f"Failed to update repository {link}")
+                record_document(old_model)
 
         except Exception as e:
             logger.error(f"Error extracting repository {link}: {e}")
@@ -132,3 +143,339 @@ class GithubCrawler(BaseCrawler):
                 logger.warning(f"Could not clean up temp directory: {e}")
 
         logger.info(f"Finished scrapping Github repository: {link}")
+
+    def _read_tree(self, root_path: str, repo_name: str) -> dict:
+        """
+        Read the checked-out files below `root_path` into a {relative path: content} dict.
+        
+        Candidate files from the whole tree are ordered by priority (code files
+        first) and read in parallel batches until the repository size budget is
+        spent, so no time goes to files that cannot fit. The result may exceed
+        the budget by the last batch; `_fit_to_budget` trims it. Only absolute
+        paths are used, so several repositories can be read at the same time.
+        
+        Args:
+            root_path: Directory to read
+            repo_name: Repository name, used for logging
+        """
+        candidates, files_skipped = self._list_candidates(root_path)
+
+        tree = {}
+        total_size = 0
+        batch_size = settings.GITHUB_READ_WORKERS * 4
+        with ThreadPoolExecutor(max_workers=settings.GITHUB_READ_WORKERS) as executor:
+            for start in range(0, len(candidates), batch_size):
+                if total_size > self._max_total_size:
+                    logger.info(f"Stopping extraction - document size limit reached ({total_size / 1024 / 1024:.1f}MB)")
+                    break
+
+                batch = candidates[start : start + batch_size]
+                for file_path, content in zip(batch, executor.map(self._read_file, (os.path.join(root_path, path) for path in batch))):
+                    if content is None:
+                        files_skipped += 1
+                        continue
+
+                    tree[file_path] = content
+                    total_size += len(content)
+
+        logger.info(f"Repository {repo_name}: processed {len(tree)} files, skipped {files_skipped} files, total size: {total_size / 1024 / 1024:.2f}MB")
+
+        return tree
+
+    def _fit_to_budget(self, tree: dict, repo_name: str) -> dict:
+        """
+        Keep the highest-priority files of `tree` that fit in the repository size budget.
+        
+        Applied to the final content of every crawl, freshly read or merged with
+        the stored content, so repositories cannot grow past the budget (and
+        towards MongoDB's 16MB document limit) over incremental updates.
+        """
+        fitted = {}
+        total_size = 0
+        for file_path in sorted(tree, key=self._priority):
+            # Stop if approaching MongoDB document limit
+            if total_size + len(tree[file_path]) > self._max_total_size:
+                logger.info(
+                    f"Repository {repo_name}: kept {len(fitted)} of {len(tree)} files within the "
+                    f"{self._max_total_size / 1024 / 1024:.1f}MB size limit"
+                )
+                break
+
+            fitted[file_path] = tree[file_path]
+            total_size += len(tree[file_path])
+
+        return fitted
+
+    @staticmethod
+    def _priority(file_path: str) -> tuple[int, str]:
+        """Sort key putting code files first."""
+        return (0 if any(file_path.lower().endswith(ext) for ext in PRIORITY_EXTENSIONS) else 1, file_path.lower())
+
+    def _list_candidates(self, root_path: str) -> tuple[list[str], int]:
+        """
+        List readable files below `root_path`, code files first.
+        
+        Returns:
+            The relative paths of candidate files and the number of files skipped
+        """
+        candidates = []
+        files_skipped = 0
+        for root, dirs, files in os.walk(root_path):
+            dir_path = os.path.relpath(root, root_path) if root != root_path else ""
+
+            # Don't descend into ignored and common large directories
+            dirs[:] = [d for d in dirs if not self._is_ignored_dir(os.path.join(dir_path, d))]
+
+            for file in files:
+                file_path = os.path.join(dir_path, file) if dir_path else file
+                try:
+                    file_size = os.path.getsize(os.path.join(root, file))
+                except OSError:
+                    file_size = None
+
+                if self._is_ignored_file(file) or file_size is None or file_size > self._max_file_size:
+                    files_skipped += 1
+                    continue
+
+                candidates.append(file_path)
+
+        candidates.sort(key=self._priority)
+
+        return candidates, files_skipped
+
+    @staticmethod
+    def _read_file(file_full_path: str) -> str | None:
+        """
+        Read a text file, or return None for binary, unreadable or empty files.
+        
+        Binary files are detected from their content: a NUL byte in the first
+        block, or non-UTF-8 bytes that decode to many control characters.
+        """
+        try:
+            with open(file_full_path, "rb") as f:
+                data = f.read()
+        except OSError as e:
+            logger.debug(f"Could not read file {file_full_path}: {e}")
+
+            return None
+
+        if b"\0" in data[:BINARY_SNIFF_BYTES]:
+            return None
+
+        try:
+            content = data.decode("utf-8")
+        except UnicodeDecodeError:
+            # Legacy 8-bit text decodes as Latin-1; binary data shows up as control characters
+            content = data.decode("latin-1")
+            control_chars = sum(1 for char in content if (char < " " and char not in "\t\n\r\f") or "\x7f" <= char <= "\x9f")
+            if control_chars > len(content) * MAX_CONTROL_CHAR_RATIO:
+                return None
+
+        # Clean content (remove excessive whitespace, keep structure)
+        content = content.replace(",", "").strip()
+
+        return content or None
+
+    @staticmethod
+    def _parse_link(link: str, remote_refs: Iterable[str] = ()) -> tuple[str, str | None, str | None]:
+        """
+        Split a repository link into its clone URL, branch and subtree path.
+        
+        `https://github.com/user/repo/tree/main/src` yields
+        (`https://github.com/user/repo`, `main`, `src`). Branch names may contain
+        slashes: the longest of `remote_refs` the part after `/tree/` starts with
+        is the branch. Without a match, the first path segment is.
+        
+        Args:
+            link: Repository URL, optionally pointing at a branch or subtree
+            remote_refs: Branch and tag names of the remote
+        """
+        clone_url, _, ref_path = link.rstrip("/").partition("/tree/")
+        ref = max(
+            (name for name in remote_refs if ref_path == name or ref_path.startswith(f"{name}/")), key=len, default=None
+        )
+        if ref is None:
+            ref, _, subpath = ref_path.partition("/")
+        else:
+            subpath = ref_path[len(ref) + 1 :]
+
+        return clone_url, ref or None, subpath or None
+
+    def _resolve_link(self, link: str) -> tuple[str, str | None, str | None]:
+        """Same as `_parse_link`, looking up the remote branches when the branch of a tree link may contain slashes."""
+        clone_url, ref, subpath = self._parse_link(link)
+        if ref is None or subpath is None:
+            return clone_url, ref, subpath
+
+        return self._parse_link(link, self._remote_refs(clone_url))
+
+    def _remote_refs(self, url: str) -> list[str]:
+        """List the branch and tag names of the remote, without downloading anything."""
+        output = _git_remote(url, "ls-remote", "--heads", "--tags", url)
+        names = {line.split("\t", 1)[1].removesuffix("^{}") for line in output.splitlines()}
+
+        return [name.removeprefix("refs/heads/").removeprefix("refs/tags/") for name in names]
+
+    def _clone(self, url: str, repo_path: str, ref: str | None = None, subpath: str | None = None) -> str:
+        """
+        Clone only what the crawler is going to read.
+        
+        The clone is shallow (latest commit only) and skips downloading blobs
+        over the per-file size cap. Nothing is checked out by git itself; only
+        the files that pass the ignore rules, lie under `subpath` and were
+        downloaded are then checked out, so filtered blobs are never fetched lazily.
+        
+        Args:
+            url: Repository clone URL
+            repo_path: Directory to clone into
+            ref: Branch or tag to clone, defaults to the remote HEAD
+            subpath: Only check out files below this directory
+        """
+        command = [
+            "clone",
+            "--depth=1",
+            "--single-branch",
+            "--no-checkout",
+            f"--filter=blob:limit={int(self._max_file_size)}",
+        ]
+        if ref:
+            command.append(f"--branch={ref}")
+        _git_remote(url, *command, url, repo_path)
+
+        self._checkout(repo_path, "HEAD", subpath=subpath)
+
+        return _git("-C", repo_path, "rev-parse", "HEAD").strip()
+
+    @staticmethod
+    def _downloaded_size(repo_path: str) -> int:
+        """Return the bytes of git objects downloaded into `repo_path`."""
+        if not os.path.isdir(os.path.join(repo_path, ".git")):
+            return 0
+
+        counts = dict(line.split(": ", 1) for line in _git("-C", repo_path, "count-objects", "-v").splitlines())
+
+        # Sizes are reported in KiB
+        return (int(counts.get("size", 0)) + int(counts.get("size-pack", 0))) * 1024
+
+    def _remote_sha(self, url: str, ref: str | None = None) -> str | None:
+        """
+        Look up the commit the remote branch points to, without downloading anything.
+        
+        Args:
+            url: Repository clone URL
+            ref: Branch or tag, defaults to the remote HEAD
+        """
+        output = _git_remote(url, "ls-remote", url, ref or "HEAD")
+        refs = dict(reversed(line.split("\t", 1)) for line in output.splitlines())
+        if not ref:
+            return refs.get("HEAD")
+
+        # An annotated tag is listed twice; its peeled "^{}" entry is the commit
+        for name in (f"refs/tags/{ref}^{{}}", f"refs/heads/{ref}", f"refs/tags/{ref}"):
+            if name in refs:
+                return refs[name]
+
+        return None
+
+    def _fetch_changes(
+        self, old_sha: str, url: str, repo_path: str, ref: str | None = None, subpath: str | None = None
+    ) -> tuple[str, dict[str, bool]] | None:
+        """
+        Fetch the latest commit and check out only the files changed since `old_sha`.
+        
+        Only trees are downloaded for the old commit, so the diff costs no file
+        contents beyond the changed files themselves.
+        
+        Args:
+            old_sha: Commit ingested by the previous crawl
+            url: Repository clone URL
+            repo_path: Directory to fetch into
+            ref: Branch or tag, defaults to the remote HEAD
+            subpath: Only consider files below this directory
+
+        Returns:
+            The new commit SHA and a {relative path: still exists} dict of changed files,
+            or None if the old commit can no longer be fetched (e.g. after a force push).
+        """
+        _git("init", "--quiet", repo_path)
+        _git_remote(url, "-C", repo_path, "fetch", "--quiet", "--depth=1", f"--filter=blob:limit={int(self._max_file_size)}", url, ref or "HEAD")
+        new_sha = _git("-C", repo_path, "rev-parse", "FETCH_HEAD").strip()
+
+        try:
+            _git_remote(url, "-C", repo_path, "fetch", "--quiet", "--depth=1", "--filter=blob:none", url, old_sha)
+        except subprocess.CalledProcessError:
+            logger.warning(f"Commit {old_sha} is no longer available, re-reading the whole repository.")
+
+            return None
+
+        pathspec = ["--", subpath] if subpath else []
+        diff = _git("-C", repo_path, "diff-tree", "-r", "-z", "--no-renames", "--name-status", old_sha, new_sha, *pathspec)
+        fields = diff.split("\0")
+        changed = {path: status != "D" for status, path in zip(fields[0::2], fields[1::2]) if path}
+
+        logger.info(f"{len(changed)} files changed between {old_sha[:7]} and {new_sha[:7]}.")
+
+        self._checkout(repo_path, new_sha, subpath=subpath, paths=[path for path, exists in changed.items() if exists])
+        changed_paths = {(os.path.relpath(path, subpath) if subpath else path): exists for path, exists in changed.items()}
+
+        return new_sha, changed_paths
+
+    @staticmethod
+    def _apply_changes(content: dict, changed_paths: dict[str, bool], changed_tree: dict) -> dict:
+        """
+        Merge re-read files into the previously stored content.
+        
+        Changed files that are no longer readable (deleted, ignored or too
+        large) are dropped; the others take their new content.
+        """
+        tree = {path: file_content for path, file_content in content.items() if path not in changed_paths}
+        tree.update(changed_tree)
+
+        return tree
+
+    def _checkout(self, repo_path: str, commit: str, subpath: str | None = None, paths: list[str] | None = None) -> None:
+        """
+        Check out the downloaded, non-ignored files of `commit`.
+        
+        Args:
+            repo_path: Repository directory
+            commit: Commit to check out files from
+            subpath: Only check out files below this directory
+            paths: Only check out these repository paths
+        """
+        if paths is not None and not paths:
+            return
+
+        # Blobs left out by the size filter are reported as "?<sha>"
+        objects = _git("-C", repo_path, "rev-list", "--objects", "--missing=print", commit)
+        missing = {line[1:] for line in objects.splitlines() if line.startswith("?")}
+
+        wanted = set(paths) if paths is not None else None
+        pathspec = ["--", subpath] if subpath else []
+        selected = []
+        for entry in filter(None, _git("-C", repo_path, "ls-tree", "-r", "-z", commit, *pathspec).split("\0")):
+            meta, path = entry.split("\t", 1)
+            _, object_type, sha = meta.split()
+            if object_type != "blob" or sha in missing or (wanted is not None and path not in wanted):
+                continue
+
+            dir_path, file = os.path.split(os.path.relpath(path, subpath) if subpath else path)
+            if not self._is_ignored_dir(dir_path) and not self._is_ignored_file(file):
+                selected.append(path)
+
+        logger.debug(f"Checking out {len(selected)} files, {len(missing)} blobs over the size limit were not downloaded.")
+
+        if selected:
+            _git(
+                "--literal-pathspecs", "-C", repo_path,
+                "checkout", commit, "--pathspec-from-file=-", "--pathspec-file-nul",
+                input="\0".join(selected),
+            )
+
+    def _is_ignored_dir(self, dir_path: str) -> bool:
+        return any(dir_path.startswith(ignore) for ignore in self._ignore) or any(
+            skip_dir in dir_path.lower() for skip_dir in SKIP_DIRS
+        )
+
+    def _is_ignored_file(self, file: str) -> bool:
+        return any(file.endswith(ignore) for ignore in self._ignore)
@@ -0,0 +1,47 @@
+"""
+HTML Parsing
+
+Single entry point for turning page sources into BeautifulSoup trees, so every
+crawler uses the fastest installed tree builder: lxml when it is available,
+otherwise Python's built-in html.parser. Set HTML_PARSER to force one.
+"""
+
+import importlib.util
+from functools import cache
+
+from bs4 import BeautifulSoup
+
+from llm_engineering.domain.exceptions import ImproperlyConfigured
+from llm_engineering.settings import settings
+
+from .instrumentation import stage
+
+# Tree builders by preference, with the package each one needs
+PARSER_PACKAGES = {"lxml": "lxml", "html.parser": None, "html5lib": "html5lib"}
+PREFERRED_PARSERS = ("lxml", "html.parser")
+
+
+def is_available(parser: str) -> bool:
+    package = PARSER_PACKAGES.get(parser)
+
+    return parser in PARSER_PACKAGES and (package is None or importlib.util.find_spec(package) is not None)
+
+
+@cache
+def get_parser_name() -> str:
+    """Return the BeautifulSoup tree builder used by `parse_html`."""
+
+    if settings.HTML_PARSER != "auto":
+        if not is_available(settings.HTML_PARSER):
+            raise ImproperlyConfigured(f"HTML parser '{settings.HTML_PARSER}' is not installed.")
+
+        return settings.HTML_PARSER
+
+    return next(parser for parser in PREFERRED_PARSERS if is_available(parser))
+
+
+def parse_html(markup: str | bytes) -> BeautifulSoup:
+    """Parse a page source once; pass the result to every section extractor instead of re-parsing."""
+
+    with stage("parse"):
+        return BeautifulSoup(markup, get_parser_name())
@@ -0,0 +1,183 @@
+"""
+HTTP Response Cache
+
+On-disk cache of fetched pages keyed by URL. Each entry keeps the response
+body, its validators (ETag / Last-Modified) and the text extracted from it, so
+a recrawl revalidates with a conditional GET and reuses the extracted text
+when the server answers 304 Not Modified. `HttpCache.cleanup` bounds the cache
+by age and size, removing the least recently fetched or revalidated entries.
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import aiohttp
+from loguru import logger
+from pydantic import BaseModel, Field
+
+from llm_engineering.settings import settings
+
+from .instrumentation import record_bytes
+from .rate_limit import raise_for_retryable_status, rate_limiter
+
+
+class HttpCacheEntry(BaseModel):
+    url: str
+    body: str
+    etag: str | None = None
+    last_modified: str | None = None
+    content: dict | None = None  # Text extracted from `body`, filled in by the crawler
+    fetched_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def revalidation_headers(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+
+class HttpCache:
+    """One JSON file per URL. Writes are atomic, so concurrent crawls can share a cache directory."""
+
+    def __init__(self, directory: str | Path | None = None) -> None:
+        self._directory = Path(directory or settings.HTTP_CACHE_DIR)
+
+    def get(self, url: str) -> HttpCacheEntry | None:
+        path = self._path(url)
+        try:
+            return HttpCacheEntry.model_validate_json(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            logger.warning(f"Ignoring corrupt HTTP cache entry for {url}")
+
+            return None
+
+    def put(self, entry: HttpCacheEntry) -> None:
+        self._directory.mkdir(parents=True, exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(entry.model_dump_json())
+            os.replace(temp_path, self._path(entry.url))
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+
+            raise
+
+    def touch(self, url: str) -> None:
+        """Mark the entry of `url` as revalidated, so cleanups keep it."""
+        try:
+            os.utime(self._path(url))
+        except FileNotFoundError:
+            pass
+
+    def cleanup(self, max_age: timedelta | None = None, max_bytes: int | None = None) -> int:
+        """
+        Remove entries not fetched or revalidated within `max_age`, then the least
+        recently used ones until the cache fits in `max_bytes`.
+
+        Args:
+            max_age: Defaults to `HTTP_CACHE_MAX_AGE_DAYS`
+            max_bytes: Defaults to `HTTP_CACHE_MAX_SIZE_MB`
+
+        Returns:
+            The number of entries removed
+        """
+        max_age = max_age or timedelta(days=settings.HTTP_CACHE_MAX_AGE_DAYS)
+        max_bytes = settings.HTTP_CACHE_MAX_SIZE_MB * 1024 * 1024 if max_bytes is None else max_bytes
+        oldest = time.time() - max_age.total_seconds()
+
+        entries = []
+        for path in self._directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # Removed by a concurrent cleanup
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        removed = 0
+        total_size = 0
+        for mtime, size, path in sorted(entries, reverse=True):
+            if mtime >= oldest and total_size + size <= max_bytes:
+                total_size += size
+                continue
+
+            path.unlink(missing_ok=True)
+            removed += 1
+
+        if removed:
+            logger.info(f"Removed {removed} HTTP cache entries, {total_size / 1024 / 1024:.1f}MB left.")
+
+        return removed
+
+    def _path(self, url: str) -> Path:
+        return self._directory / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+
+async def fetch(session: aiohttp.ClientSession, url: str, cache: HttpCache) -> tuple[HttpCacheEntry, bool]:
+    """
+    Fetch `url` within its domain's rate limit, revalidating the cached copy if there is one.
+
+    Throttling, server and connection errors are retried with backoff before being raised.
+
+    Args:
+        session: HTTP session to send the request with
+        url: Page to fetch
+        cache: Cache holding previous responses
+
+    Returns:
+        The current entry and whether it is unchanged from the cached one. An
+        unchanged entry still carries the previously extracted `content`.
+    """
+    cached = cache.get(url)
+
+    return await rate_limiter.call_async(
+        url,
+        lambda: _fetch(session, url, cache, cached),
+        retry_on=(aiohttp.ClientConnectionError, asyncio.TimeoutError),
+    )
+
+
+async def _fetch(
+    session: aiohttp.ClientSession, url: str, cache: HttpCache, cached: HttpCacheEntry | None
+) -> tuple[HttpCacheEntry, bool]:
+    headers = cached.revalidation_headers() if cached is not None else {}
+
+    async with session.get(url, headers=headers) as response:
+        if response.status == 304 and cached is not None:
+            logger.debug(f"HTTP cache hit (304 Not Modified): {url}")
+            cache.touch(url)
+
+            return cached, True
+
+        raise_for_retryable_status(url, response.status, response.headers)
+        response.raise_for_status()
+        record_bytes(len(await response.read()))
+        body = await response.text()
+
+        entry = HttpCacheEntry(
+            url=url,
+            body=body,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+
+    # Servers without validators still let us skip the extraction when the page did not change
+    if cached is not None and cached.body == body:
+        logger.debug(f"HTTP cache hit (unchanged body): {url}")
+        cache.touch(url)
+        entry.content = cached.content
+
+        return entry, True
+
+    return entry, False
@@ -0,0 +1,219 @@
+"""
+Crawl Instrumentation
+
+Breaks each crawl into stages (fetch, render, parse, transform, save) and
+records their wall time, the bytes fetched, the size of the stored document
+and the time spent driving a browser. Traces of one crawl run are collected by
+a `CrawlTracer`, which summarizes them as per-domain percentiles and can append
+every trace to a JSONL file.
+
+Crawlers only call `stage`, `record_bytes` and `record_document`; these act on
+the trace of the link being crawled and do nothing outside of one.
+"""
+
+import math
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator
+from urllib.parse import urlparse
+
+from pydantic import BaseModel, Field, PrivateAttr
+
+from llm_engineering.domain.base.nosql import NoSQLBaseDocument
+
+PERCENTILES = (50, 90, 99)
+
+
+class CrawlTrace(BaseModel):
+    """Measurements of crawling a single link."""
+
+    link: str
+    domain: str
+    crawler: str | None = None
+    started_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    duration: float = 0.0
+    stages: dict[str, float] = Field(default_factory=dict)  # Seconds per stage, summed over repeats
+    browser_time: float = 0.0  # Seconds spent in stages driving a browser
+    bytes_fetched: int = 0
+    document_bytes: int = 0  # BSON size of the saved document, as stored (after compression)
+    successful: bool = True
+    error: str | None = None
+
+    _started: float = PrivateAttr(default_factory=time.perf_counter)
+
+    def add_stage(self, name: str, seconds: float, browser: bool = False) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        if browser:
+            self.browser_time += seconds
+
+
+_current_trace: ContextVar[CrawlTrace | None] = ContextVar("crawl_trace", default=None)
+_current_tracer: ContextVar["CrawlTracer | None"] = ContextVar("crawl_tracer", default=None)
+
+
+class CrawlTracer:
+    """Collects the traces of one crawl run. Thread-safe."""
+
+    def __init__(self, trace_path: str | Path | None = None, keep_traces: bool = True) -> None:
+        """
+        Args:
+            trace_path: JSONL file each finished trace is appended to, if any
+            keep_traces: Keep finished traces in memory for `summary`; long-running workers only export them
+        """
+        self._trace_path = Path(trace_path) if trace_path else None
+        self._keep_traces = keep_traces
+        self._traces: list[CrawlTrace] = []
+        self._lock = threading.Lock()
+
+        if self._trace_path is not None:
+            self._trace_path.parent.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def traces(self) -> list[CrawlTrace]:
+        with self._lock:
+            return list(self._traces)
+
+    @contextmanager
+    def activate(self) -> Iterator["CrawlTracer"]:
+        """Make this the tracer returned by `get_tracer` in the current context, e.g. for batch crawlers."""
+
+        token = _current_tracer.set(self)
+        try:
+            yield self
+        finally:
+            _current_tracer.reset(token)
+
+    def start(self, link: str, crawler: str | None = None) -> CrawlTrace:
+        """Start the trace of a link whose stages run in several contexts; pass it to `use_trace` in each."""
+
+        return CrawlTrace(link=link, domain=urlparse(link).netloc, crawler=crawler)
+
+    def finish(self, trace: CrawlTrace, error: str | None = None) -> None:
+        trace.duration = time.perf_counter() - trace._started
+        trace.successful = error is None
+        trace.error = error
+
+        with self._lock:
+            if self._keep_traces:
+                self._traces.append(trace)
+            if self._trace_path is not None:
+                with self._trace_path.open("a", encoding="utf-8") as f:
+                    f.write(trace.model_dump_json() + "\n")
+
+    @contextmanager
+    def trace(self, link: str, crawler: str | None = None) -> Iterator[CrawlTrace]:
+        """Trace the crawl of `link` running in this block. An exception marks the trace as failed."""
+
+        trace = self.start(link, crawler)
+        error = None
+        try:
+            with use_trace(trace):
+                yield trace
+        except BaseException as e:
+            error = str(e) or type(e).__name__
+
+            raise
+        finally:
+            self.finish(trace, error)
+
+    def summary(self) -> dict[str, dict]:
+        """
+        Aggregate the traces per domain.
+
+        Returns:
+            {domain: {"links", "duration", "stages", "browser_time", "bytes_fetched", "document_bytes"}},
+            where each measurement is summarized by its percentiles, maximum and total
+        """
+        by_domain = defaultdict(list)
+        for trace in self.traces:
+            by_domain[trace.domain].append(trace)
+
+        summary = {}
+        for domain, traces in by_domain.items():
+            stages = defaultdict(list)
+            for trace in traces:
+                for name, seconds in trace.stages.items():
+                    stages[name].append(seconds)
+
+            summary[domain] = {
+                "links": len(traces),
+                "duration": _distribution([trace.duration for trace in traces]),
+                "stages": {name: _distribution(values) for name, values in stages.items()},
+                "browser_time": _distribution([trace.browser_time for trace in traces]),
+                "bytes_fetched": _distribution([trace.bytes_fetched for trace in traces]),
+                "document_bytes": _distribution([trace.document_bytes for trace in traces if trace.document_bytes]),
+            }
+
+        return summary
+
+
+def get_tracer() -> CrawlTracer:
+    """Return the active tracer, or a throwaway one when the crawl is not being traced."""
+
+    return _current_tracer.get() or CrawlTracer()
+
+
+@contextmanager
+def use_trace(trace: CrawlTrace | None) -> Iterator[CrawlTrace | None]:
+    """Record stages in this context on `trace`. None keeps the current trace."""
+
+    if trace is None:
+        yield _current_trace.get()
+
+        return
+
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def stage(name: str, browser: bool = False) -> Iterator[None]:
+    """
+    Time the block as stage `name` of the current trace.
+
+    Args:
+        name: One of fetch, render, parse, transform, save
+        browser: Whether the block drives a browser
+    """
+    trace = _current_trace.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if trace is not None:
+            trace.add_stage(name, time.perf_counter() - start, browser=browser)
+
+
+def record_bytes(size: int) -> None:
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.bytes_fetched += size
+
+
+def record_document(document: NoSQLBaseDocument, trace: CrawlTrace | None = None) -> None:
+    """Record the stored size of `document`, measured on what was written; call it after the write."""
+
+    trace = trace or _current_trace.get()
+    if trace is not None:
+        trace.document_bytes = document.get_stored_size() or 0
+
+
+def _distribution(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {}
+
+    values = sorted(values)
+    # Nearest-rank percentiles
+    distribution = {f"p{p}": round(values[max(0, math.ceil(len(values) * p / 100) - 1)], 4) for p in PERCENTILES}
+    distribution["max"] = round(values[-1], 4)
+    distribution["total"] = round(sum(values), 4)
+
+    return distribution
@@ -1,4 +1,3 @@
-import time
 from typing import Dict, List
 
 from bs4 import BeautifulSoup
@@ -11,6 +10,7 @@ from llm_engineering.domain.exceptions import ImproperlyConfigured
 from llm_engineering.settings import settings
 
 from .base import BaseSeleniumCrawler
+from .instrumentation import stage
 
 
 class LinkedInCrawler(BaseSeleniumCrawler):
@@ -30,7 +30,7 @@ class LinkedInCrawler(BaseSeleniumCrawler):
                 "As LinkedIn has updated its security measures, the login() method is no longer supported."
             )
 
-        self.driver.get("https://www.linkedin.com/login")
+        self.navigate("https://www.linkedin.com/login")
         if not settings.LINKEDIN_USERNAME or not settings.LINKEDIN_PASSWORD:
             raise ImproperlyConfigured(
                 "LinkedIn scraper requires the {LINKEDIN_USERNAME} and {LINKEDIN_PASSWORD} settings."
@@ -55,47 +55,46 @@ class LinkedInCrawler(BaseSeleniumCrawler):
 
         logger.info(f"Starting scrapping data for profile: {link}")
 
-        self.login()
-
-        soup = self._get_page_content(link)
-
-        data = {  # noqa
-            "Name": self._scrape_section(soup, "h1", class_="text-heading-xlarge"),
-            "About": self._scrape_section(soup, "div", class_="display-flex ph5 pv3"),
-            "Main Page": self._scrape_section(soup, "div", {"id": "main-content"}),
-            "Experience": self._scrape_experience(link),
-            "Education": self._scrape_education(link),
-        }
-
-        self.driver.get(link)
-        time.sleep(5)
-        button = self.driver.find_element(
-            By.CSS_SELECTOR, ".app-aware-link.profile-creator-shared-content-view__footer-action"
-        )
-        button.click()
-
-        # Scrolling and scraping posts
-        self.scroll_page()
-        soup = BeautifulSoup(self.driver.page_source, "html.parser")
-        post_elements = soup.find_all(
-            "div",
-            class_="update-components-text relative update-components-update-v2__commentary",
-        )
-        buttons = soup.find_all("button", class_="update-components-image__image-link")
-        post_images = self._extract_image_urls(buttons)
-
-        posts = self._extract_posts(post_elements, post_images)
-        logger.info(f"Found {len(posts)} posts for profile: {link}")
+        with self.browser():
+            self.login()
+
+            soup = self._get_page_content(link)
+
+            data = {  # noqa
+                "Name": self._scrape_section(soup, "h1", class_="text-heading-xlarge"),
+                "About": self._scrape_section(soup, "div", class_="display-flex ph5 pv3"),
+                "Main Page": self._scrape_section(soup, "div", {"id": "main-content"}),
+                "Experience": self._scrape_experience(link),
+                "Education": self._scrape_education(link),
+            }
+
+            footer_action = ".app-aware-link.profile-creator-shared-content-view__footer-action"
+            self.navigate(link)
+            self.wait_until_ready(selector=footer_action)
+            button = self.driver.find_element(By.CSS_SELECTOR, footer_action)
+            button.click()
+
+            # Scrolling and scraping posts
+            self.scroll_page()
+            soup = self.parse_page()
+            post_elements = soup.find_all(
+                "div",
+                class_="update-components-text relative update-components-update-v2__commentary",
+            )
+            buttons = soup.find_all("button", class_="update-components-image__image-link")
+            post_images = self._extract_image_urls(buttons)
 
-        self.driver.close()
+            posts = self._extract_posts(post_elements, post_images)
+            logger.info(f"Found {len(posts)} posts for profile: {link}")
 
         user = kwargs["user"]
-        self.model.bulk_insert(
-            [
-                PostDocument(platform="linkedin", content=post, author_id=user.id, author_full_name=user.full_name)
-                for post in posts
-            ]
-        )
+        with stage("save"):
+            self.model.bulk_insert(
+                [
+                    PostDocument(platform="linkedin", content=post, author_id=user.id, author_full_name=user.full_name)
+                    for post in posts
+                ]
+            )
 
         logger.info(f"Finished scrapping data for profile: {link}")
 
@@ -130,10 +129,10 @@ class LinkedInCrawler(BaseSeleniumCrawler):
     def _get_page_content(self, url: str) -> BeautifulSoup:
         """Retrieve the page content of a given URL."""
 
-        self.driver.get(url)
-        time.sleep(5)
+        self.navigate(url)
+        self.wait_until_ready()
 
-        return BeautifulSoup(self.driver.page_source, "html.parser")
+        return self.parse_page()
 
     def _extract_posts(self, post_elements: List[Tag], post_images: Dict[str, str]) -> Dict[str, Dict[str, str]]:
         """
@@ -160,17 +159,13 @@ class LinkedInCrawler(BaseSeleniumCrawler):
     def _scrape_experience(self, profile_url: str) -> str:
         """Scrapes the Experience section of the LinkedIn profile."""
 
-        self.driver.get(profile_url + "/details/experience/")
-        time.sleep(5)
-        soup = BeautifulSoup(self.driver.page_source, "html.parser")
+        soup = self._get_page_content(profile_url + "/details/experience/")
         experience_content = soup.find("section", {"id": "experience-section"})
 
         return experience_content.get_text(strip=True) if experience_content else ""
 
     def _scrape_education(self, profile_url: str) -> str:
-        self.driver.get(profile_url + "/details/education/")
-        time.sleep(5)
-        soup = BeautifulSoup(self.driver.page_source, "html.parser")
+        soup = self._get_page_content(profile_url + "/details/education/")
         education_content = soup.find("section", {"id": "education-section"})
 
         return education_content.get_text(strip=True) if education_content else ""
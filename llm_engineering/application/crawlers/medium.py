@@ -1,9 +1,17 @@
+import requests
 from bs4 import BeautifulSoup
+from langchain_community.document_loaders.async_html import default_header_template
 from loguru import logger
 
 from llm_engineering.domain.documents import ArticleDocument
+from llm_engineering.settings import settings
 
 from .base import BaseSeleniumCrawler
+from .html_parsing import parse_html
+from .instrumentation import record_bytes, record_document, stage
+from .rate_limit import raise_for_retryable_status, rate_limiter
+
+TITLE_SELECTOR = "h1.pw-post-title"
 
 class MediumCrawler(BaseSeleniumCrawler):
     model = ArticleDocument
@@ -11,7 +19,7 @@ class MediumCrawler(BaseSeleniumCrawler):
     def set_extra_driver_options(self, options) -> None:
         options.add_argument(r"--profile-directory=Profile 2")
 
-    def extract(self, link:str, **kwargs) -> None:
+    def extract(self, link:str, **kwargs) -> dict | None:
         old_model = self.model.find(link=link)
         if old_model is not None:
             logger.info(f"Article already exists in the database: {link}")
@@ -20,20 +28,26 @@ class MediumCrawler(BaseSeleniumCrawler):
         
         logger.info(f"Starting scrapping Medium article: {link}")
 
-        self.driver.get(link)
-        self.scroll_page()
+        # Medium usually renders the article server-side, so a plain HTTP fetch is enough
+        tier = "http"
+        soup = self._fetch_static(link)
+        if soup is None:
+            tier = "browser"
+            with self.browser():
+                self.navigate(link)
+                self.scroll_page()
 
-        soupo = BeautifulSoup(self, driver.page_source, "html.parser")
-        title = soup.find_all("h1", class_="pw-post-title")
-        subtitle = soup.find_all("h2", class_="pw-subtitle-paragraph")
+                soup = self.parse_page()
 
-        data = {
-            "Title": title[0].string if title else None,
-            "Subtitle": subtitle[0].string if subtitle else None,
-            "Content": soup.get_text(),
-        }
+        with stage("transform"):
+            title = soup.select(TITLE_SELECTOR)
+            subtitle = soup.find_all("h2", class_="pw-subtitle-paragraph")
 
-        self.driver.close()
+            data = {
+                "Title": title[0].string if title else None,
+                "Subtitle": subtitle[0].string if subtitle else None,
+                "Content": soup.get_text(),
+            }
 
         user = kwargs["user"]
         instance = self.model(
@@ -44,8 +58,47 @@ class MediumCrawler(BaseSeleniumCrawler):
             author_full_name=user.full_name,
 
         )
-        instance.save()
+        with stage("save"):
+            instance.save()
+        record_document(instance)
+
+        logger.info(f"Successfully scraped and saved article {link} ({tier}) 'bub'.")
+
+        return {"tier": tier}
+
+    def _fetch_static(self, link: str) -> BeautifulSoup | None:
+        """
+        Fetch the article without a browser.
+
+        Throttling and server errors are retried with backoff and raised if they
+        persist, since the browser would hit the same limits.
+
+        Returns:
+            The parsed page, or None if the request failed or the page lacks
+            the article title and needs JavaScript rendering
+        """
+        def get() -> requests.Response:
+            response = requests.get(link, headers=default_header_template, timeout=settings.MEDIUM_HTTP_TIMEOUT)
+            raise_for_retryable_status(link, response.status_code, response.headers)
+            response.raise_for_status()
+
+            return response
+
+        try:
+            with stage("fetch"):
+                response = rate_limiter.call(link, get, retry_on=(requests.ConnectionError, requests.Timeout))
+        except requests.RequestException as e:
+            logger.debug(f"Plain HTTP fetch failed, falling back to the browser: {e!s}")
+
+            return None
+
+        record_bytes(len(response.content))
+        soup = parse_html(response.text)
+        if soup.select_one(TITLE_SELECTOR) is None:
+            logger.debug(f"Article title missing from the static page, falling back to the browser: {link}")
+
+            return None
 
-        logger.info(f"Successfully scraped and saved article {link} 'bub'.")
+        return soup
 
         
\ No newline at end of file
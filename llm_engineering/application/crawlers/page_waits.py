@@ -0,0 +1,164 @@
+"""
+Adaptive Page Waits
+
+Helpers that block only until a page is actually ready instead of sleeping a
+fixed amount of time. Readiness is decided by the document load state, a CSS
+selector appearing, the page staying idle for a quiet period (no DOM mutations
+and no network activity), and the document height settling. Every wait is bounded by a timeout and returns
+instead of raising when it expires, since a slow page is usually still usable.
+"""
+
+import time
+from typing import Callable
+
+from loguru import logger
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from llm_engineering.settings import settings
+
+POLL_INTERVAL = 0.1
+
+# Requests in flight longer than this (long polling, streams) no longer count as page activity
+LONG_REQUEST_MS = 3000
+
+# Installs activity observers on first call and returns the milliseconds the page has been idle: no DOM
+# mutation, no resource (image, script, ...) finishing to load and no fetch/XHR in flight. Lazily loaded
+# content usually arrives over the network well after the scroll that triggered it, so the network
+# counts as activity even while the DOM is still unchanged.
+_MS_SINCE_LAST_ACTIVITY = """
+if (!window.__crawlerActivity) {
+    const activity = window.__crawlerActivity = {last: performance.now(), inflight: new Map(), next: 0};
+    const touch = () => { activity.last = performance.now(); };
+    const track = () => {
+        const id = activity.next++;
+        activity.inflight.set(id, performance.now());
+        touch();
+        return () => { activity.inflight.delete(id); touch(); };
+    };
+
+    new MutationObserver(touch).observe(
+        document, {childList: true, subtree: true, attributes: true, characterData: true}
+    );
+    if (window.PerformanceObserver) {
+        new PerformanceObserver(touch).observe({type: "resource"});
+    }
+
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function (...args) {
+        this.addEventListener("loadend", track(), {once: true});
+        return send.apply(this, args);
+    };
+    const fetch = window.fetch;
+    window.fetch = function (...args) {
+        const done = track();
+        return fetch.apply(this, args).finally(done);
+    };
+}
+
+const activity = window.__crawlerActivity;
+const now = performance.now();
+for (const started of activity.inflight.values()) {
+    if (now - started < %(long_request_ms)d) {
+        return 0;
+    }
+}
+return now - activity.last;
+""" % {"long_request_ms": LONG_REQUEST_MS}
+
+
+def wait_until_ready(
+    driver: WebDriver,
+    selector: str | None = None,
+    timeout: float | None = None,
+    quiet_period: float | None = None,
+) -> bool:
+    """
+    Wait until the current page is loaded and has gone idle.
+
+    Args:
+        driver: Browser showing the page
+        selector: CSS selector that must match at least one element
+        timeout: Maximum seconds to wait
+        quiet_period: Seconds without DOM mutations or network activity after which the page counts as settled
+
+    Returns:
+        True if the page became ready, False if the timeout expired first
+    """
+    timeout = settings.SELENIUM_PAGE_READY_TIMEOUT if timeout is None else timeout
+    quiet_period = settings.SELENIUM_QUIET_PERIOD if quiet_period is None else quiet_period
+    deadline = time.monotonic() + timeout
+
+    def is_ready() -> bool:
+        if driver.execute_script("return document.readyState") != "complete":
+            return False
+        if selector and not driver.find_elements(By.CSS_SELECTOR, selector):
+            return False
+
+        return driver.execute_script(_MS_SINCE_LAST_ACTIVITY) >= quiet_period * 1000
+
+    ready = _poll(is_ready, deadline)
+    if not ready:
+        logger.debug(f"Page not ready after {timeout:.1f}s: {driver.current_url}")
+
+    return ready
+
+
+def wait_for_height_to_settle(
+    driver: WebDriver,
+    timeout: float | None = None,
+    quiet_period: float | None = None,
+) -> int:
+    """
+    Wait until the document height has been stable and the page idle for a quiet period.
+
+    Used after scrolling: lazily loaded content grows the page, and the wait
+    ends as soon as it stops growing rather than after a fixed delay.
+
+    Args:
+        driver: Browser showing the page
+        timeout: Maximum seconds to wait
+        quiet_period: Seconds the height must stay unchanged and the page idle
+
+    Returns:
+        The document height when the wait ended
+    """
+    timeout = settings.SELENIUM_SCROLL_TIMEOUT if timeout is None else timeout
+    quiet_period = settings.SELENIUM_QUIET_PERIOD if quiet_period is None else quiet_period
+    deadline = time.monotonic() + timeout
+
+    state = {"height": _document_height(driver), "since": time.monotonic()}
+
+    def is_settled() -> bool:
+        height = _document_height(driver)
+        now = time.monotonic()
+        if height != state["height"]:
+            state["height"], state["since"] = height, now
+
+            return False
+
+        return (
+            now - state["since"] >= quiet_period
+            and driver.execute_script(_MS_SINCE_LAST_ACTIVITY) >= quiet_period * 1000
+        )
+
+    driver.execute_script(_MS_SINCE_LAST_ACTIVITY)  # Start observing before the first check
+    _poll(is_settled, deadline)
+
+    return state["height"]
+
+
+def _document_height(driver: WebDriver) -> int:
+    return driver.execute_script("return document.body.scrollHeight")
+
+
+def _poll(condition: Callable[[], bool], deadline: float) -> bool:
+    while True:
+        if condition():
+            return True
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+
+        time.sleep(min(POLL_INTERVAL, remaining))
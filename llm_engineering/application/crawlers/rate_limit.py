@@ -0,0 +1,231 @@
+"""
+Per-Domain Rate Limiting
+
+Every request a crawler sends to a domain first takes a token from that
+domain's bucket, so concurrent crawls share one request budget per domain.
+Requests failing with 429, 5xx or a connection error are retried with
+jittered exponential backoff. A Retry-After header pauses the whole domain,
+not only the request that received it.
+"""
+
+import asyncio
+import itertools
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Mapping, TypeVar
+from urllib.parse import urlparse
+
+from loguru import logger
+
+from llm_engineering.settings import settings
+
+T = TypeVar("T")
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class RetryableError(Exception):
+    """A request failed in a way that is worth retrying, e.g. 429 Too Many Requests."""
+
+    def __init__(self, message: str, status: int | None = None, retry_after: float | None = None) -> None:
+        super().__init__(message)
+
+        self.status = status
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled at `rate` tokens per second, holding at most `burst` tokens.
+
+    Tokens are reserved rather than waited for under the lock: `reserve` takes
+    a token, possibly going into debt, and returns how long the caller must
+    wait before using it. The same bucket can then serve threads and asyncio
+    tasks alike.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()  # Lies in the future while the bucket is paused
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return the seconds to wait before using it."""
+
+        with self._lock:
+            now = self._refill()
+            self._tokens -= 1
+
+            return max(0.0, self._updated - now) + max(0.0, -self._tokens / self._rate)
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for `seconds`, then resume at one request at a time."""
+
+        with self._lock:
+            now = self._refill()
+            self._tokens = min(self._tokens, 1.0)
+            self._updated = max(self._updated, now + seconds)
+
+    def _refill(self) -> float:
+        now = time.monotonic()
+        if now > self._updated:
+            self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+
+        return now
+
+
+class RateLimiter:
+    """Token buckets and retry policy shared by every crawler, keyed by domain."""
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        burst: int | None = None,
+        domain_rates: Mapping[str, float] | None = None,
+        max_attempts: int | None = None,
+        backoff: float | None = None,
+        max_backoff: float | None = None,
+    ) -> None:
+        """
+        Args:
+            rate: Requests per second allowed per domain
+            burst: Requests a domain may receive at once after being idle
+            domain_rates: Per-domain overrides of `rate`
+            max_attempts: Tries of a request before its error is raised
+            backoff: Seconds before the first retry, doubled per try and jittered
+            max_backoff: Longest wait for a retry; a longer Retry-After fails the request
+        """
+        self._rate = rate or settings.CRAWL_RATE_LIMIT
+        self._burst = burst or settings.CRAWL_RATE_BURST
+        self._domain_rates = settings.CRAWL_DOMAIN_RATE_LIMITS if domain_rates is None else domain_rates
+        self._max_attempts = max_attempts or settings.CRAWL_FETCH_ATTEMPTS
+        self._backoff = settings.CRAWL_FETCH_BACKOFF if backoff is None else backoff
+        self._max_backoff = settings.CRAWL_FETCH_BACKOFF_MAX if max_backoff is None else max_backoff
+
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        domain = get_domain(url)
+        with self._lock:
+            if domain not in self._buckets:
+                self._buckets[domain] = TokenBucket(self._domain_rates.get(domain, self._rate), self._burst)
+
+            return self._buckets[domain]
+
+    def acquire(self, url: str) -> None:
+        """Block until a request to the domain of `url` is allowed."""
+
+        time.sleep(self.bucket(url).reserve())
+
+    async def acquire_async(self, url: str) -> None:
+        await asyncio.sleep(self.bucket(url).reserve())
+
+    def call(self, url: str, request: Callable[[], T], retry_on: tuple[type[BaseException], ...] = ()) -> T:
+        """
+        Send `request` within the rate limit of the domain of `url`, retrying transient failures.
+
+        Args:
+            url: URL the request is sent to
+            request: Sends the request; raises RetryableError (or one of `retry_on`) on a transient failure
+            retry_on: Further exception types to retry, e.g. connection errors of the HTTP client
+
+        Returns:
+            The result of the first successful try
+        """
+        for attempt in itertools.count():
+            self.acquire(url)
+            try:
+                return request()
+            except (RetryableError, *retry_on) as e:
+                delay = self._retry_delay(url, attempt, e)
+                if delay is None:
+                    raise
+
+            time.sleep(delay)
+
+    async def call_async(
+        self, url: str, request: Callable[[], Awaitable[T]], retry_on: tuple[type[BaseException], ...] = ()
+    ) -> T:
+        """Same as `call`, for coroutines."""
+
+        for attempt in itertools.count():
+            await self.acquire_async(url)
+            try:
+                return await request()
+            except (RetryableError, *retry_on) as e:
+                delay = self._retry_delay(url, attempt, e)
+                if delay is None:
+                    raise
+
+            await asyncio.sleep(delay)
+
+    def _retry_delay(self, url: str, attempt: int, error: BaseException) -> float | None:
+        """Return the seconds to wait before retrying, or None to give up."""
+
+        if attempt + 1 >= self._max_attempts:
+            return None
+
+        # Full jitter keeps concurrent crawls that failed together from retrying together
+        delay = random.uniform(0, min(self._max_backoff, self._backoff * 2**attempt))
+
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None and retry_after > self._max_backoff:
+            logger.warning(f"{url} asks to retry in {retry_after:.0f}s, longer than we wait: {error!s}")
+
+            return None
+
+        # The domain is throttling us: hold back every request to it, not only this one
+        if retry_after is not None or getattr(error, "status", None) == 429:
+            pause = retry_after if retry_after is not None else delay
+            logger.warning(f"Pausing requests to {get_domain(url)} for {pause:.1f}s.")
+
+            self.bucket(url).pause(pause)
+            delay = random.uniform(0, self._backoff)
+
+        logger.warning(f"Retrying {url} in {delay:.1f}s (attempt {attempt + 2}/{self._max_attempts}): {error!s}")
+
+        return delay
+
+
+def get_domain(url: str) -> str:
+    return urlparse(url).netloc.lower().removeprefix("www.")
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header, given either in seconds or as an HTTP date."""
+
+    if not value:
+        return None
+
+    value = value.strip()
+    if re.fullmatch(r"\d+", value):
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def raise_for_retryable_status(url: str, status: int, headers: Mapping[str, str]) -> None:
+    """Raise RetryableError for throttling and server errors, carrying the Retry-After delay if there is one."""
+
+    if status in RETRYABLE_STATUSES:
+        raise RetryableError(
+            f"HTTP {status} from {url}", status=status, retry_after=parse_retry_after(headers.get("Retry-After"))
+        )
+
+
+rate_limiter = RateLimiter()
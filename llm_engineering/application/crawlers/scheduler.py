@@ -0,0 +1,155 @@
+"""
+Concurrent Crawl Scheduler
+
+Runs crawls concurrently under a global worker cap, while keeping each domain
+within its own concurrency limit and a politeness delay between requests.
+"""
+
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Iterator
+from urllib.parse import urlparse
+
+from loguru import logger
+from pydantic import BaseModel, Field
+
+from llm_engineering.settings import settings
+
+
+class CrawlResult(BaseModel):
+    """Outcome of crawling a single link."""
+
+    link: str
+    domain: str
+    successful: bool
+    error: str | None = None
+    duration: float = 0.0
+    info: dict = Field(default_factory=dict)  # Details returned by the crawl, e.g. the fetch tier
+
+
+class CrawlScheduler:
+    """
+    Schedules crawls so that slow domains only hold up their own links.
+
+    Links are queued per domain and only handed to the worker pool when their
+    domain has a free slot and its politeness delay has elapsed, so a backlog
+    of GitHub clones never blocks Medium pages from running next to them.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        per_domain_limit: int | None = None,
+        domain_limits: dict[str, int] | None = None,
+        politeness_delay: float | None = None,
+        link_timeout: float | None = None,
+        poll_interval: float = 0.1,
+    ) -> None:
+        """
+        Args:
+            max_workers: Maximum number of links crawled at the same time
+            per_domain_limit: Maximum number of links crawled at the same time per domain
+            domain_limits: Per-domain overrides of `per_domain_limit`
+            politeness_delay: Minimum seconds between two crawl starts on the same domain
+            link_timeout: Seconds after which a running crawl is reported as failed
+            poll_interval: Seconds between two scheduling passes
+        """
+        self._max_workers = max_workers or settings.CRAWL_MAX_WORKERS
+        self._per_domain_limit = per_domain_limit or settings.CRAWL_PER_DOMAIN_CONCURRENCY
+        self._domain_limits = settings.CRAWL_DOMAIN_CONCURRENCY if domain_limits is None else domain_limits
+        self._politeness_delay = settings.CRAWL_POLITENESS_DELAY if politeness_delay is None else politeness_delay
+        self._link_timeout = link_timeout or settings.CRAWL_LINK_TIMEOUT
+        self._poll_interval = poll_interval
+
+    def run(self, links: list[str], crawl: Callable[[str], dict | None]) -> Iterator[CrawlResult]:
+        """
+        Crawl every link with `crawl` and yield results in completion order.
+
+        `crawl` signals failure by raising and may return a dict of details,
+        exposed as `CrawlResult.info`. A crawl still running after the
+        link timeout is reported as failed; its thread cannot be killed, so it
+        is abandoned and its result ignored.
+        """
+        queues = defaultdict(deque)
+        for link in links:
+            queues[urlparse(link).netloc].append(link)
+
+        in_flight: dict[Future, tuple[str, str, dict]] = {}
+        active = Counter()
+        last_started = {}
+
+        executor = ThreadPoolExecutor(max_workers=self._max_workers)
+        try:
+            while queues or in_flight:
+                self._schedule(executor, crawl, queues, in_flight, active, last_started)
+
+                if in_flight:
+                    done, _ = wait(in_flight, timeout=self._poll_interval, return_when=FIRST_COMPLETED)
+                else:
+                    # Every remaining domain is waiting for its politeness delay.
+                    done = set()
+                    time.sleep(self._poll_interval)
+
+                for future in done:
+                    link, domain, timing = in_flight.pop(future)
+                    active[domain] -= 1
+
+                    yield self._to_result(future, link, domain, timing)
+
+                yield from self._expire(in_flight, active)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _schedule(self, executor, crawl, queues, in_flight, active, last_started) -> None:
+        now = time.monotonic()
+        for domain in list(queues):
+            queue = queues[domain]
+            while (
+                queue
+                and len(in_flight) < self._max_workers
+                and active[domain] < self._domain_limits.get(domain, self._per_domain_limit)
+                and now - last_started.get(domain, float("-inf")) >= self._politeness_delay
+            ):
+                link = queue.popleft()
+                timing = {}
+                in_flight[executor.submit(self._timed, crawl, link, timing)] = (link, domain, timing)
+                active[domain] += 1
+                last_started[domain] = now
+
+            if not queue:
+                del queues[domain]
+
+    @staticmethod
+    def _timed(crawl: Callable[[str], dict | None], link: str, timing: dict) -> dict | None:
+        timing["started"] = time.monotonic()
+        try:
+            return crawl(link)
+        finally:
+            timing["finished"] = time.monotonic()
+
+    def _expire(self, in_flight, active) -> Iterator[CrawlResult]:
+        now = time.monotonic()
+        for future, (link, domain, timing) in list(in_flight.items()):
+            started = timing.get("started")
+            if started is None or now - started < self._link_timeout:
+                continue
+
+            in_flight.pop(future)
+            active[domain] -= 1
+            logger.error(f"Crawling {link} timed out after {self._link_timeout:.0f}s.")
+
+            yield CrawlResult(
+                link=link, domain=domain, successful=False, error="Timed out", duration=now - started
+            )
+
+    @staticmethod
+    def _to_result(future: Future, link: str, domain: str, timing: dict) -> CrawlResult:
+        duration = timing.get("finished", time.monotonic()) - timing.get("started", time.monotonic())
+        error = future.exception()
+        if error is not None:
+            logger.error(f"An error occurred while crawling {link}: {error!s}")
+
+            return CrawlResult(link=link, domain=domain, successful=False, error=str(error), duration=duration)
+
+        return CrawlResult(link=link, domain=domain, successful=True, duration=duration, info=future.result() or {})
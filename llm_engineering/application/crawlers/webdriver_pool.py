@@ -0,0 +1,287 @@
+"""
+WebDriver Pool
+
+Keeps a bounded set of headless Chrome drivers alive across crawls, so a
+Selenium crawler checks a browser out instead of launching its own. One pool
+is shared by the whole process, so `SELENIUM_POOL_SIZE` bounds every browser
+it runs, whatever crawler launched them.
+"""
+
+import shutil
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from tempfile import mkdtemp
+from typing import Callable, Iterator
+
+from loguru import logger
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from llm_engineering.settings import settings
+
+
+class _PooledDriver:
+    def __init__(self, driver: WebDriver, slot: int, profile: str | None, temp_dirs: list[str]) -> None:
+        self.driver = driver
+        self.slot = slot
+        self.profile = profile
+        self.temp_dirs = temp_dirs
+        self.uses = 0
+
+
+class WebDriverPool:
+    """
+    Bounded pool of Chrome drivers.
+
+    - At most `size` browsers exist at once; extra checkouts wait for one to be returned
+    - Browsers are launched for a profile (e.g. a crawler class and its Chrome
+      options) and only handed out to checkouts of the same profile. When every
+      slot is taken, an idle browser of another profile is quit to make room
+    - Idle drivers are health-checked before being handed out and replaced if dead
+    - Users of a profile (e.g. crawler instances) register with `add_user`; the
+      idle browsers of a profile are quit when its last user calls `remove_user`
+    - A driver is recycled after `max_uses` checkouts to bound memory growth
+    - Each browser gets its own temporary profile and, if configured, its own
+      remote debugging port (base port + slot), so browsers never collide
+    """
+
+    def __init__(self, size: int | None = None, max_uses: int | None = None) -> None:
+        """
+        Args:
+            size: Maximum number of browsers alive at once
+            max_uses: Number of checkouts after which a browser is restarted
+        """
+        self._size = size or settings.SELENIUM_POOL_SIZE
+        self._max_uses = max_uses or settings.SELENIUM_DRIVER_MAX_USES
+
+        self._lock = threading.Lock()
+        self._slot_freed = threading.Condition(self._lock)
+        self._available = threading.BoundedSemaphore(self._size)
+        self._idle: defaultdict[str | None, deque[_PooledDriver]] = defaultdict(deque)
+        self._free_slots = deque(range(self._size))
+        self._users: Counter[str | None] = Counter()
+        self._closed = False
+
+    @contextmanager
+    def checkout(
+        self, profile: str | None = None, configure_options: Callable[[Options], None] | None = None
+    ) -> Iterator[WebDriver]:
+        """
+        Borrow a healthy driver for the duration of the `with` block.
+
+        Args:
+            profile: Browsers are only shared between checkouts of the same profile
+            configure_options: Hook adding profile-specific Chrome options when a browser is launched
+        """
+        deadline = time.monotonic() + settings.SELENIUM_CHECKOUT_TIMEOUT
+        if not self._available.acquire(timeout=settings.SELENIUM_CHECKOUT_TIMEOUT):
+            raise TimeoutError("Timed out waiting for a free browser in the WebDriver pool.")
+
+        try:
+            pooled = self._acquire(profile, configure_options, deadline)
+        except Exception:
+            self._available.release()
+
+            raise
+
+        try:
+            yield pooled.driver
+        finally:
+            self._release(pooled)
+            self._available.release()
+
+    def add_user(self, profile: str | None = None) -> None:
+        """Register a user of `profile`, whose idle browsers are kept until every user is removed."""
+        with self._lock:
+            self._users[profile] += 1
+
+    def remove_user(self, profile: str | None = None) -> None:
+        """Unregister a user of `profile`, quitting its idle browsers if it was the last one."""
+        with self._lock:
+            self._users[profile] -= 1
+            last_user = self._users[profile] <= 0
+            if last_user:
+                del self._users[profile]
+
+        if last_user:
+            self.close_idle(profile)
+
+    def close_idle(self, profile: str | None = None) -> None:
+        """Quit the idle browsers of `profile`. The pool stays usable."""
+        with self._lock:
+            idle = list(self._idle.pop(profile, ()))
+
+        for pooled in idle:
+            self._quit(pooled)
+
+    def close(self) -> None:
+        """Quit every idle browser. Browsers still checked out are quit when they are returned."""
+        with self._lock:
+            self._closed = True
+            idle = [pooled for drivers in self._idle.values() for pooled in drivers]
+            self._idle.clear()
+
+        for pooled in idle:
+            self._quit(pooled)
+
+    def _acquire(
+        self, profile: str | None, configure_options: Callable[[Options], None] | None, deadline: float
+    ) -> _PooledDriver:
+        while True:
+            pooled, evicted, slot = self._take(profile, deadline)
+
+            if pooled is not None:
+                if self._is_healthy(pooled.driver):
+                    return pooled
+
+                logger.warning("Discarding an unresponsive browser from the WebDriver pool.")
+                self._quit(pooled)
+
+                continue
+
+            if evicted is not None:
+                # Reuse the slot of the evicted browser, so no other checkout can take it meanwhile
+                self._quit(evicted, free_slot=False)
+                slot = evicted.slot
+
+            try:
+                return self._launch(slot, profile, configure_options)
+            except Exception:
+                self._free_slot(slot)
+
+                raise
+
+    def _take(self, profile: str | None, deadline: float) -> tuple[_PooledDriver | None, _PooledDriver | None, int]:
+        """Return an idle driver of `profile`, else an idle driver of another profile to evict, else a free slot."""
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise RuntimeError("The WebDriver pool is closed.")
+
+                if self._idle.get(profile):
+                    return self._idle[profile].popleft(), None, -1
+                if self._free_slots:
+                    return None, None, self._free_slots.popleft()
+                for drivers in self._idle.values():
+                    if drivers:
+                        return None, drivers.popleft(), -1
+
+                # Every slot belongs to a browser being quit; wait for it to be freed
+                if not self._slot_freed.wait(timeout=max(0.0, deadline - time.monotonic())):
+                    raise TimeoutError("Timed out waiting for a free browser in the WebDriver pool.")
+
+    def _release(self, pooled: _PooledDriver) -> None:
+        pooled.uses += 1
+
+        with self._lock:
+            keep = not self._closed and pooled.uses < self._max_uses
+            if keep:
+                self._idle[pooled.profile].append(pooled)
+                self._slot_freed.notify()
+
+        if not keep:
+            self._quit(pooled)
+
+    def _launch(
+        self, slot: int, profile: str | None, configure_options: Callable[[Options], None] | None
+    ) -> _PooledDriver:
+        options = webdriver.ChromeOptions()
+
+        # Core options for stability
+        options.add_argument("--no-sandbox")
+        options.add_argument("--headless=new")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--log-level=3")
+
+        # Disable popups and notifications
+        options.add_argument("--disable-popup-blocking")
+        options.add_argument("--disable-notifications")
+        options.add_argument("--disable-extensions")
+
+        # Performance and security options
+        options.add_argument("--disable-background-networking")
+        options.add_argument("--ignore-certificate-errors")
+
+        # Every browser gets its own temporary directories
+        temp_dirs = [mkdtemp(), mkdtemp(), mkdtemp()]
+        options.add_argument(f"--user-data-dir={temp_dirs[0]}")
+        options.add_argument(f"--data-path={temp_dirs[1]}")
+        options.add_argument(f"--disk-cache-dir={temp_dirs[2]}")
+
+        # 0 lets ChromeDriver pick a free port; a fixed base port gives each slot its own port
+        if settings.SELENIUM_REMOTE_DEBUGGING_PORT:
+            options.add_argument(f"--remote-debugging-port={settings.SELENIUM_REMOTE_DEBUGGING_PORT + slot}")
+
+        if configure_options is not None:
+            configure_options(options)
+
+        try:
+            driver = webdriver.Chrome(options=options)
+        except Exception:
+            self._remove_temp_dirs(temp_dirs)
+
+            raise
+
+        logger.info(f"Launched {profile or 'default'} browser in WebDriver pool slot {slot}.")
+
+        return _PooledDriver(driver, slot=slot, profile=profile, temp_dirs=temp_dirs)
+
+    def _quit(self, pooled: _PooledDriver, free_slot: bool = True) -> None:
+        try:
+            pooled.driver.quit()
+        except WebDriverException:
+            pass  # The browser is already gone
+
+        self._remove_temp_dirs(pooled.temp_dirs)
+
+        if free_slot:
+            self._free_slot(pooled.slot)
+
+    def _free_slot(self, slot: int) -> None:
+        with self._lock:
+            self._free_slots.append(slot)
+            self._slot_freed.notify()
+
+    @staticmethod
+    def _is_healthy(driver: WebDriver) -> bool:
+        try:
+            driver.execute_script("return 1")
+        except WebDriverException:
+            return False
+
+        return True
+
+    @staticmethod
+    def _remove_temp_dirs(temp_dirs: list[str]) -> None:
+        for temp_dir in temp_dirs:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+_pool: WebDriverPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool() -> WebDriverPool:
+    """Return the browser pool of the process, creating it on first use or after `close_driver_pool`."""
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = WebDriverPool()
+
+        return _pool
+
+
+def close_driver_pool() -> None:
+    """Quit every pooled browser of the process."""
+    global _pool
+
+    with _pool_lock:
+        pool, _pool = _pool, None
+
+    if pool is not None:
+        pool.close()
@@ -0,0 +1,167 @@
+"""
+Crawl Worker
+
+Drains the crawl frontier stored in MongoDB. Each worker leases one due link
+at a time with an atomic `find_one_and_update`, crawls it with the crawler the
+dispatcher routes it to, and records the outcome. Leases expire, so a link held
+by a worker that died is picked up by another one. Any number of workers, in
+any number of processes or machines, can share the same frontier.
+
+Usage:
+    python -m llm_engineering.application.crawlers.worker --concurrency 4
+    python -m llm_engineering.application.crawlers.worker --idle-timeout 60
+"""
+
+import argparse
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Iterator
+
+from loguru import logger
+
+from llm_engineering.domain.documents import CrawlFrontierDocument, UserDocument
+from llm_engineering.settings import settings
+
+from .dispatcher import CrawlerDispatcher
+from .instrumentation import CrawlTracer
+
+
+class CrawlWorker:
+    """Leases links from the crawl frontier and crawls them until there is nothing left to do."""
+
+    def __init__(
+        self,
+        dispatcher: CrawlerDispatcher | None = None,
+        worker_id: str | None = None,
+        lease_seconds: float | None = None,
+        poll_interval: float | None = None,
+        author_id=None,
+    ) -> None:
+        """
+        Args:
+            dispatcher: Routes links to crawlers, defaults to every registered crawler
+            worker_id: Name recorded on leased links, defaults to host:pid:random
+            lease_seconds: Lease duration, renewed while a crawl is still running
+            poll_interval: Seconds to wait before asking again when nothing is due
+            author_id: Only crawl links of this author
+        """
+        self._dispatcher = dispatcher or CrawlerDispatcher.build().register_linkedin().register_medium().register_github()
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lease_seconds = lease_seconds or settings.CRAWL_LINK_TIMEOUT
+        self._poll_interval = settings.CRAWL_WORKER_POLL_INTERVAL if poll_interval is None else poll_interval
+        self._author_id = author_id
+        self._users: dict[str, UserDocument] = {}
+        # Workers run indefinitely, so traces are only exported, never kept
+        self._tracer = CrawlTracer(trace_path=settings.CRAWL_TRACE_PATH, keep_traces=False)
+
+    def run(self, max_jobs: int | None = None, idle_timeout: float | None = None) -> int:
+        """
+        Crawl leased links until `max_jobs` were processed or nothing was due for `idle_timeout` seconds.
+
+        The crawlers are reused for every link and closed when the run ends,
+        unless the dispatcher is in a session opened by the caller.
+
+        Returns:
+            The number of links processed
+        """
+        processed = 0
+        idle_since = time.monotonic()
+        with self._dispatcher.session():
+            while max_jobs is None or processed < max_jobs:
+                if self.run_once():
+                    processed += 1
+                    idle_since = time.monotonic()
+                    continue
+
+                if idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout:
+                    break
+                time.sleep(self._poll_interval)
+
+        logger.info(f"Crawl worker {self.worker_id} stopped after {processed} link(s).")
+
+        return processed
+
+    def run_once(self) -> bool:
+        """Lease and crawl one link. Returns False if no link was due."""
+
+        job = CrawlFrontierDocument.lease(self.worker_id, self._lease_seconds, author_id=self._author_id)
+        if job is None:
+            return False
+
+        logger.info(f"Worker {self.worker_id} crawling {job.link} (attempt {job.attempts}).")
+        try:
+            with self._heartbeat(job), self._dispatcher.session():
+                user = self._get_user(job.author_id)
+                crawler = self._dispatcher.get_crawler(job.link)
+                with self._tracer.trace(job.link, crawler=type(crawler).__name__):
+                    crawler.extract(link=job.link, user=user)
+        except Exception as e:
+            logger.error(f"An error occurred while crawling {job.link}: {e!s}")
+            CrawlFrontierDocument.mark_failed(job.author_id, {job.link: str(e) or type(e).__name__}, worker_id=self.worker_id)
+        else:
+            CrawlFrontierDocument.mark_done(job.author_id, [job.link], worker_id=self.worker_id)
+
+        return True
+
+    def _get_user(self, author_id) -> UserDocument:
+        key = str(author_id)
+        if key not in self._users:
+            user = UserDocument.find(_id=key)
+            if user is None:
+                raise ValueError(f"Unknown author {key}")
+            self._users[key] = user
+
+        return self._users[key]
+
+    @contextmanager
+    def _heartbeat(self, job: CrawlFrontierDocument) -> Iterator[None]:
+        """Keep renewing the lease while the crawl runs, so long crawls are not handed to another worker."""
+
+        stopped = threading.Event()
+
+        def renew() -> None:
+            while not stopped.wait(self._lease_seconds / 3):
+                if not job.renew_lease(self._lease_seconds):
+                    logger.warning(f"Worker {self.worker_id} lost the lease on {job.link}.")
+
+                    return
+
+        thread = threading.Thread(target=renew, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stopped.set()
+            thread.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=1, help="Crawl threads in this process")
+    parser.add_argument("--max-jobs", type=int, default=None, help="Stop each thread after this many links")
+    parser.add_argument("--idle-timeout", type=float, default=None, help="Stop after this many idle seconds")
+    parser.add_argument("--author-id", default=None, help="Only crawl links of this author")
+    args = parser.parse_args()
+
+    CrawlFrontierDocument.ensure_indexes()
+
+    # Worker threads share one set of crawlers; their browsers come from the process-wide pool
+    dispatcher = CrawlerDispatcher.build().register_linkedin().register_medium().register_github()
+    with dispatcher.session():
+        workers = [CrawlWorker(dispatcher=dispatcher, author_id=args.author_id) for _ in range(args.concurrency)]
+        threads = [
+            threading.Thread(target=worker.run, kwargs={"max_jobs": args.max_jobs, "idle_timeout": args.idle_timeout})
+            for worker in workers
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+
+if __name__ == "__main__":
+    main()
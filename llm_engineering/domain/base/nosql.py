@@ -1,24 +1,44 @@
 ﻿import uuid
 from abc import ABC
-from typing import Generic, Type, TypeVar
+from enum import StrEnum
+from itertools import islice
+from typing import Any, AsyncIterator, Generic, Iterable, Iterator, Type, TypeVar
 
+import bson
 from loguru import logger
-from pydantic import UUID4, BaseModel, Field
-from pymongo import errors
+from pydantic import UUID4, BaseModel, Field, PrivateAttr, SerializerFunctionWrapHandler, model_serializer
+from pymongo import IndexModel, InsertOne, ReplaceOne, ReturnDocument, UpdateOne, errors
+from pymongo.collection import Collection
 
-from llm_engineering.domain.exceptions import ImproperlyConfigured
-from llm_engineering.infrastructure.db.mongo import connection
+from llm_engineering.domain.exceptions import DatabaseError, ImproperlyConfigured
+from llm_engineering.infrastructure.db.compression import compress_value, decompress_value, is_compressed
+from llm_engineering.infrastructure.db.mongo import get_async_database, get_database
 from llm_engineering.settings import settings
 
-_database = connection[settings.DATABASE_NAME]
-
 
 T = TypeVar("T", bound="NoSQLBaseDocument")
 
+DUPLICATE_KEY_ERROR_CODE = 11000
+
+
+class WriteOutcome(StrEnum):
+    """Result of writing a single document as part of a bulk write."""
+
+    INSERTED = "inserted"
+    REPLACED = "replaced"
+    DUPLICATE = "duplicate"
+    FAILED = "failed"
+
 
 class NoSQLBaseDocument(BaseModel, Generic[T], ABC):
     id: UUID4 = Field(default_factory=uuid.uuid4)
 
+    # Compressed values of `Settings.compressed_fields`, decompressed on first attribute access.
+    _compressed_values: dict = PrivateAttr(default_factory=dict)
+    # The document as last sent to MongoDB, kept until its size is measured.
+    _written: dict | None = PrivateAttr(default=None)
+    _stored_size: int | None = PrivateAttr(default=None)
+
     def __eq__(self, value: object) -> bool:
         if not isinstance(value, self.__class__):
             return False
@@ -28,6 +48,22 @@ class NoSQLBaseDocument(BaseModel, Generic[T], ABC):
     def __hash__(self) -> int:
         return hash(self.id)
 
+    def __getattr__(self, name: str) -> Any:
+        try:
+            compressed_values = object.__getattribute__(self, "__pydantic_private__") or {}
+            compressed_values = compressed_values.get("_compressed_values", {})
+        except AttributeError:
+            compressed_values = {}
+
+        if name in compressed_values:
+            value = decompress_value(compressed_values[name])
+            self.__dict__[name] = value
+            compressed_values.pop(name, None)
+
+            return value
+
+        return super().__getattr__(name)
+
     @classmethod
     def from_mongo(cls: Type[T], data: dict) -> T:
         """Convert "_id" (str object) into "id" (UUID object)."""
@@ -36,8 +72,53 @@ class NoSQLBaseDocument(BaseModel, Generic[T], ABC):
             raise ValueError("Data is empty.")
 
         id = data.pop("_id")
+        compressed_values = cls._pop_compressed_values(data)
+        # Compressed fields are dict fields, so an empty dict passes validation until the real value is loaded.
+        placeholders = dict.fromkeys(compressed_values, {})
+
+        instance = cls(**dict(data, id=id, **placeholders))
+        instance._defer_compressed_values(compressed_values)
+
+        return instance
+
+    @classmethod
+    def from_partial_mongo(cls: Type[T], data: dict) -> T:
+        """Build an unvalidated instance from a projected document that may miss required fields.
+
+        Partial instances are meant for read-only passes (e.g. metadata); they should never be saved back.
+        """
+
+        if not data:
+            raise ValueError("Data is empty.")
+
+        id = uuid.UUID(str(data.pop("_id")))
+        compressed_values = cls._pop_compressed_values(data)
+
+        instance = cls.model_construct(**dict(data, id=id))
+        instance._defer_compressed_values(compressed_values)
+
+        return instance
+
+    @classmethod
+    def _pop_compressed_values(cls: Type[T], data: dict) -> dict:
+        return {field: data.pop(field) for field in cls.get_compressed_fields() if is_compressed(data.get(field))}
+
+    def _defer_compressed_values(self: T, compressed_values: dict) -> None:
+        for field, value in compressed_values.items():
+            self.__dict__.pop(field, None)
+            self._compressed_values[field] = value
+
+    def _load_compressed_values(self: T) -> None:
+        for field in list(self._compressed_values):
+            getattr(self, field)
 
-        return cls(**dict(data, id=id))
+    @model_serializer(mode="wrap")
+    def _serialize_with_compressed_values(self: T, handler: SerializerFunctionWrapHandler) -> dict:
+        # Deferred fields are missing from __dict__, which pydantic serializes from, so every
+        # dump (model_dump, model_dump_json, nested models) loads them first.
+        self._load_compressed_values()
+
+        return handler(self)
 
     def to_mongo(self: T, **kwargs) -> dict:
         """Convert "id" (UUID object) into "_id" (str object)."""
@@ -53,8 +134,33 @@ class NoSQLBaseDocument(BaseModel, Generic[T], ABC):
             if isinstance(value, uuid.UUID):
                 parsed[key] = str(value)
 
+        for field in self.get_compressed_fields():
+            if field in parsed:
+                parsed[field] = compress_value(parsed[field])
+
         return parsed
 
+    def before_write(self: T) -> None:
+        """Called right before the document is sent to MongoDB, e.g. to stamp write times."""
+
+    def _to_mongo_for_write(self: T, **kwargs) -> dict:
+        self.before_write()
+        self._written = self.to_mongo(**kwargs)
+
+        return self._written
+
+    def get_stored_size(self: T) -> int | None:
+        """
+        Return the BSON size of the document as last written, compressed fields included, or None if it was not written.
+
+        Measured on the document already built for the write rather than on a fresh dump of the model.
+        """
+        written, self._written = self._written, None
+        if written is not None:
+            self._stored_size = len(bson.encode(written))
+
+        return self._stored_size
+
     def model_dump(self: T, **kwargs) -> dict:
         dict_ = super().model_dump(**kwargs)
 
@@ -65,9 +171,9 @@ class NoSQLBaseDocument(BaseModel, Generic[T], ABC):
         return dict_
 
     def save(self: T, **kwargs) -> T | None:
-        collection = _database[self.get_collection_name()]
+        collection = self.get_collection()
         try:
-            collection.insert_one(self.to_mongo(**kwargs))
+            collection.insert_one(self._to_mongo_for_write(**kwargs))
 
             return self
         except errors.WriteError:
@@ -77,38 +183,435 @@ class NoSQLBaseDocument(BaseModel, Generic[T], ABC):
 
     @classmethod
     def get_or_create(cls: Type[T], **filter_options) -> T:
-        collection = _database[cls.get_collection_name()]
+        """Atomically fetch the document matching `filter_options`, inserting it if missing, in one round trip."""
+
+        collection = cls.get_collection()
+        filter_options = cls._normalize_filter(filter_options)
+        try:
+            instance = collection.find_one_and_update(
+                filter_options,
+                {"$setOnInsert": cls._on_insert_fields(filter_options)},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except errors.DuplicateKeyError:
+            # A concurrent upsert won the race on the unique index, so the document exists now.
+            instance = collection.find_one(filter_options)
+        except errors.OperationFailure:
+            logger.exception(f"Failed to retrieve document with filter options: {filter_options}")
+
+            raise
+
+        return cls._from_upserted(instance, filter_options)
+
+    @classmethod
+    def get_or_create_many(cls: Type[T], filters: list[dict]) -> list[T]:
+        """Bulk `get_or_create`: one unordered upsert batch plus one `$or` lookup, whatever the number of filters.
+
+        Returns one document per filter, in the order the filters were given.
+        """
+
+        if not filters:
+            return []
+
+        collection = cls.get_collection()
+        filters = [cls._normalize_filter(filter_options) for filter_options in filters]
+        unique_filters = cls._unique_filters(filters)
+        try:
+            collection.bulk_write(cls._get_or_create_operations(unique_filters), ordered=False)
+        except errors.BulkWriteError as e:
+            cls._raise_on_non_duplicate_errors(e)
+
+        instances = {}
+        for instance in collection.find({"$or": unique_filters}):
+            cls._match_filters(instance, unique_filters, instances)
+
+        return cls._in_filter_order(filters, instances)
+
+    @classmethod
+    def _unique_filters(cls: Type[T], filters: list[dict]) -> list[dict]:
+        return list({cls._filter_key(filter_options): filter_options for filter_options in filters}.values())
+
+    @staticmethod
+    def _normalize_filter(filter_options: dict) -> dict:
+        """Convert filter values to the form `to_mongo` stores them in (e.g. UUIDs as strings)."""
+
+        return {key: str(value) if isinstance(value, uuid.UUID) else value for key, value in filter_options.items()}
+
+    @classmethod
+    def _from_upserted(cls: Type[T], instance: dict | None, filter_options: dict) -> T:
+        if instance is None:
+            # Only possible if the document was deleted between the upsert and the read
+            raise DatabaseError(f"{cls.__name__} matching {filter_options} vanished right after being upserted.")
+
+        return cls.from_mongo(instance)
+
+    @classmethod
+    def _in_filter_order(cls: Type[T], filters: list[dict], instances: dict) -> list[T]:
+        missing = [filter_options for filter_options in filters if cls._filter_key(filter_options) not in instances]
+        if missing:
+            raise DatabaseError(f"{cls.__name__} documents matching {missing} vanished right after being upserted.")
+
+        return [instances[cls._filter_key(filter_options)] for filter_options in filters]
+
+    @classmethod
+    def _get_or_create_operations(cls: Type[T], filters: list[dict]) -> list[UpdateOne]:
+        return [
+            UpdateOne(filter_options, {"$setOnInsert": cls._on_insert_fields(filter_options)}, upsert=True)
+            for filter_options in filters
+        ]
+
+    @classmethod
+    def _raise_on_non_duplicate_errors(cls: Type[T], error: errors.BulkWriteError) -> None:
+        write_errors = error.details.get("writeErrors", [])
+        if any(write_error.get("code") != DUPLICATE_KEY_ERROR_CODE for write_error in write_errors):
+            logger.error(f"Failed to create documents of type {cls.__name__}")
+
+            raise error
+
+    @classmethod
+    def _match_filters(cls: Type[T], instance: dict, filters: list[dict], matches: dict) -> None:
+        """Key `instance` by the normalized values of each filter's fields, so no filter is compared value by value."""
+
+        wanted = {cls._filter_key(filter_options) for filter_options in filters}
+        keys = {
+            cls._filter_key(cls._normalize_filter({field: instance.get(field) for field in filter_options}))
+            for filter_options in filters
+        }
+        document = cls.from_mongo(instance)
+        for key in keys & wanted:
+            matches[key] = document
+
+    @classmethod
+    def _on_insert_fields(cls: Type[T], filter_options: dict) -> dict:
+        new_instance = cls(**filter_options).to_mongo()
+
+        return {key: value for key, value in new_instance.items() if key not in filter_options}
+
+    @staticmethod
+    def _filter_key(filter_options: dict) -> tuple:
+        return tuple(sorted(filter_options.items()))
+
+    @classmethod
+    def bulk_insert(cls: Type[T], documents: Iterable[T], **kwargs) -> bool:
+        outcomes = cls.bulk_write(documents, **kwargs)
+
+        return all(outcome != WriteOutcome.FAILED for outcome in outcomes)
+
+    @classmethod
+    def bulk_write(
+        cls: Type[T],
+        documents: Iterable[T],
+        upsert: bool = False,
+        chunk_size: int | None = None,
+        **kwargs,
+    ) -> list[WriteOutcome]:
+        """Write documents with unordered, chunked `bulk_write` calls.
+
+        With `upsert=False` every document becomes an `InsertOne` and documents that already exist are
+        reported as `WriteOutcome.DUPLICATE` without aborting the rest of the chunk. With `upsert=True`
+        every document becomes a `ReplaceOne` on its `_id`, so re-ingesting a document overwrites it.
+
+        Returns one outcome per document, in the order the documents were given.
+        """
+
+        collection = cls.get_collection()
+
+        outcomes = []
+        for chunk in cls._chunks(documents, chunk_size):
+            operations = cls._bulk_write_operations(chunk, upsert=upsert, **kwargs)
+            try:
+                result = collection.bulk_write(operations, ordered=False)
+                outcomes.extend(cls._bulk_write_outcomes(len(chunk), upsert=upsert, result=result))
+            except errors.BulkWriteError as e:
+                outcomes.extend(cls._bulk_write_outcomes(len(chunk), upsert=upsert, error=e))
+            except errors.PyMongoError:
+                logger.exception(f"Failed to write chunk of {len(chunk)} documents of type {cls.__name__}")
+                outcomes.extend([WriteOutcome.FAILED] * len(chunk))
+
+        cls._log_failed_writes(outcomes)
+
+        return outcomes
+
+    @staticmethod
+    def _chunks(documents: Iterable[T], chunk_size: int | None) -> Iterator[list[T]]:
+        chunk_size = chunk_size or settings.MONGO_BULK_WRITE_CHUNK_SIZE
+        documents = iter(documents)
+        while chunk := list(islice(documents, chunk_size)):
+            yield chunk
+
+    @classmethod
+    def _bulk_write_operations(cls: Type[T], chunk: list[T], upsert: bool, **kwargs) -> list:
+        if not upsert:
+            return [InsertOne(doc._to_mongo_for_write(**kwargs)) for doc in chunk]
+
+        operations = []
+        for doc in chunk:
+            parsed = doc._to_mongo_for_write(**kwargs)
+            operations.append(ReplaceOne({"_id": parsed["_id"]}, parsed, upsert=True))
+
+        return operations
+
+    @staticmethod
+    def _bulk_write_outcomes(
+        num_operations: int, upsert: bool, result=None, error: errors.BulkWriteError | None = None
+    ) -> list[WriteOutcome]:
+        outcomes = [WriteOutcome.REPLACED if upsert else WriteOutcome.INSERTED] * num_operations
+        if error is not None:
+            upserted_indexes = [upserted["index"] for upserted in error.details.get("upserted", [])]
+            write_errors = error.details.get("writeErrors", [])
+        else:
+            upserted_indexes = result.upserted_ids.keys() if upsert else ()
+            write_errors = []
+
+        for index in upserted_indexes:
+            outcomes[index] = WriteOutcome.INSERTED
+
+        for write_error in write_errors:
+            if write_error.get("code") == DUPLICATE_KEY_ERROR_CODE:
+                outcomes[write_error["index"]] = WriteOutcome.DUPLICATE
+            else:
+                outcomes[write_error["index"]] = WriteOutcome.FAILED
+
+        return outcomes
+
+    @classmethod
+    def _log_failed_writes(cls: Type[T], outcomes: list[WriteOutcome]) -> None:
+        failed = sum(outcome == WriteOutcome.FAILED for outcome in outcomes)
+        if failed:
+            logger.error(f"Failed to write {failed} / {len(outcomes)} documents of type {cls.__name__}")
+
+    @classmethod
+    def find(cls: Type[T], **filter_options) -> T | None:
+        collection = cls.get_collection()
         try:
             instance = collection.find_one(filter_options)
             if instance:
                 return cls.from_mongo(instance)
 
-            new_instance = cls(**filter_options)
-            new_instance = new_instance.save()
+            return None
+        except errors.OperationFailure:
+            logger.error("Failed to retrieve document")
+
+            return None
+
+    @classmethod
+    def bulk_find(cls: Type[T], **filter_options) -> list[T]:
+        return list(cls.iter_find(**filter_options))
+
+    @classmethod
+    def iter_find(
+        cls: Type[T],
+        batch_size: int | None = None,
+        include: list[str] | None = None,
+        exclude: list[str] | None = None,
+        **filter_options,
+    ) -> Iterator[T]:
+        """Lazily yield the documents matching `filter_options`, fetching `batch_size` documents per round trip.
+
+        `include` / `exclude` project the returned fields (e.g. `exclude=["content"]` for metadata-only passes).
+        Projected documents are hydrated with `from_partial_mongo`, so they skip validation of the missing fields.
+        """
+
+        collection = cls.get_collection()
+        batch_size = batch_size or settings.MONGO_FIND_BATCH_SIZE
+        projection = cls._projection(include=include, exclude=exclude)
+        hydrate = cls.from_partial_mongo if projection else cls.from_mongo
+
+        try:
+            with collection.find(filter_options, projection=projection, batch_size=batch_size) as cursor:
+                for instance in cursor:
+                    yield hydrate(instance)
+        except errors.OperationFailure:
+            logger.error("Failed to retrieve documents")
+
+    @staticmethod
+    def _projection(include: list[str] | None, exclude: list[str] | None) -> dict | None:
+        if include and exclude:
+            raise ValueError("Use either 'include' or 'exclude' to project fields, not both.")
+        if include:
+            return dict.fromkeys(include, True)
+        if exclude:
+            return dict.fromkeys(exclude, False)
+
+        return None
+
+    @classmethod
+    def count_by(cls: Type[T], group_by: list[str], **filter_options) -> list[dict]:
+        """Count the documents matching `filter_options` per distinct value of the `group_by` fields, server-side.
+
+        Returns one `{**group_values, "count": n}` dict per group, e.g. `count_by(["author_full_name"])`.
+        """
+
+        collection = cls.get_collection()
+        try:
+            groups = collection.aggregate(cls._count_by_pipeline(group_by, filter_options))
+
+            return [dict(group["_id"], count=group["count"]) for group in groups]
+        except errors.OperationFailure:
+            logger.error(f"Failed to aggregate documents by {group_by}")
+
+            return []
+
+    @staticmethod
+    def _count_by_pipeline(group_by: list[str], filter_options: dict) -> list[dict]:
+        return [
+            {"$match": filter_options},
+            {"$group": {"_id": {field: f"${field}" for field in group_by}, "count": {"$sum": 1}}},
+        ]
+
+    @classmethod
+    def find_existing(cls: Type[T], field: str, values: Iterable) -> set:
+        """Return which of `values` are already stored under `field`, using a single `$in` query."""
+
+        values = list(values)
+        if not values:
+            return set()
+
+        collection = cls.get_collection()
+        try:
+            cursor = collection.find({field: {"$in": values}}, projection={field: True, "_id": False})
+
+            return {instance[field] for instance in cursor if field in instance}
+        except errors.OperationFailure:
+            logger.error(f"Failed to check existing documents by '{field}'")
+
+            return set()
+
+    @classmethod
+    def ensure_indexes(cls: Type[T], drop_stale: bool = False) -> list[str]:
+        """Create the indexes declared in `Settings.indexes` that are missing from the collection.
+
+        With `drop_stale=True`, indexes that exist in the collection but are no longer declared are dropped.
+        Returns the names of the declared indexes.
+
+        Raises:
+            DatabaseError: If an index cannot be created, e.g. a unique index over duplicate values. The
+                other declared indexes are still created.
+        """
+
+        indexes = cls.get_indexes()
+        if not indexes:
+            return []
+
+        collection = cls.get_collection()
+        try:
+            index_names = collection.create_indexes(indexes)
+        except errors.OperationFailure:
+            # One failing index aborts the whole batch: create them one by one to keep the others
+            index_names = cls._create_indexes_one_by_one(collection, indexes)
+
+        if drop_stale:
+            for name in collection.index_information():
+                if name != "_id_" and name not in index_names:
+                    logger.info(f"Dropping stale index '{name}' from collection '{cls.get_collection_name()}'")
+                    collection.drop_index(name)
+
+        return index_names
+
+    @classmethod
+    def _create_indexes_one_by_one(cls: Type[T], collection: Collection, indexes: list[IndexModel]) -> list[str]:
+        index_names, failed = [], {}
+        for index in indexes:
+            try:
+                index_names.extend(collection.create_indexes([index]))
+            except errors.OperationFailure as e:
+                failed[index.document["name"]] = str(e)
+
+        if failed:
+            raise DatabaseError(f"Failed to create indexes for collection '{cls.get_collection_name()}': {failed}")
+
+        return index_names
+
+    # Async (Motor) twins of the methods above, for the serving layer and concurrent ingestion.
+
+    async def asave(self: T, **kwargs) -> T | None:
+        collection = self.get_async_collection()
+        try:
+            await collection.insert_one(self._to_mongo_for_write(**kwargs))
+
+            return self
+        except errors.WriteError:
+            logger.exception("Failed to insert document.")
 
-            return new_instance
+            return None
+
+    @classmethod
+    async def aget_or_create(cls: Type[T], **filter_options) -> T:
+        collection = cls.get_async_collection()
+        filter_options = cls._normalize_filter(filter_options)
+        try:
+            instance = await collection.find_one_and_update(
+                filter_options,
+                {"$setOnInsert": cls._on_insert_fields(filter_options)},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except errors.DuplicateKeyError:
+            instance = await collection.find_one(filter_options)
         except errors.OperationFailure:
             logger.exception(f"Failed to retrieve document with filter options: {filter_options}")
 
             raise
 
+        return cls._from_upserted(instance, filter_options)
+
     @classmethod
-    def bulk_insert(cls: Type[T], documents: list[T], **kwargs) -> bool:
-        collection = _database[cls.get_collection_name()]
+    async def aget_or_create_many(cls: Type[T], filters: list[dict]) -> list[T]:
+        if not filters:
+            return []
+
+        collection = cls.get_async_collection()
+        filters = [cls._normalize_filter(filter_options) for filter_options in filters]
+        unique_filters = cls._unique_filters(filters)
         try:
-            collection.insert_many(doc.to_mongo(**kwargs) for doc in documents)
+            await collection.bulk_write(cls._get_or_create_operations(unique_filters), ordered=False)
+        except errors.BulkWriteError as e:
+            cls._raise_on_non_duplicate_errors(e)
 
-            return True
-        except (errors.WriteError, errors.BulkWriteError):
-            logger.error(f"Failed to insert documents of type {cls.__name__}")
+        instances = {}
+        async for instance in collection.find({"$or": unique_filters}):
+            cls._match_filters(instance, unique_filters, instances)
 
-            return False
+        return cls._in_filter_order(filters, instances)
 
     @classmethod
-    def find(cls: Type[T], **filter_options) -> T | None:
-        collection = _database[cls.get_collection_name()]
+    async def abulk_insert(cls: Type[T], documents: Iterable[T], **kwargs) -> bool:
+        outcomes = await cls.abulk_write(documents, **kwargs)
+
+        return all(outcome != WriteOutcome.FAILED for outcome in outcomes)
+
+    @classmethod
+    async def abulk_write(
+        cls: Type[T],
+        documents: Iterable[T],
+        upsert: bool = False,
+        chunk_size: int | None = None,
+        **kwargs,
+    ) -> list[WriteOutcome]:
+        collection = cls.get_async_collection()
+
+        outcomes = []
+        for chunk in cls._chunks(documents, chunk_size):
+            operations = cls._bulk_write_operations(chunk, upsert=upsert, **kwargs)
+            try:
+                result = await collection.bulk_write(operations, ordered=False)
+                outcomes.extend(cls._bulk_write_outcomes(len(chunk), upsert=upsert, result=result))
+            except errors.BulkWriteError as e:
+                outcomes.extend(cls._bulk_write_outcomes(len(chunk), upsert=upsert, error=e))
+            except errors.PyMongoError:
+                logger.exception(f"Failed to write chunk of {len(chunk)} documents of type {cls.__name__}")
+                outcomes.extend([WriteOutcome.FAILED] * len(chunk))
+
+        cls._log_failed_writes(outcomes)
+
+        return outcomes
+
+    @classmethod
+    async def afind(cls: Type[T], **filter_options) -> T | None:
+        collection = cls.get_async_collection()
         try:
-            instance = collection.find_one(filter_options)
+            instance = await collection.find_one(filter_options)
             if instance:
                 return cls.from_mongo(instance)
 
@@ -119,16 +622,81 @@ class NoSQLBaseDocument(BaseModel, Generic[T], ABC):
             return None
 
     @classmethod
-    def bulk_find(cls: Type[T], **filter_options) -> list[T]:
-        collection = _database[cls.get_collection_name()]
+    async def abulk_find(cls: Type[T], **filter_options) -> list[T]:
+        return [document async for document in cls.aiter_find(**filter_options)]
+
+    @classmethod
+    async def aiter_find(
+        cls: Type[T],
+        batch_size: int | None = None,
+        include: list[str] | None = None,
+        exclude: list[str] | None = None,
+        **filter_options,
+    ) -> AsyncIterator[T]:
+        collection = cls.get_async_collection()
+        batch_size = batch_size or settings.MONGO_FIND_BATCH_SIZE
+        projection = cls._projection(include=include, exclude=exclude)
+        hydrate = cls.from_partial_mongo if projection else cls.from_mongo
+
+        cursor = collection.find(filter_options, projection=projection, batch_size=batch_size)
         try:
-            instances = collection.find(filter_options)
-            return [document for instance in instances if (document := cls.from_mongo(instance)) is not None]
+            async for instance in cursor:
+                yield hydrate(instance)
         except errors.OperationFailure:
             logger.error("Failed to retrieve documents")
+        finally:
+            await cursor.close()
+
+    @classmethod
+    async def acount_by(cls: Type[T], group_by: list[str], **filter_options) -> list[dict]:
+        collection = cls.get_async_collection()
+        try:
+            groups = collection.aggregate(cls._count_by_pipeline(group_by, filter_options))
+
+            return [dict(group["_id"], count=group["count"]) async for group in groups]
+        except errors.OperationFailure:
+            logger.error(f"Failed to aggregate documents by {group_by}")
 
             return []
 
+    @classmethod
+    async def afind_existing(cls: Type[T], field: str, values: Iterable) -> set:
+        values = list(values)
+        if not values:
+            return set()
+
+        collection = cls.get_async_collection()
+        try:
+            cursor = collection.find({field: {"$in": values}}, projection={field: True, "_id": False})
+
+            return {instance[field] async for instance in cursor if field in instance}
+        except errors.OperationFailure:
+            logger.error(f"Failed to check existing documents by '{field}'")
+
+            return set()
+
+    @classmethod
+    def get_collection(cls: Type[T]) -> Collection:
+        return get_database()[cls.get_collection_name()]
+
+    @classmethod
+    def get_async_collection(cls: Type[T]):
+        return get_async_database()[cls.get_collection_name()]
+
+    @classmethod
+    def get_compressed_fields(cls: Type[T]) -> list[str]:
+        if not hasattr(cls, "Settings") or not hasattr(cls.Settings, "compressed_fields"):
+            return []
+
+        return list(cls.Settings.compressed_fields)
+
+    @classmethod
+    def get_indexes(cls: Type[T]) -> list[IndexModel]:
+        if not hasattr(cls, "Settings") or not hasattr(cls.Settings, "indexes"):
+            return []
+
+        return list(cls.Settings.indexes)
+
     @classmethod
     def get_collection_name(cls: Type[T]) -> str:
         if not hasattr(cls, "Settings") or not hasattr(cls.Settings, "name"):
@@ -7,7 +7,14 @@ import numpy as np
 from loguru import logger
 from pydantic import UUID4, BaseModel, Field
 from qdrant_client.http import exceptions
-from qdrant_client.http.models import Distance, VectorParams
+from qdrant_client.http.models import (
+    Distance,
+    FieldCondition,
+    Filter,
+    MatchValue,
+    PayloadSchemaType,
+    VectorParams,
+)
 from qdrant_client.models import CollectionInfo, PointStruct, Record
 
 from llm_engineering.application.networks.embeddings import EmbeddingModelSingleton
@@ -160,6 +167,68 @@ class VectorBaseDocument(BaseModel, Generic[T], ABC):
 
         return documents
 
+    @classmethod
+    def count(cls: Type[T], **filters) -> int:
+        """Count the points whose payload matches `filters` exactly, without fetching them."""
+
+        try:
+            result = connection.count(
+                collection_name=cls.get_collection_name(), count_filter=cls._build_filter(**filters), exact=True
+            )
+        except (exceptions.UnexpectedResponse, exceptions.ResponseHandlingException):
+            logger.exception(f"Failed to count documents in '{cls.get_collection_name()}'.")
+
+            return 0
+
+        return result.count
+
+    @classmethod
+    def count_by(cls: Type[T], key: str, limit: int = 1000, **filters) -> dict[Any, int]:
+        """
+        Count the points matching `filters` per distinct value of the payload `key`, using a Qdrant facet.
+
+        The facet needs a payload index on `key`, declared in `Config.payload_indexes`. Only the `limit`
+        most frequent values are returned; reaching it is logged as a warning. Returns an empty dict
+        when Qdrant cannot be reached or cannot count by `key`.
+        """
+
+        try:
+            response = cls._facet(key, limit=limit, **filters)
+        except (exceptions.UnexpectedResponse, exceptions.ResponseHandlingException):
+            logger.exception(
+                f"Failed to count documents in '{cls.get_collection_name()}' by '{key}'. "
+                "Is the payload key declared in `Config.payload_indexes`?"
+            )
+
+            return {}
+
+        if len(response.hits) >= limit:
+            logger.warning(
+                f"Counted only the {limit} most frequent values of '{key}' in '{cls.get_collection_name()}'; "
+                "raise `limit` for complete counts."
+            )
+
+        return {hit.value: hit.count for hit in response.hits}
+
+    @classmethod
+    def _facet(cls: Type[T], key: str, limit: int, **filters):
+        return connection.facet(
+            collection_name=cls.get_collection_name(),
+            key=key,
+            facet_filter=cls._build_filter(**filters),
+            limit=limit,
+            exact=True,
+        )
+
+    @staticmethod
+    def _build_filter(**filters) -> Filter | None:
+        if not filters:
+            return None
+
+        return Filter(
+            must=[FieldCondition(key=key, match=MatchValue(value=value)) for key, value in filters.items()]
+        )
+
     @classmethod
     def get_or_create_collection(cls: Type[T]) -> CollectionInfo:
         collection_name = cls.get_collection_name()
@@ -191,7 +260,17 @@ class VectorBaseDocument(BaseModel, Generic[T], ABC):
         else:
             vectors_config = {}
 
-        return connection.create_collection(collection_name=collection_name, vectors_config=vectors_config)
+        collection_created = connection.create_collection(collection_name=collection_name, vectors_config=vectors_config)
+        if collection_created:
+            for field_name in cls.get_payload_indexes():
+                connection.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=field_name,
+                    field_schema=PayloadSchemaType.KEYWORD,
+                    wait=True,
+                )
+
+        return collection_created
 
     @classmethod
     def get_category(cls: Type[T]) -> DataCategory:
@@ -219,6 +298,13 @@ class VectorBaseDocument(BaseModel, Generic[T], ABC):
 
         return cls.Config.use_vector_index
 
+    @classmethod
+    def get_payload_indexes(cls: Type[T]) -> list[str]:
+        if not hasattr(cls, "Config") or not hasattr(cls.Config, "payload_indexes"):
+            return []
+
+        return list(cls.Config.payload_indexes)
+
     @classmethod
     def group_by_class(
         cls: Type["VectorBaseDocument"], documents: list["VectorBaseDocument"]
@@ -30,13 +30,18 @@ __all__ = [
 ]
 """
 
+import uuid
 from abc import ABC
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from pydantic import UUID4, Field
+from pymongo import ASCENDING, IndexModel, ReturnDocument, UpdateOne
+
+from llm_engineering.settings import settings
 
 from .base import NoSQLBaseDocument
-from .types import DataCategory
+from .types import CrawlState, DataCategory
 
 
 class UserDocument(NoSQLBaseDocument):
@@ -45,25 +50,47 @@ class UserDocument(NoSQLBaseDocument):
 
     class Settings:
         name = "users"
+        indexes = [
+            IndexModel([("first_name", ASCENDING), ("last_name", ASCENDING)], name="full_name_unique", unique=True),
+        ]
 
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
 
 
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class Document(NoSQLBaseDocument, ABC):
     content: dict
     platform: str
     author_id: UUID4 = Field(alias="author_id")
     author_full_name: str = Field(alias="author_full_name")
+    ingested_at: datetime = Field(default_factory=_utcnow)
+    updated_at: datetime = Field(default_factory=_utcnow)
+
+    def before_write(self) -> None:
+        # Stamped when written, not when built: incremental queries compare it against the time
+        # they started, and a document built long before it is saved must not land behind that.
+        self.updated_at = _utcnow()
 
 
 class RepositoryDocument(Document):
     name: str
     link: str
+    commit_sha: Optional[str] = None  # HEAD commit the content was read from
 
     class Settings:
         name = DataCategory.REPOSITORIES
+        # A repository holds up to 5 MB of source files, stored zstd-compressed and decompressed on access.
+        compressed_fields = ["content"]
+        indexes = [
+            IndexModel([("link", ASCENDING)], name="link_unique", unique=True),
+            IndexModel([("author_id", ASCENDING), ("platform", ASCENDING)], name="author_id_platform"),
+            IndexModel([("author_id", ASCENDING), ("updated_at", ASCENDING)], name="author_id_updated_at"),
+        ]
 
 
 class PostDocument(Document):
@@ -72,6 +99,17 @@ class PostDocument(Document):
 
     class Settings:
         name = DataCategory.POSTS
+        indexes = [
+            # Posts scraped from a profile feed have no link, so uniqueness only applies to linked posts.
+            IndexModel(
+                [("link", ASCENDING)],
+                name="link_unique",
+                unique=True,
+                partialFilterExpression={"link": {"$type": "string"}},
+            ),
+            IndexModel([("author_id", ASCENDING), ("platform", ASCENDING)], name="author_id_platform"),
+            IndexModel([("author_id", ASCENDING), ("updated_at", ASCENDING)], name="author_id_updated_at"),
+        ]
 
 
 class ArticleDocument(Document):
@@ -79,3 +117,318 @@ class ArticleDocument(Document):
 
     class Settings:
         name = DataCategory.ARTICLES
+        indexes = [
+            IndexModel([("link", ASCENDING)], name="link_unique", unique=True),
+            IndexModel([("author_id", ASCENDING), ("platform", ASCENDING)], name="author_id_platform"),
+            IndexModel([("author_id", ASCENDING), ("updated_at", ASCENDING)], name="author_id_updated_at"),
+        ]
+
+
+class WatermarkDocument(NoSQLBaseDocument):
+    """Per-author `updated_at` high-water mark of the documents a pipeline has already processed."""
+
+    pipeline: str
+    author_id: UUID4
+    watermark: datetime
+
+    class Settings:
+        name = "watermarks"
+        indexes = [
+            IndexModel([("pipeline", ASCENDING), ("author_id", ASCENDING)], name="pipeline_author_unique", unique=True),
+        ]
+
+    @classmethod
+    def get_watermarks(cls, pipeline: str, author_ids: list) -> dict[str, datetime]:
+        watermarks = cls.bulk_find(pipeline=pipeline, author_id={"$in": [str(author_id) for author_id in author_ids]})
+
+        return {str(watermark.author_id): watermark.watermark for watermark in watermarks}
+
+    @classmethod
+    def advance(cls, pipeline: str, author_ids: list, watermark: datetime) -> None:
+        """Move the watermark of every author forward to `watermark`; watermarks never move backwards."""
+
+        operations = [
+            UpdateOne(
+                {"pipeline": pipeline, "author_id": str(author_id)},
+                {"$max": {"watermark": watermark}, "$setOnInsert": {"_id": str(uuid.uuid4())}},
+                upsert=True,
+            )
+            for author_id in author_ids
+        ]
+        if operations:
+            cls.get_collection().bulk_write(operations, ordered=False)
+
+
+class CrawlFrontierDocument(NoSQLBaseDocument):
+    """
+    Per-author crawl state of a link, so an interrupted crawl resumes where it stopped.
+
+    A link moves pending -> in_progress -> done, or to failed, from which it is
+    retried with exponential backoff until `CRAWL_MAX_ATTEMPTS` is reached. An
+    in-progress link whose lease expired (its crawler died) is due again.
+
+    The frontier doubles as a job queue: `lease` atomically hands a due link to
+    one worker, so any number of worker processes can drain it concurrently.
+    """
+
+    link: str
+    author_id: UUID4
+    state: CrawlState = CrawlState.PENDING
+    attempts: int = 0
+    last_error: Optional[str] = None
+    next_attempt_at: datetime = Field(default_factory=_utcnow)
+    leased_until: Optional[datetime] = None
+    worker_id: Optional[str] = None
+    updated_at: datetime = Field(default_factory=_utcnow)
+
+    class Settings:
+        name = "crawl_frontier"
+        indexes = [
+            IndexModel([("author_id", ASCENDING), ("link", ASCENDING)], name="author_id_link_unique", unique=True),
+            IndexModel([("state", ASCENDING), ("next_attempt_at", ASCENDING)], name="state_next_attempt_at"),
+        ]
+
+    @classmethod
+    def enqueue(cls, author_id, links: list[str]) -> None:
+        """Add links to the frontier as pending; links already in it keep their state."""
+
+        now = _utcnow()
+        operations = [
+            UpdateOne(
+                {"author_id": str(author_id), "link": link},
+                {
+                    "$setOnInsert": {
+                        "_id": str(uuid.uuid4()),
+                        "state": CrawlState.PENDING.value,
+                        "attempts": 0,
+                        "last_error": None,
+                        "next_attempt_at": now,
+                        "leased_until": None,
+                        "updated_at": now,
+                    }
+                },
+                upsert=True,
+            )
+            for link in dict.fromkeys(links)
+        ]
+        if operations:
+            cls.get_collection().bulk_write(operations, ordered=False)
+
+    @classmethod
+    def reset_done(cls, author_id, links: list[str]) -> None:
+        """Make done links pending again, for crawlers that re-check stored links on every run."""
+
+        if links:
+            cls.get_collection().update_many(
+                {"author_id": str(author_id), "link": {"$in": list(links)}, "state": CrawlState.DONE.value},
+                {"$set": {"state": CrawlState.PENDING.value, "attempts": 0, "updated_at": _utcnow()}},
+            )
+
+    @classmethod
+    def get_states(cls, author_id, links: list[str]) -> dict[str, CrawlState]:
+        entries = cls.get_collection().find(
+            {"author_id": str(author_id), "link": {"$in": list(links)}}, {"link": True, "state": True}
+        )
+
+        return {entry["link"]: CrawlState(entry["state"]) for entry in entries}
+
+    @classmethod
+    def due_filter(cls, now: datetime) -> dict:
+        """Filter matching links that should be crawled now."""
+
+        return {
+            "$or": [
+                {"state": CrawlState.PENDING.value},
+                {
+                    "state": CrawlState.FAILED.value,
+                    "attempts": {"$lt": settings.CRAWL_MAX_ATTEMPTS},
+                    "next_attempt_at": {"$lte": now},
+                },
+                # A link whose crawls keep crashing or hanging their worker is given up like a failing one
+                {
+                    "state": CrawlState.IN_PROGRESS.value,
+                    "attempts": {"$lt": settings.CRAWL_MAX_ATTEMPTS},
+                    "leased_until": {"$lt": now},
+                },
+            ]
+        }
+
+    @classmethod
+    def get_due(cls, author_id, links: list[str]) -> list[str]:
+        """Return the links that should be crawled now, in the given order."""
+
+        filter_options = {"author_id": str(author_id), "link": {"$in": list(links)}, **cls.due_filter(_utcnow())}
+        due = {entry["link"] for entry in cls.get_collection().find(filter_options, {"link": True})}
+
+        return [link for link in dict.fromkeys(links) if link in due]
+
+    @classmethod
+    def lease(cls, worker_id: str, lease_seconds: float | None = None, author_id=None) -> Optional["CrawlFrontierDocument"]:
+        """
+        Atomically claim the due link that has waited longest, or return None if nothing is due.
+
+        The claim is a lease: if the worker does not finish or renew it within
+        `lease_seconds`, the link becomes due again for other workers, until it
+        has been claimed CRAWL_MAX_ATTEMPTS times.
+        """
+
+        now = _utcnow()
+        filter_options = cls.due_filter(now)
+        if author_id is not None:
+            filter_options["author_id"] = str(author_id)
+
+        entry = cls.get_collection().find_one_and_update(
+            filter_options,
+            {
+                "$set": {
+                    "state": CrawlState.IN_PROGRESS.value,
+                    "leased_until": now + timedelta(seconds=lease_seconds or settings.CRAWL_LINK_TIMEOUT),
+                    "worker_id": worker_id,
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("next_attempt_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+        return cls.from_mongo(entry) if entry else None
+
+    def renew_lease(self, lease_seconds: float | None = None) -> bool:
+        """Extend the lease held by `worker_id`. Returns False if the lease was lost to another worker."""
+
+        now = _utcnow()
+        result = self.get_collection().update_one(
+            {"_id": str(self.id), "worker_id": self.worker_id, "state": CrawlState.IN_PROGRESS.value},
+            {
+                "$set": {
+                    "leased_until": now + timedelta(seconds=lease_seconds or settings.CRAWL_LINK_TIMEOUT),
+                    "updated_at": now,
+                }
+            },
+        )
+
+        return result.matched_count == 1
+
+    @classmethod
+    def lease_links(cls, author_id, links: list[str], worker_id: str, lease_seconds: float | None = None) -> list[str]:
+        """
+        Claim the given links for `worker_id`, like `lease` does for the next due link.
+
+        Each link is claimed atomically and only if it is due, so a link already
+        leased by another worker (e.g. a distributed crawl worker) is left to it.
+        `worker_id` must be unique to the caller, since the claimed links are
+        read back by it.
+
+        Returns:
+            The links now leased by `worker_id`, in the given order
+        """
+        if not links:
+            return []
+
+        now = _utcnow()
+        collection = cls.get_collection()
+        collection.update_many(
+            {"author_id": str(author_id), "link": {"$in": list(links)}, **cls.due_filter(now)},
+            {
+                "$set": {
+                    "state": CrawlState.IN_PROGRESS.value,
+                    "leased_until": now + timedelta(seconds=lease_seconds or settings.CRAWL_LINK_TIMEOUT),
+                    "worker_id": worker_id,
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+        )
+        leased = {
+            entry["link"]
+            for entry in collection.find(cls._owned_filter(author_id, links, worker_id), {"link": True})
+        }
+
+        return [link for link in dict.fromkeys(links) if link in leased]
+
+    @classmethod
+    def mark_done(cls, author_id, links: list[str], worker_id: str | None = None) -> None:
+        """Record finished crawls. With `worker_id`, only links still leased by that worker are updated."""
+
+        if not links:
+            return
+
+        cls.get_collection().update_many(
+            cls._owned_filter(author_id, links, worker_id),
+            {
+                "$set": {
+                    "state": CrawlState.DONE.value,
+                    "last_error": None,
+                    "leased_until": None,
+                    "worker_id": None,
+                    "updated_at": _utcnow(),
+                }
+            },
+        )
+
+    @classmethod
+    def mark_failed(cls, author_id, errors: dict[str, str | None], worker_id: str | None = None) -> None:
+        """Record failed crawls and schedule their retry with exponential backoff.
+
+        With `worker_id`, only links still leased by that worker are updated.
+        """
+
+        if not errors:
+            return
+
+        collection = cls.get_collection()
+        attempts = {
+            entry["link"]: entry.get("attempts", 0)
+            for entry in collection.find({"author_id": str(author_id), "link": {"$in": list(errors)}}, {"link": True, "attempts": True})
+        }
+
+        now = _utcnow()
+        operations = [
+            UpdateOne(
+                cls._owned_filter(author_id, [link], worker_id),
+                {
+                    "$set": {
+                        "state": CrawlState.FAILED.value,
+                        "last_error": error,
+                        "next_attempt_at": now + retry_backoff(attempts.get(link, 1)),
+                        "leased_until": None,
+                        "worker_id": None,
+                        "updated_at": now,
+                    }
+                },
+            )
+            for link, error in errors.items()
+        ]
+        collection.bulk_write(operations, ordered=False)
+
+    @staticmethod
+    def _owned_filter(author_id, links: list[str], worker_id: str | None) -> dict:
+        filter_options = {"author_id": str(author_id), "link": {"$in": list(links)}}
+        if worker_id is not None:
+            filter_options["worker_id"] = worker_id
+            filter_options["state"] = CrawlState.IN_PROGRESS.value
+
+        return filter_options
+
+
+def retry_backoff(attempts: int) -> timedelta:
+    """Delay before retrying a link that failed `attempts` times: doubling from CRAWL_RETRY_BACKOFF, capped."""
+
+    seconds = settings.CRAWL_RETRY_BACKOFF * 2 ** max(attempts - 1, 0)
+
+    return timedelta(seconds=min(seconds, settings.CRAWL_RETRY_BACKOFF_MAX))
+
+
+def ensure_indexes(drop_stale: bool = False) -> None:
+    """Sync the declared indexes of every document collection. Meant to be called once at pipeline startup."""
+
+    for document_class in (
+        UserDocument,
+        RepositoryDocument,
+        PostDocument,
+        ArticleDocument,
+        WatermarkDocument,
+        CrawlFrontierDocument,
+    ):
+        document_class.ensure_indexes(drop_stale=drop_stale)
@@ -32,6 +32,7 @@ class EmbeddedPostChunk(EmbeddedChunk):
         name = "embedded_posts"
         category = DataCategory.POSTS
         use_vector_index = True
+        payload_indexes = ["author_full_name"]
 
 class EmbeddedArticleChunk(EmbeddedChunk):
     link: str
@@ -40,6 +41,7 @@ class EmbeddedArticleChunk(EmbeddedChunk):
         name = "embedded_articles"
         category = DataCategory.ARTICLES
         use_vector_index = True
+        payload_indexes = ["author_full_name"]
 
 class EmbeddedRepositoryChunk(EmbeddedChunk):
     name: str
@@ -49,5 +51,6 @@ class EmbeddedRepositoryChunk(EmbeddedChunk):
         name = "embedded_repositories"
         category = DataCategory.REPOSITORIES
         use_vector_index = True
+        payload_indexes = ["author_full_name"]
 
         
\ No newline at end of file
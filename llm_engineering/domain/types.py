@@ -35,6 +35,15 @@ class DataCategory(StrEnum):
     REPOSITORIES = "repositories"
 
 
+class CrawlState(StrEnum):
+    """State of a link in the crawl frontier."""
+
+    PENDING = "pending"
+    IN_PROGRESS = "in_progress"
+    DONE = "done"
+    FAILED = "failed"
+
+
 class Document(NoSQLBaseDocument, ABC):  
     """
     Abstract base class for all content documents.
@@ -0,0 +1,57 @@
+import json
+import zlib
+from typing import Any
+
+from bson import Binary
+
+from llm_engineering.domain.exceptions import ImproperlyConfigured
+from llm_engineering.settings import settings
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CODEC_KEY = "__codec__"
+DATA_KEY = "data"
+
+
+def compress_value(value: Any) -> Any:
+    """Encode a JSON-serializable value as a compressed BSON binary if it is large enough to be worth it.
+
+    Values below `MONGO_COMPRESSION_MIN_BYTES` are returned unchanged. zstd is used when the `zstandard`
+    package is installed, otherwise zlib.
+    """
+
+    raw = json.dumps(value, separators=(",", ":")).encode("utf-8")
+    if len(raw) < settings.MONGO_COMPRESSION_MIN_BYTES:
+        return value
+
+    if zstandard is not None:
+        codec = "zstd"
+        data = zstandard.ZstdCompressor(level=settings.MONGO_COMPRESSION_LEVEL).compress(raw)
+    else:
+        codec = "zlib"
+        data = zlib.compress(raw)
+
+    return {CODEC_KEY: codec, "size": len(raw), DATA_KEY: Binary(data)}
+
+
+def is_compressed(value: Any) -> bool:
+    return isinstance(value, dict) and CODEC_KEY in value
+
+
+def decompress_value(value: dict) -> Any:
+    codec = value[CODEC_KEY]
+    data = bytes(value[DATA_KEY])
+
+    if codec == "zstd":
+        if zstandard is None:
+            raise ImproperlyConfigured("Reading zstd-compressed documents requires the 'zstandard' package.")
+        raw = zstandard.ZstdDecompressor().decompress(data, max_output_size=value.get("size", 0))
+    elif codec == "zlib":
+        raw = zlib.decompress(data)
+    else:
+        raise ValueError(f"Unknown compression codec: {codec}")
+
+    return json.loads(raw)
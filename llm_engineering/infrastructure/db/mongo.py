@@ -1,25 +1,116 @@
+import asyncio
+import importlib.util
+import os
+import threading
+import weakref
+
 from loguru import logger
 from pymongo import MongoClient
+from pymongo.database import Database
 from pymongo.errors import ConnectionFailure
 
+from llm_engineering.domain.exceptions import ImproperlyConfigured
 from llm_engineering.settings import settings
 
+# Python packages pymongo needs for each wire compressor (zlib ships with Python).
+_COMPRESSOR_PACKAGES = {"zstd": "zstandard", "snappy": "snappy", "zlib": None}
+
+
+def _available_compressors() -> list[str]:
+    compressors = []
+    for compressor in filter(None, (c.strip() for c in settings.MONGO_COMPRESSORS.split(","))):
+        package = _COMPRESSOR_PACKAGES.get(compressor)
+        if compressor not in _COMPRESSOR_PACKAGES or (package and importlib.util.find_spec(package) is None):
+            logger.warning(f"MongoDB compressor '{compressor}' is not available and will not be negotiated.")
+            continue
+        compressors.append(compressor)
+
+    return compressors
+
+
+def _client_options() -> dict:
+    options = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS,
+        "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "socketTimeoutMS": settings.MONGO_SOCKET_TIMEOUT_MS or None,
+        # Datetimes are read back as aware UTC, comparable with datetime.now(timezone.utc)
+        "tz_aware": True,
+    }
+    if compressors := _available_compressors():
+        options["compressors"] = compressors
+
+    return options
+
 
 class MongoDatabaseConnector:
+    """Lazily creates one pooled `MongoClient` per process.
+
+    PyMongo clients are not fork-safe, so a process forked by ZenML or a process pool gets its own
+    client on first use instead of inheriting the parent's.
+    """
+
     _instance: MongoClient | None = None
+    _pid: int | None = None
+    _lock = threading.Lock()
 
     def __new__(cls, *args, **kwargs) -> MongoClient:
-        if cls._instance is None:
-            try:
-                cls._instance = MongoClient(settings.DATABASE_HOST)
-            except ConnectionFailure as e:
-                logger.error(f"Couldn't connect to the database: {e!s}")
+        if cls._instance is None or cls._pid != os.getpid():
+            with cls._lock:
+                if cls._instance is None or cls._pid != os.getpid():
+                    try:
+                        cls._instance = MongoClient(settings.DATABASE_HOST, **_client_options())
+                        cls._pid = os.getpid()
+                    except ConnectionFailure as e:
+                        logger.error(f"Couldn't connect to the database: {e!s}")
 
-                raise
+                        raise
 
-        logger.info(f"Connection to MongoDB with URI successful: {settings.DATABASE_HOST}")
+                    logger.info(f"Connection to MongoDB with URI successful: {settings.DATABASE_HOST}")
 
         return cls._instance
 
+    @classmethod
+    def _reset_after_fork(cls) -> None:
+        # The parent's client (and a lock possibly held by one of its threads) must not be reused in the child.
+        cls._instance = None
+        cls._pid = None
+        cls._lock = threading.Lock()
+
+
+class AsyncMongoDatabaseConnector:
+    """Lazily creates one Motor client per process and event loop, with the same pool settings."""
+
+    _instances: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, object]" = weakref.WeakKeyDictionary()
+    _pid: int | None = None
+
+    def __new__(cls, *args, **kwargs):
+        try:
+            from motor.motor_asyncio import AsyncIOMotorClient
+        except ImportError:
+            raise ImproperlyConfigured("The async MongoDB API requires the 'motor' package.") from None
+
+        if cls._pid != os.getpid():
+            cls._instances = weakref.WeakKeyDictionary()
+            cls._pid = os.getpid()
+
+        loop = asyncio.get_running_loop()
+        if loop not in cls._instances:
+            cls._instances[loop] = AsyncIOMotorClient(settings.DATABASE_HOST, io_loop=loop, **_client_options())
+
+            logger.info(f"Async connection to MongoDB with URI successful: {settings.DATABASE_HOST}")
+
+        return cls._instances[loop]
+
+
+os.register_at_fork(after_in_child=MongoDatabaseConnector._reset_after_fork)
+
+
+def get_database() -> Database:
+    return MongoDatabaseConnector()[settings.DATABASE_NAME]
+
 
-connection = MongoDatabaseConnector()
+def get_async_database():
+    return AsyncMongoDatabaseConnector()[settings.DATABASE_NAME]
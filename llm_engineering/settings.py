@@ -27,6 +27,61 @@ class Settings(BaseSettings):
     # MongoDB settings - using full URI format 
     DATABASE_HOST: str = "mongodb://localhost:27017"  # Full MongoDB URI
     DATABASE_NAME: str = "digital_twin"               # my Database name
+    MONGO_BULK_WRITE_CHUNK_SIZE: int = 1000           # operations per bulk_write round trip
+    MONGO_FIND_BATCH_SIZE: int = 100                  # documents per cursor round trip
+
+    # MongoDB connection pool settings (one client per process)
+    MONGO_MAX_POOL_SIZE: int = 50
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_IDLE_TIME_MS: int = 60_000
+    MONGO_CONNECT_TIMEOUT_MS: int = 10_000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 10_000
+    MONGO_SOCKET_TIMEOUT_MS: int = 0                  # 0 = no timeout
+    MONGO_COMPRESSORS: str = "zstd,snappy,zlib"       # negotiated in order, skipped if the package is missing
+
+    # Compression of large document fields (Settings.compressed_fields)
+    MONGO_COMPRESSION_MIN_BYTES: int = 16 * 1024      # smaller values are stored as-is
+    MONGO_COMPRESSION_LEVEL: int = 3                  # zstd level
+
+    # Data warehouse queries: one query per collection, at most this many in flight
+    WAREHOUSE_QUERY_MAX_WORKERS: int = 3
+
+    # Crawl scheduling
+    CRAWL_MAX_WORKERS: int = 8                        # links crawled at the same time
+    CRAWL_PER_DOMAIN_CONCURRENCY: int = 1             # links crawled at the same time per domain
+    CRAWL_DOMAIN_CONCURRENCY: dict[str, int] = {"github.com": 4}  # per-domain overrides of the above
+    CRAWL_POLITENESS_DELAY: float = 1.0               # seconds between crawl starts on one domain
+    CRAWL_LINK_TIMEOUT: float = 600.0                 # seconds before a crawl is reported as failed
+    CRAWL_MAX_ATTEMPTS: int = 5                       # crawls of a failing link before it is given up
+    CRAWL_RETRY_BACKOFF: float = 60.0                 # seconds before the first retry, doubled per failure
+    CRAWL_RETRY_BACKOFF_MAX: float = 3600.0           # upper bound of the retry delay
+    CRAWL_WORKER_POLL_INTERVAL: float = 5.0           # seconds an idle crawl worker waits before polling again
+    CRAWL_RATE_LIMIT: float = 2.0                     # requests per second sent to one domain
+    CRAWL_RATE_BURST: int = 5                         # requests a domain may receive at once after being idle
+    CRAWL_DOMAIN_RATE_LIMITS: dict[str, float] = {"medium.com": 1.0, "linkedin.com": 0.5}  # per-domain overrides of the above
+    CRAWL_FETCH_ATTEMPTS: int = 4                     # tries of a request failing with 429, 5xx or a connection error
+    CRAWL_FETCH_BACKOFF: float = 1.0                  # seconds before the first retry of a request, doubled per try
+    CRAWL_FETCH_BACKOFF_MAX: float = 60.0             # longest retry wait; a longer Retry-After fails the request
+    CRAWL_TRACE_PATH: str | None = None               # JSONL file per-link crawl traces are appended to
+    GITHUB_READ_WORKERS: int = 8                      # threads reading files of one cloned repository
+    HTTP_CACHE_DIR: str = ".cache/http"               # on-disk cache of fetched article pages
+    HTTP_CACHE_MAX_AGE_DAYS: float = 30.0             # entries not fetched or revalidated for this long are removed
+    HTTP_CACHE_MAX_SIZE_MB: float = 512.0             # least recently used entries are removed beyond this size
+    ARTICLE_FETCH_CONCURRENCY: int = 32               # article pages downloaded at the same time
+    ARTICLE_FETCH_PER_HOST: int = 4                   # article pages downloaded at the same time per host
+    ARTICLE_FETCH_TIMEOUT: float = 60.0               # seconds allowed per article download
+    ARTICLE_TRANSFORM_WORKERS: int = 4                # processes converting article HTML to text
+    MEDIUM_HTTP_TIMEOUT: float = 15.0                 # seconds for the browserless Medium fetch
+    HTML_PARSER: str = "auto"                         # BeautifulSoup tree builder, "auto" prefers lxml when installed
+
+    # Selenium WebDriver pool (one per process, shared by all Selenium crawlers)
+    SELENIUM_POOL_SIZE: int = 2                       # browsers alive at the same time, across all crawlers
+    SELENIUM_DRIVER_MAX_USES: int = 20                # checkouts before a browser is restarted
+    SELENIUM_CHECKOUT_TIMEOUT: float = 300.0          # seconds to wait for a free browser
+    SELENIUM_REMOTE_DEBUGGING_PORT: int = 0           # 0 = ChromeDriver picks a free port, else base port + slot
+    SELENIUM_PAGE_READY_TIMEOUT: float = 10.0         # max seconds to wait for a page to settle
+    SELENIUM_SCROLL_TIMEOUT: float = 5.0              # max seconds to wait for content after a scroll
+    SELENIUM_QUIET_PERIOD: float = 1.0                # seconds without DOM, height or network activity that count as settled
 
     # Application settings
     APP_NAME: str = "Digital Twin LLM"
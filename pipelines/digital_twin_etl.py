@@ -9,7 +9,8 @@ from src.steps.etl.crawl_links import crawl_links
 @pipeline
 def digital_twin_etl(
     user_full_name: str = "Chris Morris",
-    links: list[str] = None
+    links: list[str] = None,
+    distributed: bool = False,
 
 ):
     """Full ETL pipeline using my webistes and accounts as a data source."""
@@ -36,7 +37,7 @@ def digital_twin_etl(
                 "https://www.linkedin.com/in/c-r-7354a877/"
         ]
 
-        crawled_data = crawl_links(user=user, links=links)
+        crawled_data = crawl_links(user=user, links=links, distributed=distributed)
 
         return crawled_data
     
@@ -4,7 +4,9 @@ from steps import feature_engineering as fe_steps
 
 
 @pipeline
-def feature_engineering(author_full_names: list[str], wait_for: str | list[str] | None = None) -> list[str]:
+def feature_engineering(
+    author_full_names: list[str], wait_for: str | list[str] | None = None, incremental: bool = False
+) -> list[str]:
 
     """
     Feature Engineering Pipeline for RAG System
@@ -19,6 +21,7 @@ def feature_engineering(author_full_names: list[str], wait_for: str | list[str]
     3. Load cleaned documents to vector database
     4. Chunk documents and generate embeddings
     5. Load embedded chunks to vector database
+    6. Advance the per-author watermarks once both loads succeeded
     
     Args:
         author_full_names (list[str]): List of author names to filter repositories.
@@ -26,6 +29,8 @@ def feature_engineering(author_full_names: list[str], wait_for: str | list[str]
         wait_for (str | list[str] | None, optional): Pipeline step(s) to wait for 
                                                    before starting execution. Enables
                                                    pipeline orchestration and dependencies.
+        incremental (bool, optional): Only process documents updated since the last
+                                      successful run of this pipeline for each author.
     
     Returns:
         list[str]: List containing invocation IDs from the two vector database 
@@ -38,6 +43,7 @@ def feature_engineering(author_full_names: list[str], wait_for: str | list[str]
         - load_to_vector_db (1st): Stores cleaned documents
         - chunk_and_embed: Splits documents into chunks and creates embeddings
         - load_to_vector_db (2nd): Stores embedded chunks for RAG retrieval
+        - advance_watermarks: Records this run as the new incremental starting point
     
     Example:
         >>> pipeline_result = feature_engineering(
@@ -46,7 +52,9 @@ def feature_engineering(author_full_names: list[str], wait_for: str | list[str]
         ... )
         >>> print(f"Pipeline completed with IDs: {pipeline_result}")
     """
-    raw_documents = fe_steps.query_data_warehouse(author_full_names, after=wait_for)
+    raw_documents, watermark = fe_steps.query_data_warehouse(
+        author_full_names, incremental=incremental, after=wait_for
+    )
 
     cleaned_documents = fe_steps.clean_documents(raw_documents)
     last_step_1 = fe_steps.load_to_vector_db(cleaned_documents)
@@ -54,4 +62,6 @@ def feature_engineering(author_full_names: list[str], wait_for: str | list[str]
     embedded_documents = fe_steps.chunk_and_embed(cleaned_documents)
     last_step_2 = fe_steps.load_to_vector_db(embedded_documents)
 
+    fe_steps.advance_watermarks(author_full_names, watermark, last_step_1, last_step_2)
+
     return [last_step_1.invocation_id, last_step_2.invocation_id]
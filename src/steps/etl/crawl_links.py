@@ -1,3 +1,8 @@
+import os
+import socket
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 from typing_extensions import Annotated
 from urllib.parse import urlparse
@@ -7,23 +12,99 @@ from tqdm import tqdm
 from zenml import get_step_context, step
 
 from llm_engineering.application.crawlers.dispatcher import CrawlerDispatcher
-from llm_engineering.domain.documents import UserDocument
+from llm_engineering.application.crawlers.instrumentation import CrawlTracer
+from llm_engineering.application.crawlers.scheduler import CrawlScheduler
+from llm_engineering.domain.documents import CrawlFrontierDocument, UserDocument
+from llm_engineering.domain.types import CrawlState
+from llm_engineering.settings import settings
 
 
 @step
-def crawl_links(user: UserDocument, links: list[str]) -> Annotated[List[str], "crawled_links"]:
+def crawl_links(user: UserDocument, links: list[str], distributed: bool = False) -> Annotated[List[str], "crawled_links"]:
+    """Crawl links into the data warehouse.
+
+    With `distributed=True` the links are only queued in the crawl frontier, to be crawled by
+    `python -m llm_engineering.application.crawlers.worker` processes on any number of machines.
+
+    Per-stage timings of each crawl are summarized per domain under "timings" in the step
+    metadata, and every trace is appended to CRAWL_TRACE_PATH when it is set.
+    """
 
     dispatcher = CrawlerDispatcher.build().register_linkedin().register_medium().register_github()
 
+    if distributed:
+        due_links, metadata, _ = _resume_from_frontier(dispatcher, user, links)
+        logger.info(f"Queued {len(due_links)} link(s) for the crawl workers.")
+
+        step_context = get_step_context()
+        step_context.add_output_metadata(output_name="crawled_links", metadata={"queued": len(due_links), **metadata})
+
+        return links
+
     logger.info(f"Starting to crawl you meathead... {len(links)} link(s).")
 
-    metadata = {}
-    successful_crawls = 0
-    for link in tqdm(links):
-        successful_crawl, crawled_domain = _crawl_link(dispatcher, link, user)
-        successful_crawls += successful_crawl
-        
-        metadata = _add_to_metadata(metadata, crawled_domain, successful_crawl)
+    # The frontier keeps per-link progress, so a restarted crawl resumes where the last one stopped
+    due_links, metadata, successful_crawls = _resume_from_frontier(dispatcher, user, links)
+
+    stored_links, links_to_crawl = _partition_stored_links(dispatcher, due_links)
+    logger.info(f"Skipping {len(stored_links)} link(s) already in the data warehouse.")
+
+    CrawlFrontierDocument.mark_done(user.id, stored_links)
+    for link in stored_links:
+        metadata = _add_to_metadata(metadata, urlparse(link).netloc, successful_crawl=True, skipped=True)
+
+    successful_crawls += len(stored_links)
+
+    tracer = CrawlTracer(trace_path=settings.CRAWL_TRACE_PATH)
+
+    # Links are leased like crawl workers do, so a worker draining the same frontier never crawls them concurrently
+    worker_id = f"crawl_links:{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    # One crawler per type serves every link of the session and is closed when the session ends
+    with dispatcher.session():
+        # Crawlers that fetch links together (e.g. generic articles) get all their links in one call
+        batches, scheduled_links = {}, []
+        for crawler_class, crawler_links in dispatcher.group_links(links_to_crawl).items():
+            if crawler_class.supports_batch:
+                batches[crawler_class] = crawler_links
+            else:
+                scheduled_links.extend(crawler_links)
+
+        # Batches run beside the scheduler, so articles download while GitHub and Medium links are crawled
+        with ThreadPoolExecutor(max_workers=max(len(batches), 1)) as executor:
+            batch_futures = {
+                executor.submit(_crawl_batch, dispatcher, crawler_class, crawler_links, user, tracer, worker_id): crawler_links
+                for crawler_class, crawler_links in batches.items()
+            }
+
+            scheduler = CrawlScheduler()
+            results = scheduler.run(
+                scheduled_links, crawl=lambda link: _crawl_link(dispatcher, link, user, tracer, worker_id)
+            )
+            for result in tqdm(results, total=len(scheduled_links)):
+                if result.info.get("leased_elsewhere"):
+                    metadata = _add_to_metadata(metadata, result.domain, successful_crawl=False, skipped=True)
+                    continue
+
+                _record_outcomes(user, {result.link: None if result.successful else result.error or "Failed"}, worker_id)
+                successful_crawls += result.successful
+
+                metadata = _add_to_metadata(metadata, result.domain, result.successful, link=result.link, info=result.info)
+
+            for future, crawler_links in batch_futures.items():
+                errors = future.result()
+                _record_outcomes(user, errors, worker_id)
+                for link in crawler_links:
+                    if link not in errors:
+                        metadata = _add_to_metadata(metadata, urlparse(link).netloc, successful_crawl=False, skipped=True)
+                        continue
+
+                    successful_crawls += errors[link] is None
+
+                    metadata = _add_to_metadata(metadata, urlparse(link).netloc, errors[link] is None)
+
+    for domain, timings in tracer.summary().items():
+        metadata.setdefault(domain, {})["timings"] = timings
 
     step_context = get_step_context()
     step_context.add_output_metadata(output_name="crawled_links", metadata=metadata)
@@ -32,25 +113,118 @@ def crawl_links(user: UserDocument, links: list[str]) -> Annotated[List[str], "c
 
     return links
 
-def _crawl_link(dispatcher:CrawlerDispatcher, link:str, user: UserDocument) -> tuple[bool,str]:
+def _resume_from_frontier(dispatcher: CrawlerDispatcher, user: UserDocument, links: list[str]) -> tuple[list[str], dict, int]:
+    """Register links in the crawl frontier and return (links due now, metadata of the others, number already done).
 
-    crawler = dispatcher.get_crawler(link)
-    crawler_domain = urlparse(link).netloc
+    Done links are never crawled again, except for crawlers that re-crawl stored links, whose checks are cheap.
+    Failed links wait for their retry backoff and are given up after CRAWL_MAX_ATTEMPTS.
+    """
 
-    try:
-        crawler.extract(link=link, user=user)
+    CrawlFrontierDocument.enqueue(user.id, links)
+    CrawlFrontierDocument.reset_done(
+        user.id, [link for link in links if dispatcher.get_crawler_class(link).recrawl_stored_links]
+    )
+
+    due_links = CrawlFrontierDocument.get_due(user.id, links)
+    due = set(due_links)
+    states = CrawlFrontierDocument.get_states(user.id, [link for link in links if link not in due])
 
-        return(True, crawler_domain)
+    metadata = {}
+    done = 0
+    for link, state in states.items():
+        done += state == CrawlState.DONE
+        metadata = _add_to_metadata(
+            metadata, urlparse(link).netloc, successful_crawl=state == CrawlState.DONE, skipped=True
+        )
 
+    logger.info(
+        f"Crawl frontier: {len(due_links)} link(s) due, {done} already done, {len(states) - done} waiting for a retry or given up."
+    )
+
+    return due_links, metadata, done
+
+def _record_outcomes(user: UserDocument, errors: dict[str, str | None], worker_id: str | None = None) -> None:
+    """Record crawl outcomes. With `worker_id`, only links still leased by it are updated."""
+
+    CrawlFrontierDocument.mark_done(user.id, [link for link, error in errors.items() if error is None], worker_id=worker_id)
+    CrawlFrontierDocument.mark_failed(
+        user.id, {link: error for link, error in errors.items() if error is not None}, worker_id=worker_id
+    )
+
+def _partition_stored_links(dispatcher: CrawlerDispatcher, links: list[str]) -> tuple[list[str], list[str]]:
+    """Split links into (already stored, to crawl) with one `$in` query per document collection.
+
+    Links of crawlers that re-crawl stored links (e.g. GitHub, which checks for new commits) are always crawled.
+    """
+
+    links_by_model = defaultdict(list)
+    for link in links:
+        crawler_class = dispatcher.get_crawler_class(link)
+        if not crawler_class.recrawl_stored_links:
+            links_by_model[crawler_class.model].append(link)
+
+    stored = set()
+    for model, model_links in links_by_model.items():
+        stored |= model.find_existing("link", model_links)
+
+    stored_links = [link for link in links if link in stored]
+    links_to_crawl = [link for link in links if link not in stored]
+
+    return stored_links, links_to_crawl
+
+def _crawl_batch(
+    dispatcher: CrawlerDispatcher,
+    crawler_class: type,
+    links: list[str],
+    user: UserDocument,
+    tracer: CrawlTracer,
+    worker_id: str,
+) -> dict[str, str | None]:
+    """Crawl links with one `extract_many` call. Runs on its own thread, so a failing batch fails only its links.
+
+    Only the links this step could lease are crawled and returned; the others are being crawled elsewhere.
+    """
+
+    links = CrawlFrontierDocument.lease_links(user.id, links, worker_id)
+    if not links:
+        return {}
+
+    try:
+        with tracer.activate():
+            return dispatcher.get_crawler_instance(crawler_class).extract_many(links, user=user)
     except Exception as e:
-        logger.error(f"An error occurred while crawling: {e!s}")
+        logger.error(f"An error occurred while crawling a batch of {len(links)} link(s): {e!s}")
+
+        return {link: str(e) or type(e).__name__ for link in links}
+
+def _crawl_link(
+    dispatcher: CrawlerDispatcher, link: str, user: UserDocument, tracer: CrawlTracer, worker_id: str
+) -> dict | None:
+    """Crawl a single link. Runs on a scheduler worker thread, which reports any exception as a failed crawl.
+
+    A link leased by another worker in the meantime is left to it and reported with `leased_elsewhere`.
+    """
+
+    if not CrawlFrontierDocument.lease_links(user.id, [link], worker_id):
+        logger.info(f"Skipping {link}, it is being crawled by another worker.")
+
+        return {"leased_elsewhere": True}
+
+    crawler = dispatcher.get_crawler(link)
+
+    with tracer.trace(link, crawler=type(crawler).__name__):
+        return crawler.extract(link=link, user=user)
+
 
-        return (False, crawler_domain)
-    
-def _add_to_metadata(metadata:dict, domain:str, successful_crawl:bool) -> dict:
+def _add_to_metadata(
+    metadata:dict, domain:str, successful_crawl:bool, skipped: bool = False, link: str | None = None, info: dict | None = None
+) -> dict:
     if domain not in metadata:
         metadata[domain] = {}
+    if info and "tier" in info:
+        metadata[domain].setdefault("tiers", {})[link] = info["tier"]
     metadata[domain]["successful"] = metadata[domain].get("successful", 0) + successful_crawl
+    metadata[domain]["skipped"] = metadata[domain].get("skipped", 0) + skipped
     metadata[domain]["total"] = metadata[domain].get("total",0) +1
 
     return metadata
@@ -1,4 +1,5 @@
 ﻿from .query_data_warehouse import query_data_warehouse
+from .advance_watermarks import advance_watermarks
 from .clean import clean_documents
 from .load_to_vector_db import load_to_vector_db
 from .rag import chunk_and_embed
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from loguru import logger
+from typing_extensions import Annotated
+from zenml import step
+
+from llm_engineering.application import utils
+from llm_engineering.domain.documents import UserDocument, WatermarkDocument
+
+from .query_data_warehouse import WATERMARK_PIPELINE
+
+
+@step
+def advance_watermarks(
+    author_full_names: list[str], watermark: str, cleaned_loaded: bool, embedded_loaded: bool
+) -> Annotated[bool, "watermarks_advanced"]:
+    if not (cleaned_loaded and embedded_loaded):
+        logger.warning("Loading into the vector database failed. Keeping the previous watermarks.")
+
+        return False
+
+    authors = UserDocument.get_or_create_many(
+        [dict(zip(("first_name", "last_name"), utils.split_user_full_name(name))) for name in author_full_names]
+    )
+    WatermarkDocument.advance(WATERMARK_PIPELINE, [author.id for author in authors], datetime.fromisoformat(watermark))
+
+    logger.info(f"Advanced the watermark of {len(authors)} author(s) to {watermark}")
+
+    return True
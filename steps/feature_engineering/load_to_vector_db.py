@@ -1,6 +1,6 @@
 from loguru import logger
 from typing_extensions import Annotated
-from zenml import step
+from zenml import get_step_context, step
 
 from llm_engineering.application import utils
 from llm_engineering.domain.base import VectorBaseDocument
@@ -21,6 +21,25 @@ def load_to_vector_db(
                 logger.error(f"Failed to insert documents into {document_class.get_collection_name()}")
 
                 return False
-            
+
+    step_context = get_step_context()
+    step_context.add_output_metadata(output_name="successful", metadata=_get_metadata(grouped_documents))
+
     return True
 
+def _get_metadata(grouped_documents: dict[type[VectorBaseDocument], list[VectorBaseDocument]]) -> dict:
+    """
+    Per-collection, per-author document counts, aggregated by Qdrant instead of walking the documents.
+
+    The counts cover each whole collection after the load, including documents of earlier runs.
+    """
+
+    metadata = {}
+    for document_class, documents in grouped_documents.items():
+        metadata[document_class.get_collection_name()] = {
+            "num_loaded": len(documents),
+            "num_documents": document_class.count(),
+            "authors": document_class.count_by("author_full_name"),
+        }
+
+    return metadata
@@ -1,4 +1,6 @@
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Tuple
 
 from loguru import logger
 from typing_extensions import Annotated
@@ -6,42 +8,69 @@ from zenml import get_step_context, step
 
 from llm_engineering.application import utils
 from llm_engineering.domain.base.nosql import NoSQLBaseDocument
-from llm_engineering.domain.documents import ArticleDocument, Document, PostDocument, RepositoryDocument, UserDocument
+from llm_engineering.domain.documents import (
+    ArticleDocument,
+    Document,
+    PostDocument,
+    RepositoryDocument,
+    UserDocument,
+    WatermarkDocument,
+    ensure_indexes,
+)
+from llm_engineering.settings import settings
+
+WATERMARK_PIPELINE = "feature_engineering"
+
+# Documents are stamped with `updated_at` by the client right before they are written, so a write in
+# flight when the query starts, or a clock skewed between hosts, can land slightly behind it.
+# Re-reading that window on the next run is cheap and idempotent.
+WATERMARK_SAFETY_LAG = timedelta(minutes=5)
 
 
 @step
 def query_data_warehouse(
-    author_full_names: list[str]) -> Annotated[list, "raw_documents"]:
+    author_full_names: list[str], incremental: bool = False
+) -> Tuple[Annotated[list, "raw_documents"], Annotated[str, "watermark"]]:
+
+    ensure_indexes()
 
-    documents = []
-    authors = []
+    query_started_at = datetime.now(timezone.utc)
 
-    for author_full_name in author_full_names:
-        logger.info(f"Querying data warehouse for user: {author_full_name}")
+    logger.info(f"Querying data warehouse for {len(author_full_names)} user(s): {author_full_names}")
 
-        first_name, last_name = utils.split_user_full_name(author_full_name)
-        logger.info(f"First name: {first_name}, Last name: {last_name}")
-        user = UserDocument.get_or_create(first_name=first_name, last_name=last_name)
-        authors.append(user)
+    authors = UserDocument.get_or_create_many(
+        [dict(zip(("first_name", "last_name"), utils.split_user_full_name(name))) for name in author_full_names]
+    )
 
-        results = fetch_all_data(user)
-        user_documents = [doc for query_result in results.values() for doc in query_result]
+    watermarks = {}
+    if incremental:
+        watermarks = WatermarkDocument.get_watermarks(WATERMARK_PIPELINE, [author.id for author in authors])
+        logger.info(f"Fetching only documents updated since the last run for {len(watermarks)} user(s)")
 
-        documents.extend(user_documents)
+    filter_options = _build_authors_filter(authors, watermarks) if authors else {}
+    results = fetch_all_data(filter_options)
+    documents = [doc for query_result in results.values() for doc in query_result]
 
     step_context = get_step_context()
-    step_context.add_output_metadata(output_name="raw_documents", metadata=_get_metadata(documents))
+    metadata = _get_metadata(documents, filter_options)
+    metadata["incremental"] = incremental
+    step_context.add_output_metadata(output_name="raw_documents", metadata=metadata)
+
+    watermark = query_started_at - WATERMARK_SAFETY_LAG
+
+    return documents, watermark.isoformat()
 
+def fetch_all_data(filter_options: dict) -> dict[str, list[NoSQLBaseDocument]]:
+    """Fetch the documents of all authors with one query per collection, run on a single bounded executor."""
 
-    return documents
+    if not filter_options:
+        return {}
 
-def fetch_all_data(user: UserDocument) -> dict[str, list[NoSQLBaseDocument]]:
-    user_id = str(user.id)
-    with ThreadPoolExecutor() as executor:
+    with ThreadPoolExecutor(max_workers=settings.WAREHOUSE_QUERY_MAX_WORKERS) as executor:
         future_to_query = {
-            executor.submit(__fetch_articles, user_id): "articles",
-            executor.submit(__fetch_posts, user_id): "posts",
-            executor.submit(__fetch_repositories, user_id): "repositories",
+            executor.submit(__fetch_articles, filter_options): "articles",
+            executor.submit(__fetch_posts, filter_options): "posts",
+            executor.submit(__fetch_repositories, filter_options): "repositories",
 
         }
 
@@ -57,35 +86,42 @@ def fetch_all_data(user: UserDocument) -> dict[str, list[NoSQLBaseDocument]]:
 
     return results
 
-def __fetch_artcles(user_id) -> list[NoSQLBaseDocument]:
-    return ArticleDocument.bulk_find(author_id = user_id)
+def _build_authors_filter(authors: list[UserDocument], watermarks: dict[str, datetime]) -> dict:
+    full_author_ids = [str(author.id) for author in authors if str(author.id) not in watermarks]
+    clauses = [
+        {"author_id": author_id, "updated_at": {"$gt": watermark}} for author_id, watermark in watermarks.items()
+    ]
+    if full_author_ids:
+        clauses.append({"author_id": {"$in": full_author_ids}})
 
-def __fetch_posts(user_id) -> list[NoSQLBaseDocument]:
-    return RepositoryDocument.bulk_find(author_id=user_id)
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
 
-def _get_metadata(documents: list[Document]) -> dict:
-    metadata = {
-        "num_documents": len(documents),
-    }
-    for document in documents:
-        collection = document.get_collection_name()
-        if collection not in metadata:
-            metadata[collection] = {}
-        if "authors" not in metadata[collection]:
-            metadata[collection]["authors"] = list()
-
-        metadata[collection]["num_documents"] = metadata[collection].get("num_documents", 0) +1
-        metadata[collection]["authors"].append(document.author_full_name)
-
-    for value in metadata.values():
-        if isinstance(value, dict) and "authors" in value:
-            value["authors"] = list(set(value["authors"]))
-
-    return metadata
+def __fetch_articles(filter_options: dict) -> list[NoSQLBaseDocument]:
+    return ArticleDocument.bulk_find(**filter_options)
 
+def __fetch_posts(filter_options: dict) -> list[NoSQLBaseDocument]:
+    return PostDocument.bulk_find(**filter_options)
 
+def __fetch_repositories(filter_options: dict) -> list[NoSQLBaseDocument]:
+    return RepositoryDocument.bulk_find(**filter_options)
 
+def _get_metadata(documents: list[Document], filter_options: dict) -> dict:
+    """Per-collection, per-author document counts, aggregated by MongoDB instead of walking the documents."""
 
+    metadata = {
+        "num_documents": len(documents),
+    }
+    if not filter_options:
+        return metadata
 
+    for document_class in (ArticleDocument, PostDocument, RepositoryDocument):
+        groups = document_class.count_by(["author_full_name"], **filter_options)
+        if not groups:
+            continue
 
+        metadata[document_class.get_collection_name()] = {
+            "num_documents": sum(group["count"] for group in groups),
+            "authors": [group["author_full_name"] for group in groups],
+        }
 
+    return metadata
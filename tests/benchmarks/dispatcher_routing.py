@@ -0,0 +1,102 @@
+"""
+Benchmark: routing links to crawlers, host dictionary vs regex loop.
+
+CrawlerDispatcher used to try `re.match(r"https://(www\\.)?{domain}/*", url)` for every
+registered domain on every link. It now looks the host up in a dict of registered hosts,
+falling back to precompiled host patterns with the result cached per host. This times both
+over the same mix of Medium, LinkedIn, GitHub and unregistered blog links. No network or
+database is needed.
+
+Usage:
+    python tests/benchmarks/dispatcher_routing.py --links 40000 --repeats 5
+"""
+
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from loguru import logger
+
+from llm_engineering.application.crawlers.custom_article import CustomArticleCrawler
+from llm_engineering.application.crawlers.dispatcher import CrawlerDispatcher
+from llm_engineering.application.crawlers.github import GithubCrawler
+from llm_engineering.application.crawlers.linkedin import LinkedInCrawler
+from llm_engineering.application.crawlers.medium import MediumCrawler
+
+LINK_TEMPLATES = (
+    "https://medium.com/@someone/post-{}",
+    "https://www.linkedin.com/in/someone/recent-activity/{}",
+    "https://github.com/someone/repo-{}",
+    "https://blog{}.example.com/articles/post",
+)
+
+
+class RegexLoopDispatcher:
+    """The previous routing: one `re.match` per registered domain, in registration order."""
+
+    def __init__(self) -> None:
+        self._crawlers = {}
+        for domain, crawler in (
+            ("linkedin.com", LinkedInCrawler),
+            ("medium.com", MediumCrawler),
+            ("github.com", GithubCrawler),
+        ):
+            self._crawlers[r"https://(www\.)?{}/*".format(re.escape(domain))] = crawler
+
+    def get_crawler_class(self, url: str):
+        for pattern, crawler in self._crawlers.items():
+            if re.match(pattern, url):
+                return crawler
+
+        return CustomArticleCrawler
+
+
+def _time_routing(dispatcher, links: list[str], repeats: int) -> list[float]:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for link in links:
+            dispatcher.get_crawler_class(link)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--links", type=int, default=40_000)
+    parser.add_argument("--unregistered-hosts", type=int, default=200, help="Distinct hosts of unregistered links")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(0)
+    links = []
+    for i in range(args.links):
+        template = random.choice(LINK_TEMPLATES)
+        links.append(template.format(i % args.unregistered_hosts if template.startswith("https://blog") else i))
+
+    # The dispatcher warns about each unregistered host once; keep that out of the timings
+    logger.disable("llm_engineering")
+
+    dispatchers = {
+        "regex loop": RegexLoopDispatcher(),
+        "host dict": CrawlerDispatcher.build().register_linkedin().register_medium().register_github(),
+    }
+    mismatches = [link for link in links if len({d.get_crawler_class(link) for d in dispatchers.values()}) > 1]
+    if mismatches:
+        raise SystemExit(f"Routings differ, e.g. for {mismatches[0]}")
+
+    print(f"{len(links)} links, best / median of {args.repeats} runs")
+    for name, dispatcher in dispatchers.items():
+        timings = _time_routing(dispatcher, links, args.repeats)
+        print(f"{name:>10} | best={min(timings):.1f}ms median={statistics.median(timings):.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
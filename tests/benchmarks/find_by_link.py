@@ -0,0 +1,90 @@
+"""
+Benchmark: find-by-link latency vs collection size, with and without the `link` index.
+
+Every crawler looks up `{"link": link}` before crawling, so this is the query that degrades
+as the data warehouse grows. Runs against the MongoDB in settings.DATABASE_HOST, in a
+scratch database that is dropped afterwards.
+
+Usage:
+    python tests/benchmarks/find_by_link.py --sizes 1000 10000 100000 --lookups 200
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from pymongo import ASCENDING, MongoClient
+
+from llm_engineering.settings import settings
+
+BENCHMARK_DATABASE_NAME = f"{settings.DATABASE_NAME}_benchmark"
+
+
+def _populate(collection, size: int) -> list[str]:
+    links = [f"https://example.com/articles/{uuid.uuid4()}" for _ in range(size)]
+    author_id = str(uuid.uuid4())
+    for start in range(0, size, 5000):
+        collection.insert_many(
+            {
+                "_id": str(uuid.uuid4()),
+                "link": link,
+                "platform": "example.com",
+                "author_id": author_id,
+                "author_full_name": "Benchmark Author",
+                "content": {"Title": "Benchmark", "Content": "lorem ipsum " * 50},
+            }
+            for link in links[start : start + 5000]
+        )
+
+    return links
+
+
+def _time_lookups(collection, links: list[str], lookups: int) -> list[float]:
+    timings = []
+    for link in random.sample(links, min(lookups, len(links))):
+        start = time.perf_counter()
+        collection.find_one({"link": link})
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return timings
+
+
+def _summary(timings: list[float]) -> str:
+    quantiles = statistics.quantiles(timings, n=100)
+
+    return f"p50={quantiles[49]:.2f}ms p95={quantiles[94]:.2f}ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    client = MongoClient(settings.DATABASE_HOST)
+    database = client[BENCHMARK_DATABASE_NAME]
+
+    try:
+        print(f"{'documents':>10} | {'collection scan':>28} | {'link index':>28}")
+        for size in args.sizes:
+            collection = database[f"articles_{size}"]
+            links = _populate(collection, size)
+
+            scan_timings = _time_lookups(collection, links, args.lookups)
+            collection.create_index([("link", ASCENDING)], unique=True)
+            index_timings = _time_lookups(collection, links, args.lookups)
+
+            print(f"{size:>10} | {_summary(scan_timings):>28} | {_summary(index_timings):>28}")
+    finally:
+        client.drop_database(BENCHMARK_DATABASE_NAME)
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
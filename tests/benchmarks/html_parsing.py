@@ -0,0 +1,109 @@
+"""
+Benchmark: HTML parse and extraction time per BeautifulSoup tree builder.
+
+Crawlers parse full page sources, which reach several megabytes for LinkedIn
+feeds after scrolling. For every installed tree builder this times parsing each
+fixture page once, then running the section extractors the crawlers use on the
+parsed tree.
+
+By default the pages in tests/benchmarks/fixtures are used: a Medium article
+(hashed utility classes, large inline Apollo state), a LinkedIn profile feed
+after scrolling (deeply nested posts, hidden JSON payloads) and a WordPress-style
+blog article (navigation, sidebar, comment thread). They reproduce the markup
+structure and size of those pages with generated text, not anyone's content.
+Pass another directory of saved page sources (*.html) to benchmark real pages,
+or --synthetic-posts to add a generated feed of any size.
+
+Usage:
+    python tests/benchmarks/html_parsing.py --repeat 5
+    python tests/benchmarks/html_parsing.py --fixtures path/to/saved/pages
+    python tests/benchmarks/html_parsing.py --synthetic-posts 3000
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from bs4 import BeautifulSoup
+
+from llm_engineering.application.crawlers.html_parsing import PARSER_PACKAGES, get_parser_name, is_available
+
+POST_CLASS = "update-components-text relative update-components-update-v2__commentary"
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def _synthetic_feed(posts: int) -> str:
+    post = (
+        '<div class="feed-shared-update-v2"><div class="{cls}"><span dir="ltr">Post {i}: '
+        + "Shipping an LLM twin means crawling, cleaning and embedding everything you wrote. " * 5
+        + '</span></div><button class="update-components-image__image-link">'
+        '<img src="https://media.example.com/{i}.jpg" alt="image"></button></div>'
+    )
+    body = "".join(post.format(cls=POST_CLASS, i=i) for i in range(posts))
+
+    return (
+        '<html lang="en"><head><title>Feed</title><meta name="description" content="Synthetic feed"></head>'
+        '<body><h1 class="text-heading-xlarge">Benchmark Author</h1><div class="display-flex ph5 pv3">About</div>'
+        f'<div id="main-content">{body}</div></body></html>'
+    )
+
+
+def _extract_sections(soup: BeautifulSoup) -> int:
+    # The lookups LinkedInCrawler and MediumCrawler run on a parsed page
+    soup.find("h1", class_="text-heading-xlarge")
+    soup.find("div", class_="display-flex ph5 pv3")
+    soup.find("h1", class_="pw-post-title")
+    posts = soup.find_all("div", class_=POST_CLASS)
+    images = soup.find_all("button", class_="update-components-image__image-link")
+    texts = [post.get_text(strip=True, separator="\n") for post in posts]
+
+    return len(texts) + len(images)
+
+
+def _time(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Directory of saved page sources (*.html)")
+    parser.add_argument("--synthetic-posts", type=int, default=0, help="Also benchmark a generated feed of this many posts")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(args.fixtures, "*.html"))):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            pages[os.path.basename(path)] = f.read()
+    if args.synthetic_posts:
+        pages[f"synthetic feed ({args.synthetic_posts} posts)"] = _synthetic_feed(args.synthetic_posts)
+    if not pages:
+        parser.error(f"No *.html pages in {args.fixtures}")
+
+    parsers = [name for name in PARSER_PACKAGES if is_available(name)]
+    print(f"Installed tree builders: {', '.join(parsers)} (crawlers use: {get_parser_name()})")
+
+    for page_name, markup in pages.items():
+        print(f"\n{page_name}: {len(markup) / 1024 / 1024:.1f} MB")
+        print(f"{'parser':>12} | {'parse':>10} | {'extract':>10}")
+        for name in parsers:
+            parse_ms = _time(lambda: BeautifulSoup(markup, name), args.repeat)
+            soup = BeautifulSoup(markup, name)
+            extract_ms = _time(lambda: _extract_sections(soup), args.repeat)
+
+            print(f"{name:>12} | {parse_ms:>8.0f}ms | {extract_ms:>8.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
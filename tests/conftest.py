@@ -0,0 +1,16 @@
+import mongomock
+import pytest
+
+from llm_engineering.domain.base import nosql
+from llm_engineering.infrastructure.db.mongo import _client_options
+
+
+@pytest.fixture
+def mongo_db(monkeypatch):
+    """An in-memory MongoDB database that every NoSQL document reads from and writes to."""
+
+    # Same client options as production, e.g. tz_aware
+    database = mongomock.MongoClient(**_client_options())["llm_twin_test"]
+    monkeypatch.setattr(nosql, "get_database", lambda: database)
+
+    return database
@@ -0,0 +1,95 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from llm_engineering.domain.documents import CrawlFrontierDocument
+from llm_engineering.domain.types import CrawlState
+from llm_engineering.settings import settings
+
+LINKS = ["https://medium.com/@someone/a", "https://medium.com/@someone/b", "https://github.com/someone/c"]
+
+
+@pytest.fixture
+def author_id(mongo_db):
+    author_id = uuid.uuid4()
+    CrawlFrontierDocument.enqueue(author_id, LINKS)
+
+    return author_id
+
+
+def _states(author_id) -> dict[str, CrawlState]:
+    return CrawlFrontierDocument.get_states(author_id, LINKS)
+
+
+def test_lease_hands_each_due_link_to_a_single_worker(author_id):
+    leased = [CrawlFrontierDocument.lease(f"worker-{i % 2}", author_id=author_id) for i in range(len(LINKS) + 1)]
+
+    assert sorted(job.link for job in leased[:-1]) == sorted(LINKS)
+    assert leased[-1] is None
+    assert set(_states(author_id).values()) == {CrawlState.IN_PROGRESS}
+
+
+def test_expired_lease_is_taken_over_and_the_old_worker_cannot_record_it(author_id, mongo_db):
+    job = CrawlFrontierDocument.lease("worker-a", author_id=author_id)
+    mongo_db["crawl_frontier"].update_one({"_id": str(job.id)}, {"$set": {"leased_until": datetime.now(timezone.utc) - timedelta(seconds=1)}})
+
+    taken_over = CrawlFrontierDocument.lease("worker-b", author_id=author_id)
+    assert taken_over.link == job.link
+    assert taken_over.attempts == 2
+    assert not job.renew_lease()
+
+    CrawlFrontierDocument.mark_done(author_id, [job.link], worker_id="worker-a")
+    assert _states(author_id)[job.link] == CrawlState.IN_PROGRESS
+
+    CrawlFrontierDocument.mark_done(author_id, [job.link], worker_id="worker-b")
+    assert _states(author_id)[job.link] == CrawlState.DONE
+
+
+def test_links_whose_leases_keep_expiring_are_given_up_after_the_max_attempts(author_id, mongo_db, monkeypatch):
+    monkeypatch.setattr(settings, "CRAWL_MAX_ATTEMPTS", 2)
+    expired = {"$set": {"leased_until": datetime.now(timezone.utc) - timedelta(seconds=1)}}
+
+    first = CrawlFrontierDocument.lease("worker-a", author_id=author_id)
+    mongo_db["crawl_frontier"].update_one({"_id": str(first.id)}, expired)
+    second = CrawlFrontierDocument.lease("worker-b", author_id=author_id)
+    assert (second.link, second.attempts) == (first.link, 2)
+
+    mongo_db["crawl_frontier"].update_one({"_id": str(second.id)}, expired)
+    leased = {CrawlFrontierDocument.lease("worker-c", author_id=author_id).link for _ in LINKS[1:]}
+
+    assert first.link not in leased
+    assert CrawlFrontierDocument.lease("worker-c", author_id=author_id) is None
+    assert CrawlFrontierDocument.get_due(author_id, LINKS) == []
+
+
+def test_lease_links_skips_links_leased_by_another_worker(author_id):
+    job = CrawlFrontierDocument.lease("crawl-worker", author_id=author_id)
+
+    leased = CrawlFrontierDocument.lease_links(author_id, LINKS, "crawl_links")
+
+    assert leased == [link for link in LINKS if link != job.link]
+    assert CrawlFrontierDocument.lease_links(author_id, LINKS, "another crawl_links") == []
+    assert CrawlFrontierDocument.lease("crawl-worker", author_id=author_id) is None
+
+
+def test_failed_links_are_retried_after_their_backoff(author_id):
+    (link,) = CrawlFrontierDocument.lease_links(author_id, LINKS[:1], "crawl_links")
+    CrawlFrontierDocument.mark_failed(author_id, {link: "HTTP 503"}, worker_id="crawl_links")
+
+    assert CrawlFrontierDocument.lease_links(author_id, [link], "crawl_links") == []
+    assert _states(author_id)[link] == CrawlState.FAILED
+
+
+def test_crawl_links_leaves_links_leased_by_a_worker_alone(author_id):
+    pytest.importorskip("zenml")
+    from src.steps.etl.crawl_links import _crawl_link
+
+    class Dispatcher:
+        def get_crawler(self, link):
+            raise AssertionError(f"{link} was crawled while leased by another worker")
+
+    job = CrawlFrontierDocument.lease("crawl-worker", author_id=author_id)
+    user = type("User", (), {"id": author_id})()
+
+    assert _crawl_link(Dispatcher(), job.link, user, tracer=None, worker_id="crawl_links") == {"leased_elsewhere": True}
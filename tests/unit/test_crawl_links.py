@@ -0,0 +1,72 @@
+import uuid
+
+import pytest
+
+from llm_engineering.application.crawlers.dispatcher import CrawlerDispatcher
+from llm_engineering.domain.documents import ArticleDocument, PostDocument, RepositoryDocument
+
+AUTHOR_ID = uuid.uuid4()
+
+
+@pytest.fixture
+def partition_stored_links():
+    pytest.importorskip("zenml")
+    from src.steps.etl.crawl_links import _partition_stored_links
+
+    return _partition_stored_links
+
+
+@pytest.fixture
+def dispatcher() -> CrawlerDispatcher:
+    return CrawlerDispatcher.build().register_linkedin().register_medium().register_github()
+
+
+def _store(document_class, link: str, **fields) -> None:
+    document_class(link=link, author_id=AUTHOR_ID, author_full_name="Some One", **fields).save()
+
+
+def test_stored_links_are_skipped_and_new_links_crawled_in_their_order(mongo_db, dispatcher, partition_stored_links):
+    _store(ArticleDocument, "https://medium.com/@someone/stored", content={}, platform="medium")
+    _store(PostDocument, "https://www.linkedin.com/in/someone/stored", content={}, platform="linkedin")
+    links = [
+        "https://medium.com/@someone/new",
+        "https://www.linkedin.com/in/someone/stored",
+        "https://medium.com/@someone/stored",
+        "https://www.linkedin.com/in/someone/new",
+    ]
+
+    stored_links, links_to_crawl = partition_stored_links(dispatcher, links)
+
+    assert stored_links == [links[1], links[2]]
+    assert links_to_crawl == [links[0], links[3]]
+
+
+def test_links_of_crawlers_that_recrawl_stored_links_are_always_crawled(mongo_db, dispatcher, partition_stored_links):
+    _store(RepositoryDocument, "https://github.com/someone/repo", content={}, platform="github", name="repo")
+    _store(ArticleDocument, "https://blog.example.com/post", content={}, platform="blog.example.com")
+    links = ["https://github.com/someone/repo", "https://blog.example.com/post"]
+
+    assert partition_stored_links(dispatcher, links) == ([], links)
+
+
+def test_stored_links_are_looked_up_with_one_query_per_collection(
+    mongo_db, dispatcher, partition_stored_links, monkeypatch
+):
+    queries = []
+    find_existing = ArticleDocument.find_existing.__func__
+
+    def spy(cls, field, values):
+        queries.append((cls, list(values)))
+
+        return find_existing(cls, field, values)
+
+    for document_class in (ArticleDocument, PostDocument):
+        monkeypatch.setattr(document_class, "find_existing", classmethod(spy))
+
+    links = [f"https://medium.com/@someone/{i}" for i in range(3)] + ["https://linkedin.com/in/someone/1"]
+    partition_stored_links(dispatcher, links)
+
+    assert sorted((cls.__name__, values) for cls, values in queries) == [
+        ("ArticleDocument", links[:3]),
+        ("PostDocument", links[3:]),
+    ]
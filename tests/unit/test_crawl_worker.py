@@ -0,0 +1,76 @@
+from llm_engineering.application.crawlers.base import BaseCrawler
+from llm_engineering.application.crawlers.dispatcher import CrawlerDispatcher
+from llm_engineering.application.crawlers.worker import CrawlWorker
+from llm_engineering.domain.documents import ArticleDocument, CrawlFrontierDocument, UserDocument
+from llm_engineering.domain.types import CrawlState
+
+LINKS = ["https://example.com/a", "https://example.com/b"]
+
+
+class RecordingCrawler(BaseCrawler):
+    model = ArticleDocument
+    instances: list["RecordingCrawler"] = []
+
+    def __init__(self) -> None:
+        self.crawled: list[str] = []
+        self.closed = False
+        RecordingCrawler.instances.append(self)
+
+    def extract(self, link: str, **kwargs) -> None:
+        assert not self.closed
+        self.crawled.append(link)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def _dispatcher() -> CrawlerDispatcher:
+    RecordingCrawler.instances = []
+    dispatcher = CrawlerDispatcher.build()
+    dispatcher.register("https://example.com", RecordingCrawler)
+
+    return dispatcher
+
+
+def _enqueue() -> UserDocument:
+    user = UserDocument.get_or_create(first_name="Some", last_name="One")
+    CrawlFrontierDocument.enqueue(user.id, LINKS)
+
+    return user
+
+
+def test_run_reuses_one_crawler_and_closes_it_when_the_run_ends(mongo_db):
+    user = _enqueue()
+    worker = CrawlWorker(dispatcher=_dispatcher(), poll_interval=0)
+
+    assert worker.run(idle_timeout=0) == 2
+
+    (crawler,) = RecordingCrawler.instances
+    assert sorted(crawler.crawled) == LINKS
+    assert crawler.closed
+    assert set(CrawlFrontierDocument.get_states(user.id, LINKS).values()) == {CrawlState.DONE}
+
+
+def test_crawlers_of_a_session_opened_by_the_caller_are_left_open(mongo_db):
+    _enqueue()
+    dispatcher = _dispatcher()
+    worker = CrawlWorker(dispatcher=dispatcher, poll_interval=0)
+
+    with dispatcher.session():
+        worker.run(idle_timeout=0)
+        worker.run_once()
+
+        (crawler,) = RecordingCrawler.instances
+        assert not crawler.closed
+
+    assert crawler.closed
+
+
+def test_run_once_closes_the_crawler_it_created(mongo_db):
+    _enqueue()
+    worker = CrawlWorker(dispatcher=_dispatcher(), poll_interval=0)
+
+    assert worker.run_once()
+
+    (crawler,) = RecordingCrawler.instances
+    assert crawler.closed
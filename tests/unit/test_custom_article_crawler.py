@@ -0,0 +1,150 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from llm_engineering.application.crawlers import custom_article
+from llm_engineering.application.crawlers.custom_article import CustomArticleCrawler
+from llm_engineering.application.crawlers.http_cache import HttpCache, HttpCacheEntry, fetch
+from llm_engineering.domain.documents import ArticleDocument, UserDocument
+
+PAGE = "<html lang='en'><head><title>{title}</title></head><body><p>{title} body</p></body></html>"
+
+
+class ArticleServer:
+    """Serves one article with an ETag and answers conditional GETs with 304 Not Modified."""
+
+    def __init__(self) -> None:
+        self.version = 1
+        self.statuses: list[int] = []
+
+    async def handle(self, request: web.Request) -> web.Response:
+        etag = f'"v{self.version}"'
+        if request.headers.get("If-None-Match") == etag:
+            self.statuses.append(304)
+
+            return web.Response(status=304, headers={"ETag": etag})
+
+        self.statuses.append(200)
+
+        return web.Response(text=PAGE.format(title=f"Version {self.version}"), content_type="text/html", headers={"ETag": etag})
+
+
+@pytest.mark.parametrize("batch", [True, False])
+def test_recrawls_revalidate_stored_articles_through_the_cache(mongo_db, tmp_path, batch):
+    crawler = CustomArticleCrawler(cache=HttpCache(tmp_path))
+    server = ArticleServer()
+    user = UserDocument(first_name="Some", last_name="One")
+
+    def crawl(link: str) -> None:
+        if batch:
+            assert crawler.extract_many([link], user=user) == {link: None}
+        else:
+            crawler.extract(link, user=user)
+
+    async def run() -> None:
+        app = web.Application()
+        app.router.add_get("/post", server.handle)
+        async with TestServer(app) as test_server:
+            link = str(test_server.make_url("/post"))
+
+            # The crawler runs its own event loop, so it crawls from another thread
+            await asyncio.to_thread(crawl, link)
+            first = ArticleDocument.find(link=link)
+
+            await asyncio.to_thread(crawl, link)
+            assert server.statuses == [200, 304]
+            assert ArticleDocument.find(link=link).updated_at == first.updated_at
+
+            server.version = 2
+            await asyncio.to_thread(crawl, link)
+            updated = ArticleDocument.find(link=link)
+            assert server.statuses == [200, 304, 200]
+            assert updated.content["Title"] == "Version 2"
+            assert updated.id == first.id
+
+    asyncio.run(run())
+
+    assert mongo_db[ArticleDocument.get_collection_name()].count_documents({}) == 1
+
+
+def test_cleanup_removes_expired_then_least_recently_used_entries(tmp_path):
+    cache = HttpCache(tmp_path)
+    for i in range(4):
+        cache.put(HttpCacheEntry(url=f"https://example.com/{i}", body="x" * 100))
+
+    now = time.time()
+    for i, age in enumerate([0, 10, 20, 3600 * 24 * 60]):
+        os.utime(cache._path(f"https://example.com/{i}"), (now - age, now - age))
+    size = os.path.getsize(cache._path("https://example.com/0"))
+
+    removed = cache.cleanup(max_age=timedelta(days=30), max_bytes=2 * size)
+
+    assert removed == 2
+    assert [cache.get(f"https://example.com/{i}") is not None for i in range(4)] == [True, True, False, False]
+
+
+@pytest.mark.parametrize("validators", [True, False])
+def test_unchanged_pages_count_as_recently_used(tmp_path, validators):
+    cache = HttpCache(tmp_path)
+    etag = '"v1"' if validators else None
+
+    async def handle(request: web.Request) -> web.Response:
+        if etag is not None and request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304)
+
+        return web.Response(text=PAGE.format(title="Same"), headers={"ETag": etag} if etag else {})
+
+    async def run() -> None:
+        app = web.Application()
+        app.router.add_get("/post", handle)
+        async with TestServer(app) as test_server, aiohttp.ClientSession() as session:
+            link = str(test_server.make_url("/post"))
+            cache.put(HttpCacheEntry(url=link, body=PAGE.format(title="Same"), etag=etag, content={"Title": "Same"}))
+            stale = time.time() - 3600
+            os.utime(cache._path(link), (stale, stale))
+
+            entry, unchanged = await fetch(session, link, cache)
+
+            assert unchanged and entry.content == {"Title": "Same"}
+            assert os.path.getmtime(cache._path(link)) > stale + 60
+
+    asyncio.run(run())
+
+
+def test_batches_served_from_the_cache_start_no_transform_processes(mongo_db, tmp_path, monkeypatch):
+    pools = []
+
+    class RecordingPool(ThreadPoolExecutor):
+        def __init__(self, max_workers: int, mp_context) -> None:
+            super().__init__(max_workers=max_workers)
+            self.start_method = mp_context.get_start_method()
+            pools.append(self)
+
+    monkeypatch.setattr(custom_article, "ProcessPoolExecutor", RecordingPool)
+    crawler = CustomArticleCrawler(cache=HttpCache(tmp_path))
+    server = ArticleServer()
+    user = UserDocument(first_name="Some", last_name="One")
+
+    async def run() -> None:
+        app = web.Application()
+        app.router.add_get("/post", server.handle)
+        async with TestServer(app) as test_server:
+            link = str(test_server.make_url("/post"))
+
+            await asyncio.to_thread(crawler.extract_many, [link], user=user)
+            assert len(pools) == 1
+            # The crawl process is multi-threaded, so its workers must not be forked
+            assert pools[0].start_method in ("forkserver", "spawn")
+
+            await asyncio.to_thread(crawler.extract_many, [link], user=user)
+            assert server.statuses == [200, 304]
+            assert len(pools) == 1
+
+    asyncio.run(run())
@@ -0,0 +1,152 @@
+import importlib.util
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from llm_engineering.domain.documents import ArticleDocument, RepositoryDocument, UserDocument
+from llm_engineering.domain.exceptions import DatabaseError
+
+SAFETY_LAG = timedelta(minutes=5)
+
+
+def _article(author_id: uuid.UUID, link: str, built_at: datetime) -> ArticleDocument:
+    return ArticleDocument(
+        content={"Content": "text"},
+        platform="medium",
+        link=link,
+        author_id=author_id,
+        author_full_name="Some One",
+        updated_at=built_at,
+    )
+
+
+def test_documents_saved_after_a_watermark_are_found_by_the_next_incremental_query(mongo_db):
+    author_id = uuid.uuid4()
+    # Built well before the previous run started, but only saved after it
+    built_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    built_long_ago = _article(author_id, "https://medium.com/@someone/slow", built_at)
+    batch = [_article(author_id, f"https://medium.com/@someone/{i}", built_at) for i in range(2)]
+
+    watermark = datetime.now(timezone.utc) - SAFETY_LAG
+    built_long_ago.save()
+    ArticleDocument.bulk_write(batch, upsert=True)
+
+    found = ArticleDocument.bulk_find(author_id=str(author_id), updated_at={"$gt": watermark})
+
+    assert {article.link for article in found} == {built_long_ago.link, *(article.link for article in batch)}
+
+
+def test_upserting_an_existing_document_moves_it_past_the_watermark(mongo_db):
+    author_id = uuid.uuid4()
+    repository = RepositoryDocument(
+        content={"repo/main.py": "print()"},
+        platform="github",
+        name="repo",
+        link="https://github.com/someone/repo",
+        author_id=author_id,
+        author_full_name="Some One",
+    )
+    repository.save()
+
+    watermark = datetime.now(timezone.utc) - SAFETY_LAG
+    stored = RepositoryDocument.find(link=repository.link)
+    stored.updated_at = watermark - timedelta(hours=1)
+    stored.content = {"repo/main.py": "print('changed')"}
+    RepositoryDocument.bulk_write([stored], upsert=True)
+
+    found = RepositoryDocument.bulk_find(author_id=str(author_id), updated_at={"$gt": watermark})
+
+    assert [repository.content for repository in found] == [stored.content]
+
+
+@pytest.fixture
+def query_data_warehouse(mongo_db):
+    pytest.importorskip("zenml")
+    # Loaded by path: the feature_engineering package also imports the preprocessing steps
+    path = Path(__file__).parents[2] / "steps" / "feature_engineering" / "query_data_warehouse.py"
+    spec = importlib.util.spec_from_file_location("query_data_warehouse", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    return module
+
+
+def test_incremental_warehouse_query_returns_documents_saved_after_the_watermark(mongo_db, query_data_warehouse):
+    author = UserDocument.get_or_create(first_name="Some", last_name="One")
+    old = _article(author.id, "https://medium.com/@someone/old", datetime.now(timezone.utc))
+    old.save()
+    # Processed by the previous run
+    mongo_db[ArticleDocument.get_collection_name()].update_one(
+        {"link": old.link}, {"$set": {"updated_at": datetime.now(timezone.utc) - timedelta(hours=2)}}
+    )
+
+    watermark = datetime.now(timezone.utc) - query_data_warehouse.WATERMARK_SAFETY_LAG
+    late = _article(author.id, "https://medium.com/@someone/late", datetime.now(timezone.utc) - timedelta(hours=1))
+    late.save()
+
+    filter_options = query_data_warehouse._build_authors_filter([author], {str(author.id): watermark})
+    results = query_data_warehouse.fetch_all_data(filter_options)
+
+    assert [article.link for article in results["articles"]] == [late.link]
+
+
+def test_authors_filter_reads_authors_without_a_watermark_in_full(query_data_warehouse):
+    with_watermark, without_watermark = (UserDocument(first_name=name, last_name="One") for name in ("Some", "Other"))
+    watermark = datetime.now(timezone.utc)
+
+    assert query_data_warehouse._build_authors_filter([without_watermark], {}) == {
+        "author_id": {"$in": [str(without_watermark.id)]}
+    }
+    assert query_data_warehouse._build_authors_filter(
+        [with_watermark, without_watermark], {str(with_watermark.id): watermark}
+    ) == {
+        "$or": [
+            {"author_id": str(with_watermark.id), "updated_at": {"$gt": watermark}},
+            {"author_id": {"$in": [str(without_watermark.id)]}},
+        ]
+    }
+
+
+def test_warehouse_query_step_creates_missing_authors_and_reports_their_documents(
+    mongo_db, query_data_warehouse, monkeypatch
+):
+    step_metadata = {}
+
+    class StepContext:
+        def add_output_metadata(self, output_name: str, metadata: dict) -> None:
+            step_metadata[output_name] = metadata
+
+    monkeypatch.setattr(query_data_warehouse, "get_step_context", lambda: StepContext())
+    author = UserDocument.get_or_create(first_name="Some", last_name="One")
+    _article(author.id, "https://medium.com/@someone/1", datetime.now(timezone.utc)).save()
+
+    documents, _ = query_data_warehouse.query_data_warehouse.entrypoint(["Some One", "New Author"])
+
+    assert [document.link for document in documents] == ["https://medium.com/@someone/1"]
+    assert UserDocument.find(first_name="New", last_name="Author") is not None
+    assert step_metadata["raw_documents"]["num_documents"] == 1
+    assert step_metadata["raw_documents"]["articles"] == {"num_documents": 1, "authors": ["Some One"]}
+    assert step_metadata["raw_documents"]["incremental"] is False
+
+
+def test_ensure_indexes_raises_on_a_failing_index_and_still_creates_the_others(mongo_db):
+    collection = mongo_db[ArticleDocument.get_collection_name()]
+    collection.insert_many([{"_id": str(uuid.uuid4()), "link": "https://medium.com/@someone/dup"} for _ in range(2)])
+
+    with pytest.raises(DatabaseError, match="link_unique"):
+        ArticleDocument.ensure_indexes()
+
+    assert {"author_id_platform", "author_id_updated_at"} <= set(collection.index_information())
+    assert "link_unique" not in collection.index_information()
+
+
+def test_datetimes_are_read_back_timezone_aware(mongo_db):
+    article = _article(uuid.uuid4(), "https://medium.com/@someone/aware", datetime.now(timezone.utc))
+    article.save()
+
+    stored = ArticleDocument.find(link=article.link)
+
+    assert stored.updated_at.tzinfo is not None
+    assert stored.updated_at <= datetime.now(timezone.utc)
@@ -0,0 +1,132 @@
+import subprocess
+
+import pytest
+
+from llm_engineering.application.crawlers.github import GithubCrawler
+from llm_engineering.domain.base.nosql import WriteOutcome
+from llm_engineering.domain.documents import RepositoryDocument, UserDocument
+from llm_engineering.domain.exceptions import DatabaseError
+
+BUDGET_MB = 100 / 1024 / 1024  # 100 bytes
+
+
+@pytest.fixture
+def crawler() -> GithubCrawler:
+    return GithubCrawler(max_total_size_mb=BUDGET_MB)
+
+
+def _size(tree: dict) -> int:
+    return sum(len(content) for content in tree.values())
+
+
+def test_read_tree_keeps_code_files_within_the_budget(crawler, tmp_path):
+    (tmp_path / "notes.rst").write_text("n" * 40)
+    (tmp_path / "a.py").write_text("a" * 40)
+    (tmp_path / "b.py").write_text("b" * 40)
+    (tmp_path / "c.py").write_text("c" * 40)
+
+    tree = crawler._fit_to_budget(crawler._read_tree(str(tmp_path), "repo"), "repo")
+
+    assert list(tree) == ["a.py", "b.py"]
+
+
+def test_incremental_update_cannot_grow_past_the_budget(crawler):
+    stored = {"a.py": "a" * 40, "b.py": "b" * 40}
+    changed = {"c.py": "c" * 40, "a.py": "A" * 50}
+
+    tree = crawler._fit_to_budget(crawler._apply_changes(stored, {"a.py": True, "c.py": True}, changed), "repo")
+
+    assert tree == {"a.py": "A" * 50, "b.py": "b" * 40}
+    assert _size(tree) <= 100
+
+
+def _git(repo, *args: str) -> None:
+    subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True)
+
+
+@pytest.fixture
+def remote(tmp_path):
+    repo = tmp_path / "remote"
+    repo.mkdir()
+    _git(repo, "init", "--quiet")
+    _git(repo, "config", "user.email", "someone@example.com")
+    _git(repo, "config", "user.name", "Some One")
+    _git(repo, "config", "uploadpack.allowFilter", "true")
+    (repo / "a.py").write_text("a" * 40)
+    _git(repo, "add", ".")
+    _git(repo, "commit", "--quiet", "-m", "first")
+
+    return repo
+
+
+def test_incremental_crawl_bounds_the_merged_tree(crawler, mongo_db, remote):
+    link = f"file://{remote}"
+    crawler.extract(link, user=UserDocument(first_name="Some", last_name="One"))
+
+    (remote / "b.py").write_text("b" * 40)
+    (remote / "c.py").write_text("c" * 40)
+    _git(remote, "add", ".")
+    _git(remote, "commit", "--quiet", "-m", "second")
+    crawler.extract(link)
+
+    stored = RepositoryDocument.find(link=link)
+    assert stored.content == {"a.py": "a" * 40, "b.py": "b" * 40}
+
+
+def test_failed_update_is_raised(crawler, mongo_db, remote, monkeypatch):
+    link = f"file://{remote}"
+    crawler.extract(link, user=UserDocument(first_name="Some", last_name="One"))
+
+    (remote / "a.py").write_text("changed")
+    _git(remote, "commit", "--quiet", "-am", "second")
+    monkeypatch.setattr(RepositoryDocument, "bulk_write", classmethod(lambda cls, *args, **kwargs: [WriteOutcome.FAILED]))
+
+    with pytest.raises(DatabaseError):
+        crawler.extract(link)
+
+
+@pytest.mark.parametrize(
+    "link, remote_refs, parsed",
+    [
+        ("https://github.com/someone/repo", [], ("https://github.com/someone/repo", None, None)),
+        ("https://github.com/someone/repo/", [], ("https://github.com/someone/repo", None, None)),
+        ("https://github.com/someone/repo/tree/main", [], ("https://github.com/someone/repo", "main", None)),
+        ("https://github.com/someone/repo/tree/main/", [], ("https://github.com/someone/repo", "main", None)),
+        ("https://github.com/someone/repo/tree/main/src/pkg/", [], ("https://github.com/someone/repo", "main", "src/pkg")),
+        (
+            "https://github.com/someone/repo/tree/feature/x/src",
+            ["main", "feature", "feature/x"],
+            ("https://github.com/someone/repo", "feature/x", "src"),
+        ),
+        (
+            "https://github.com/someone/repo/tree/feature/x/",
+            ["main", "feature/x"],
+            ("https://github.com/someone/repo", "feature/x", None),
+        ),
+        (
+            "https://github.com/someone/repo/tree/feature/xy/src",
+            ["feature/x"],
+            ("https://github.com/someone/repo", "feature", "xy/src"),
+        ),
+        ("https://github.com/someone/repo/tree/v1.0/docs", ["v1.0"], ("https://github.com/someone/repo", "v1.0", "docs")),
+    ],
+)
+def test_parse_link_splits_clone_url_branch_and_subtree(link, remote_refs, parsed):
+    assert GithubCrawler._parse_link(link, remote_refs) == parsed
+
+
+def test_tree_link_on_a_branch_with_slashes_reads_only_its_subtree(crawler, mongo_db, remote):
+    _git(remote, "checkout", "--quiet", "-b", "feature/x")
+    (remote / "src").mkdir()
+    (remote / "src" / "b.py").write_text("b" * 10)
+    (remote / "src" / "logo.png").write_text("png")
+    (remote / "docs").mkdir()
+    (remote / "docs" / "c.md").write_text("c" * 10)
+    _git(remote, "add", ".")
+    _git(remote, "commit", "--quiet", "-m", "feature")
+    _git(remote, "checkout", "--quiet", "-")
+
+    link = f"file://{remote}/tree/feature/x/src/"
+    crawler.extract(link, user=UserDocument(first_name="Some", last_name="One"))
+
+    assert RepositoryDocument.find(link=link).content == {"b.py": "b" * 10}
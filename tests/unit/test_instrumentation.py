@@ -0,0 +1,60 @@
+import uuid
+
+import bson
+
+from llm_engineering.application.crawlers.instrumentation import CrawlTrace, CrawlTracer, _distribution, record_document
+from llm_engineering.domain.documents import RepositoryDocument
+from llm_engineering.settings import settings
+
+
+def test_distribution_uses_nearest_rank_percentiles():
+    distribution = _distribution([float(value) for value in range(10, 0, -1)])
+
+    assert distribution == {"p50": 5.0, "p90": 9.0, "p99": 10.0, "max": 10.0, "total": 55.0}
+    assert _distribution([3.0]) == {"p50": 3.0, "p90": 3.0, "p99": 3.0, "max": 3.0, "total": 3.0}
+    assert _distribution([]) == {}
+
+
+def test_summary_aggregates_traces_per_domain():
+    tracer = CrawlTracer()
+    for i in range(1, 5):
+        trace = CrawlTrace(link=f"https://medium.com/@someone/{i}", domain="medium.com", duration=float(i))
+        trace.add_stage("fetch", 0.1 * i)
+        trace.add_stage("render", 1.0, browser=True)
+        trace.bytes_fetched = 100 * i
+        tracer.finish(trace)
+    tracer.finish(CrawlTrace(link="https://github.com/someone/repo", domain="github.com"), error="HTTP 503")
+
+    summary = tracer.summary()
+
+    medium = summary["medium.com"]
+    assert medium["links"] == 4
+    assert medium["stages"]["fetch"]["p50"] == 0.2
+    assert medium["stages"]["render"]["total"] == 4.0
+    assert medium["browser_time"]["max"] == 1.0
+    assert medium["bytes_fetched"] == {"p50": 200, "p90": 400, "p99": 400, "max": 400, "total": 1000}
+    assert medium["document_bytes"] == {}
+    assert summary["github.com"]["links"] == 1
+
+
+def test_record_document_measures_the_stored_document(mongo_db, monkeypatch):
+    monkeypatch.setattr(settings, "MONGO_COMPRESSION_MIN_BYTES", 1)
+    repository = RepositoryDocument(
+        content={"repo/main.py": "print('hello')\n" * 1000},
+        platform="github",
+        name="repo",
+        link="https://github.com/someone/repo",
+        author_id=uuid.uuid4(),
+        author_full_name="Some One",
+    )
+    trace = CrawlTrace(link=repository.link, domain="github.com")
+
+    record_document(repository, trace)
+    assert trace.document_bytes == 0
+
+    repository.save()
+    record_document(repository, trace)
+
+    stored = mongo_db[RepositoryDocument.get_collection_name()].find_one({"link": repository.link})
+    assert trace.document_bytes == len(bson.encode(stored))
+    assert trace.document_bytes < len(repository.model_dump_json())
@@ -0,0 +1,80 @@
+from contextlib import contextmanager
+
+import pytest
+import requests
+
+from llm_engineering.application.crawlers import medium
+from llm_engineering.application.crawlers.html_parsing import parse_html
+from llm_engineering.application.crawlers.medium import MediumCrawler
+from llm_engineering.domain.documents import ArticleDocument, UserDocument
+
+LINK = "https://medium.com/@someone/post"
+ARTICLE = "<html><body><h1 class='pw-post-title'>{title}</h1><p>Body</p></body></html>"
+BLOCKED = "<html><body><p>Just a moment...</p></body></html>"
+
+
+class FakeBrowserCrawler(MediumCrawler):
+    """Renders a fixed page instead of driving Chrome."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.rendered: list[str] = []
+
+    @contextmanager
+    def browser(self):
+        yield None
+
+    def navigate(self, url: str) -> None:
+        self.rendered.append(url)
+
+    def scroll_page(self) -> None:
+        pass
+
+    def parse_page(self):
+        return parse_html(ARTICLE.format(title="Rendered"))
+
+
+def _response(status: int, body: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.url = LINK
+    response._content = body.encode("utf-8")
+    response.encoding = "utf-8"
+
+    return response
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    def serve(status: int, body: str) -> None:
+        monkeypatch.setattr(medium.requests, "get", lambda *args, **kwargs: _response(status, body))
+
+    return serve
+
+
+def _crawl() -> tuple[FakeBrowserCrawler, dict]:
+    crawler = FakeBrowserCrawler()
+    info = crawler.extract(LINK, user=UserDocument(first_name="Some", last_name="One"))
+
+    return crawler, info
+
+
+def test_server_rendered_articles_are_fetched_without_a_browser(mongo_db, serve):
+    serve(200, ARTICLE.format(title="Static"))
+
+    crawler, info = _crawl()
+
+    assert info == {"tier": "http"}
+    assert crawler.rendered == []
+    assert ArticleDocument.find(link=LINK).content["Title"] == "Static"
+
+
+@pytest.mark.parametrize("status, body", [(200, BLOCKED), (200, ""), (403, "Forbidden")])
+def test_blocked_or_empty_pages_fall_back_to_the_browser(mongo_db, serve, status, body):
+    serve(status, body)
+
+    crawler, info = _crawl()
+
+    assert info == {"tier": "browser"}
+    assert crawler.rendered == [LINK]
+    assert ArticleDocument.find(link=LINK).content["Title"] == "Rendered"
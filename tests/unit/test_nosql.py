@@ -0,0 +1,124 @@
+import uuid
+
+import pytest
+from pydantic import UUID4
+from pymongo import errors
+
+from llm_engineering.domain.base.nosql import NoSQLBaseDocument, WriteOutcome
+from llm_engineering.domain.exceptions import DatabaseError
+
+
+class NoteDocument(NoSQLBaseDocument):
+    owner_id: UUID4
+    title: str
+
+    class Settings:
+        name = "notes"
+
+
+def test_get_or_create_many_matches_uuid_filters_to_stored_strings(mongo_db):
+    owner_id = uuid.uuid4()
+    existing = NoteDocument.get_or_create(owner_id=owner_id, title="kept")
+
+    notes = NoteDocument.get_or_create_many(
+        [{"owner_id": owner_id, "title": "new"}, {"owner_id": str(owner_id), "title": "kept"}]
+    )
+
+    assert [note.title for note in notes] == ["new", "kept"]
+    assert notes[1].id == existing.id
+    assert all(note.owner_id == owner_id for note in notes)
+    assert mongo_db["notes"].count_documents({}) == 2
+
+
+def test_get_or_create_raises_when_the_conflicting_document_is_gone(monkeypatch):
+    class VanishingCollection:
+        def find_one_and_update(self, *args, **kwargs):
+            raise errors.DuplicateKeyError("E11000 duplicate key error")
+
+        def find_one(self, *args, **kwargs):
+            return None
+
+    monkeypatch.setattr(NoteDocument, "get_collection", classmethod(lambda cls: VanishingCollection()))
+
+    with pytest.raises(DatabaseError):
+        NoteDocument.get_or_create(owner_id=uuid.uuid4(), title="gone")
+
+
+@pytest.fixture
+def compressed_repository(mongo_db, monkeypatch):
+    from llm_engineering.domain.documents import RepositoryDocument
+    from llm_engineering.settings import settings
+
+    monkeypatch.setattr(settings, "MONGO_COMPRESSION_MIN_BYTES", 1)
+
+    repository = RepositoryDocument(
+        content={"repo/main.py": "print('hello')\n" * 100},
+        platform="github",
+        name="repo",
+        link="https://github.com/someone/repo",
+        author_id=uuid.uuid4(),
+        author_full_name="Some One",
+    )
+    repository.save()
+
+    stored = mongo_db[RepositoryDocument.get_collection_name()].find_one({"link": repository.link})
+    assert "__codec__" in stored["content"]
+
+    return repository
+
+
+def test_from_mongo_round_trips_compressed_fields_through_model_dump_json(compressed_repository):
+    from llm_engineering.domain.documents import RepositoryDocument
+
+    loaded = RepositoryDocument.find(link=compressed_repository.link)
+    dumped = RepositoryDocument.model_validate_json(loaded.model_dump_json())
+
+    assert dumped.content == compressed_repository.content
+
+
+def test_from_partial_mongo_serializes_compressed_fields(compressed_repository):
+    from llm_engineering.domain.documents import RepositoryDocument
+
+    partial = next(RepositoryDocument.iter_find(include=["content", "link"], link=compressed_repository.link))
+
+    assert partial.model_dump()["content"] == compressed_repository.content
+    assert '"repo/main.py"' in partial.model_dump_json()
+
+
+def test_unordered_bulk_write_reports_duplicates_without_aborting_the_batch(mongo_db):
+    owner_id = uuid.uuid4()
+    existing = NoteDocument(owner_id=owner_id, title="existing")
+    existing.save()
+    batch = [NoteDocument(owner_id=owner_id, title="first"), existing, NoteDocument(owner_id=owner_id, title="last")]
+
+    outcomes = NoteDocument.bulk_write(batch)
+
+    assert outcomes == [WriteOutcome.INSERTED, WriteOutcome.DUPLICATE, WriteOutcome.INSERTED]
+    assert {note["title"] for note in mongo_db["notes"].find()} == {"existing", "first", "last"}
+
+
+def test_bulk_write_maps_each_write_error_to_the_outcome_of_its_document(monkeypatch):
+    class RejectingCollection:
+        def bulk_write(self, operations, ordered):
+            assert ordered is False
+
+            raise errors.BulkWriteError(
+                {
+                    "writeErrors": [
+                        {"index": 1, "code": 11000, "errmsg": "E11000 duplicate key error"},
+                        {"index": 2, "code": 121, "errmsg": "Document failed validation"},
+                    ],
+                    "upserted": [{"index": 3, "_id": "new"}],
+                }
+            )
+
+    monkeypatch.setattr(NoteDocument, "get_collection", classmethod(lambda cls: RejectingCollection()))
+    notes = [NoteDocument(owner_id=uuid.uuid4(), title=str(i)) for i in range(4)]
+
+    assert NoteDocument.bulk_write(notes, upsert=True) == [
+        WriteOutcome.REPLACED,
+        WriteOutcome.DUPLICATE,
+        WriteOutcome.FAILED,
+        WriteOutcome.INSERTED,
+    ]
+    assert NoteDocument.bulk_insert(notes) is False
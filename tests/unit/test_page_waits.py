@@ -0,0 +1,36 @@
+import time
+
+from llm_engineering.application.crawlers import page_waits
+
+
+class FakeDriver:
+    """Page whose height is fixed and that stays busy on the network until `busy_until`."""
+
+    current_url = "https://example.com"
+
+    def __init__(self, busy_for: float) -> None:
+        self.busy_until = time.monotonic() + busy_for
+
+    def execute_script(self, script: str):
+        if script == page_waits._MS_SINCE_LAST_ACTIVITY:
+            return max(0.0, time.monotonic() - self.busy_until) * 1000
+        if script == "return document.readyState":
+            return "complete"
+
+        return 1000  # document.body.scrollHeight
+
+
+def test_height_settles_only_after_the_network_goes_idle():
+    driver = FakeDriver(busy_for=0.3)
+    started = time.monotonic()
+
+    page_waits.wait_for_height_to_settle(driver, timeout=2.0, quiet_period=0.1)
+
+    assert time.monotonic() - started >= 0.4
+
+
+def test_page_is_not_ready_while_the_network_is_busy():
+    driver = FakeDriver(busy_for=5.0)
+
+    assert page_waits.wait_until_ready(driver, timeout=0.3, quiet_period=0.1) is False
+    assert page_waits.wait_until_ready(FakeDriver(busy_for=0.0), timeout=0.3, quiet_period=0.1) is True
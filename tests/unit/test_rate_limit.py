@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+import pytest
+
+from llm_engineering.application.crawlers import rate_limit
+from llm_engineering.application.crawlers.rate_limit import (
+    RateLimiter,
+    RetryableError,
+    TokenBucket,
+    parse_retry_after,
+    raise_for_retryable_status,
+)
+
+URL = "https://medium.com/@someone/post"
+
+
+class FakeClock:
+    """Stands in for the `time` module: sleeping only moves the clock forward."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        if seconds:
+            self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(monotonic=clock.monotonic, sleep=clock.sleep))
+    # Full jitter always picks the longest delay
+    monkeypatch.setattr(rate_limit.random, "uniform", lambda low, high: high)
+
+    return clock
+
+
+def _limiter(**kwargs) -> RateLimiter:
+    options = {"rate": 2.0, "burst": 2, "domain_rates": {}, "max_attempts": 3, "backoff": 1.0, "max_backoff": 10.0}
+    options.update(kwargs)
+
+    return RateLimiter(**options)
+
+
+def test_bucket_serves_its_burst_then_one_token_per_interval(clock):
+    bucket = TokenBucket(rate=2.0, burst=2)
+
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+
+    clock.now += 2.0
+    assert bucket.reserve() == pytest.approx(0.0)
+
+
+def test_paused_bucket_waits_out_the_pause_then_resumes_one_request_at_a_time(clock):
+    bucket = TokenBucket(rate=2.0, burst=5)
+    bucket.pause(3.0)
+
+    assert bucket.reserve() == pytest.approx(3.0)
+    assert bucket.reserve() == pytest.approx(3.5)
+
+    clock.now += 10.0
+    assert bucket.reserve() == 0.0
+
+
+def test_call_retries_transient_failures_with_exponential_backoff(clock):
+    attempts = []
+
+    def request() -> str:
+        attempts.append(clock.now)
+        if len(attempts) < 3:
+            raise RetryableError("HTTP 503", status=503)
+
+        return "ok"
+
+    assert _limiter().call(URL, request) == "ok"
+    assert clock.sleeps == [1.0, 2.0]
+
+
+def test_call_raises_once_the_attempts_are_exhausted(clock):
+    def request() -> str:
+        raise ConnectionError("reset")
+
+    with pytest.raises(ConnectionError):
+        _limiter().call(URL, request, retry_on=(ConnectionError,))
+
+    assert clock.sleeps == [1.0, 2.0]
+
+
+def test_retry_after_pauses_the_whole_domain(clock):
+    limiter = _limiter()
+
+    delay = limiter._retry_delay(URL, 0, RetryableError("HTTP 429", status=429, retry_after=5.0))
+
+    assert delay == 1.0  # The request itself only waits for a jittered backoff...
+    assert limiter.bucket("https://www.medium.com/@other/post").reserve() == pytest.approx(5.0)  # ...the domain waits
+
+
+def test_429_without_retry_after_pauses_the_domain_for_the_backoff(clock):
+    limiter = _limiter(backoff=2.0)
+
+    limiter._retry_delay(URL, 1, RetryableError("HTTP 429", status=429))
+
+    assert limiter.bucket(URL).reserve() == pytest.approx(4.0)
+
+
+def test_retry_after_longer_than_the_max_backoff_gives_up(clock):
+    assert _limiter()._retry_delay(URL, 0, RetryableError("HTTP 503", status=503, retry_after=3600.0)) is None
+
+
+def test_last_attempt_gives_up(clock):
+    assert _limiter(max_attempts=2)._retry_delay(URL, 1, RetryableError("HTTP 503", status=503)) is None
+
+
+@pytest.mark.parametrize("value, expected", [("120", 120.0), (" 0 ", 0.0), (None, None), ("", None), ("soon", None)])
+def test_parse_retry_after_in_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_as_an_http_date():
+    in_a_minute = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+    a_minute_ago = format_datetime(datetime.now(timezone.utc) - timedelta(seconds=60), usegmt=True)
+
+    assert parse_retry_after(in_a_minute) == pytest.approx(60.0, abs=2.0)
+    assert parse_retry_after(a_minute_ago) == 0.0
+
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503, 504])
+def test_throttling_and_server_errors_are_retryable(status):
+    with pytest.raises(RetryableError) as error:
+        raise_for_retryable_status(URL, status, {"Retry-After": "5"})
+
+    assert error.value.status == status
+    assert error.value.retry_after == 5.0
+
+
+@pytest.mark.parametrize("status", [200, 304, 403, 404])
+def test_other_statuses_are_not_retryable(status):
+    raise_for_retryable_status(URL, status, {})
@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlparse
+
+from llm_engineering.application.crawlers.scheduler import CrawlScheduler
+
+
+class FakeCrawl:
+    """Records how many links of each domain are crawled at once."""
+
+    def __init__(self, duration: float = 0.05, fail: set[str] = frozenset(), hang: set[str] = frozenset()) -> None:
+        self.duration = duration
+        self.fail = fail
+        self.hang = hang
+        self.released = threading.Event()
+        self.started: defaultdict[str, list[float]] = defaultdict(list)
+        self.max_active: Counter[str] = Counter()
+        self._active: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, link: str) -> dict:
+        domain = urlparse(link).netloc
+        with self._lock:
+            self.started[domain].append(time.monotonic())
+            self._active[domain] += 1
+            self.max_active[domain] = max(self.max_active[domain], self._active[domain])
+        try:
+            if link in self.hang:
+                self.released.wait(timeout=5)
+            time.sleep(self.duration)
+            if link in self.fail:
+                raise RuntimeError(f"HTTP 503 from {link}")
+
+            return {"tier": "http"}
+        finally:
+            with self._lock:
+                self._active[domain] -= 1
+
+
+def _scheduler(**kwargs) -> CrawlScheduler:
+    options = {"max_workers": 8, "per_domain_limit": 1, "domain_limits": {}, "politeness_delay": 0.0}
+    options.update(kwargs)
+
+    return CrawlScheduler(link_timeout=options.pop("link_timeout", 60.0), poll_interval=0.01, **options)
+
+
+def test_domains_are_crawled_side_by_side_within_their_concurrency_limit():
+    crawl = FakeCrawl()
+    links = [f"https://github.com/someone/repo-{i}" for i in range(6)] + [
+        f"https://medium.com/@someone/{i}" for i in range(3)
+    ]
+
+    results = list(_scheduler(domain_limits={"github.com": 2}).run(links, crawl))
+
+    assert sorted(result.link for result in results) == sorted(links)
+    assert all(result.successful and result.info == {"tier": "http"} for result in results)
+    assert crawl.max_active == {"github.com": 2, "medium.com": 1}
+
+
+def test_crawl_starts_on_one_domain_are_spaced_by_the_politeness_delay():
+    crawl = FakeCrawl(duration=0.0)
+    links = [f"https://medium.com/@someone/{i}" for i in range(3)] + ["https://github.com/someone/repo"]
+
+    list(_scheduler(per_domain_limit=3, politeness_delay=0.1).run(links, crawl))
+
+    starts = crawl.started["medium.com"]
+    assert all(later - earlier >= 0.09 for earlier, later in zip(starts, starts[1:]))
+    # Other domains do not wait for it
+    assert crawl.started["github.com"][0] - starts[0] < 0.09
+
+
+def test_a_crawl_running_past_the_link_timeout_is_reported_as_failed():
+    hanging = "https://github.com/someone/huge-repo"
+    crawl = FakeCrawl(duration=0.0, hang={hanging})
+
+    try:
+        results = _scheduler(link_timeout=0.2).run([hanging, "https://medium.com/@someone/1"], crawl)
+        results = {result.link: result for result in results}
+    finally:
+        crawl.released.set()
+
+    assert not results[hanging].successful
+    assert results[hanging].error == "Timed out"
+    assert results["https://medium.com/@someone/1"].successful
+
+
+def test_a_raising_crawl_is_reported_as_failed_with_its_error():
+    failing = "https://medium.com/@someone/broken"
+    crawl = FakeCrawl(duration=0.0, fail={failing})
+
+    results = {result.link: result for result in _scheduler().run([failing, "https://medium.com/@someone/ok"], crawl)}
+
+    assert not results[failing].successful
+    assert results[failing].error == f"HTTP 503 from {failing}"
+    assert results["https://medium.com/@someone/ok"].successful
@@ -0,0 +1,111 @@
+import importlib.util
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from qdrant_client.http import exceptions
+
+from llm_engineering.domain.base import vector
+from llm_engineering.domain.cleaned_documents import CleanedArticleDocument
+
+
+class FakeQdrant:
+    def __init__(self, hits: list | None = None, error: Exception | None = None, count: int = 0) -> None:
+        self.hits = hits or []
+        self.error = error
+        self.points = count
+        self.payload_indexes = []
+
+    def facet(self, **kwargs):
+        if self.error is not None:
+            raise self.error
+
+        return SimpleNamespace(hits=self.hits[: kwargs["limit"]])
+
+    def count(self, **kwargs):
+        if self.error is not None:
+            raise self.error
+
+        return SimpleNamespace(count=self.points)
+
+    def create_collection(self, **kwargs) -> bool:
+        return True
+
+    def create_payload_index(self, collection_name: str, field_name: str, **kwargs) -> None:
+        self.payload_indexes.append((collection_name, field_name))
+
+
+def _unexpected_response() -> exceptions.UnexpectedResponse:
+    return exceptions.UnexpectedResponse(400, "Bad Request", b"Index required but not found", httpx.Headers())
+
+
+@pytest.fixture
+def warnings(monkeypatch):
+    messages = []
+    monkeypatch.setattr(vector.logger, "warning", messages.append)
+
+    return messages
+
+
+def test_count_by_warns_when_the_facet_limit_is_reached(monkeypatch, warnings):
+    hits = [SimpleNamespace(value=f"author {i}", count=1) for i in range(3)]
+    monkeypatch.setattr(vector, "connection", FakeQdrant(hits))
+
+    counts = CleanedArticleDocument.count_by("author_full_name", limit=2)
+
+    assert counts == {"author 0": 1, "author 1": 1}
+    assert len(warnings) == 1 and "limit" in warnings[0]
+
+
+def test_count_by_returns_nothing_when_qdrant_is_unreachable(monkeypatch, warnings):
+    monkeypatch.setattr(vector, "connection", FakeQdrant(error=exceptions.ResponseHandlingException(ConnectionError())))
+
+    assert CleanedArticleDocument.count_by("author_full_name") == {}
+    assert warnings == []
+
+
+def test_count_by_does_not_create_a_missing_payload_index(monkeypatch):
+    qdrant = FakeQdrant(error=_unexpected_response())
+    monkeypatch.setattr(vector, "connection", qdrant)
+
+    assert CleanedArticleDocument.count_by("author_full_name") == {}
+    assert qdrant.payload_indexes == []
+
+
+def test_count_returns_zero_when_qdrant_is_unreachable(monkeypatch):
+    monkeypatch.setattr(vector, "connection", FakeQdrant(error=exceptions.ResponseHandlingException(ConnectionError())))
+
+    assert CleanedArticleDocument.count(author_full_name="Some One") == 0
+
+
+def test_creating_a_collection_creates_its_declared_payload_indexes(monkeypatch):
+    qdrant = FakeQdrant()
+    monkeypatch.setattr(vector, "connection", qdrant)
+
+    assert CleanedArticleDocument.create_collection()
+    assert qdrant.payload_indexes == [("cleaned_articles", "author_full_name")]
+
+
+def test_load_step_metadata_is_counted_by_qdrant(monkeypatch):
+    pytest.importorskip("zenml")
+    # Loaded by path: the feature_engineering package also imports the preprocessing steps
+    path = Path(__file__).parents[2] / "steps" / "feature_engineering" / "load_to_vector_db.py"
+    spec = importlib.util.spec_from_file_location("load_to_vector_db", path)
+    load_to_vector_db = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(load_to_vector_db)
+
+    hits = [SimpleNamespace(value="Some One", count=3), SimpleNamespace(value="Other One", count=1)]
+    monkeypatch.setattr(vector, "connection", FakeQdrant(hits, count=4))
+    loaded = CleanedArticleDocument(
+        content="text",
+        platform="medium",
+        link="https://medium.com/@someone/post",
+        author_id=uuid.uuid4(),
+        author_full_name="Some One",
+    )
+
+    assert load_to_vector_db._get_metadata({CleanedArticleDocument: [loaded]}) == {
+        "cleaned_articles": {"num_loaded": 1, "num_documents": 4, "authors": {"Some One": 3, "Other One": 1}}
+    }
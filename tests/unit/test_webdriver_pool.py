@@ -0,0 +1,118 @@
+from llm_engineering.application.crawlers import webdriver_pool
+from llm_engineering.application.crawlers.base import BaseSeleniumCrawler
+from llm_engineering.application.crawlers.webdriver_pool import WebDriverPool
+from llm_engineering.settings import settings
+
+
+class FakeChrome:
+    launched: list["FakeChrome"] = []
+
+    def __init__(self, options) -> None:
+        self.arguments = list(options.arguments)
+        self.quit_called = False
+        FakeChrome.launched.append(self)
+
+    @property
+    def port(self) -> int:
+        return next(int(arg.split("=")[1]) for arg in self.arguments if arg.startswith("--remote-debugging-port="))
+
+    def execute_script(self, script: str) -> int:
+        return 1
+
+    def quit(self) -> None:
+        self.quit_called = True
+
+
+def _alive() -> list[FakeChrome]:
+    return [driver for driver in FakeChrome.launched if not driver.quit_called]
+
+
+def _setup(monkeypatch) -> None:
+    FakeChrome.launched = []
+    monkeypatch.setattr(webdriver_pool.webdriver, "Chrome", FakeChrome)
+    monkeypatch.setattr(settings, "SELENIUM_REMOTE_DEBUGGING_PORT", 9300)
+
+
+def test_browsers_of_different_profiles_share_the_pool_size_and_get_distinct_ports(monkeypatch):
+    _setup(monkeypatch)
+    pool = WebDriverPool(size=2)
+
+    with pool.checkout("MediumCrawler") as medium, pool.checkout("LinkedInCrawler") as linkedin:
+        assert {medium.port, linkedin.port} == {9300, 9301}
+
+    # Both slots hold idle browsers; a third profile evicts one instead of launching a third browser
+    with pool.checkout("GithubCrawler") as github:
+        assert github.port in {9300, 9301}
+        assert len(_alive()) == 2
+
+    pool.close()
+    assert _alive() == []
+
+
+def test_idle_browsers_are_only_reused_by_their_own_profile(monkeypatch):
+    _setup(monkeypatch)
+    pool = WebDriverPool(size=2)
+
+    with pool.checkout("MediumCrawler", lambda options: options.add_argument("--medium")) as first:
+        pass
+    with pool.checkout("LinkedInCrawler") as other:
+        assert other is not first
+    with pool.checkout("MediumCrawler") as again:
+        assert again is first
+        assert "--medium" in again.arguments
+
+
+def test_close_idle_only_quits_browsers_of_the_profile(monkeypatch):
+    _setup(monkeypatch)
+    pool = WebDriverPool(size=2)
+
+    with pool.checkout("MediumCrawler") as medium, pool.checkout("LinkedInCrawler") as linkedin:
+        pass
+    pool.close_idle("MediumCrawler")
+
+    assert medium.quit_called and not linkedin.quit_called
+    with pool.checkout("LinkedInCrawler") as again:
+        assert again is linkedin
+
+
+def test_idle_browsers_of_a_profile_are_kept_until_its_last_user_is_removed(monkeypatch):
+    _setup(monkeypatch)
+    pool = WebDriverPool(size=2)
+    pool.add_user("MediumCrawler")
+    pool.add_user("MediumCrawler")
+
+    with pool.checkout("MediumCrawler") as medium:
+        pass
+    pool.remove_user("MediumCrawler")
+    assert not medium.quit_called
+
+    pool.remove_user("MediumCrawler")
+    assert medium.quit_called
+
+
+class PooledCrawler(BaseSeleniumCrawler):
+    pool: WebDriverPool
+
+    def get_driver_pool(self) -> WebDriverPool:
+        return self.pool
+
+    def extract(self, link: str, **kwargs) -> None:
+        with self.browser():
+            pass
+
+
+def test_closing_one_crawler_keeps_the_browsers_another_instance_still_uses(monkeypatch):
+    _setup(monkeypatch)
+    PooledCrawler.pool = WebDriverPool(size=2)
+    session_crawler, worker_crawler = PooledCrawler(), PooledCrawler()
+
+    session_crawler.extract("https://example.com/a")
+    worker_crawler.extract("https://example.com/b")
+    session_crawler.close()
+    session_crawler.close()  # Closing twice releases the pool only once
+
+    assert len(FakeChrome.launched) == 1
+    assert _alive() == FakeChrome.launched
+
+    worker_crawler.close()
+    assert _alive() == []